@@ -1,11 +1,15 @@
 import os
 from pathlib import Path
-from fastapi import Depends, HTTPException, WebSocket, WebSocketDisconnect
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from dotenv import load_dotenv
 
 # import nest_asyncio
 from app.utils import Logger
-from neo4j import GraphDatabase
+from app.utils.current_user import ACCESS_TOKEN, verify_access_token_cached
+from app.utils.metrics import InstrumentedSession
+from app.config.transaction import ManagedSession, bookmark_store
+from neo4j import AsyncGraphDatabase
 
 # nest_asyncio.apply()
 logger = Logger("connection.py")
@@ -19,12 +23,63 @@ NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 NEO4J_DATABASE = os.getenv("NEO4J_DATABASE")
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# 일시적인 오류가 난 트랜잭션 함수를 다시 시도하는 최대 시간(초)
+NEO4J_MAX_TRANSACTION_RETRY_TIME = float(os.getenv("NEO4J_MAX_TRANSACTION_RETRY_TIME", 15))
+# neo4j: 요청마다 세션을 열어 Cypher 로 처리한다. memory: 프로세스 메모리의 그래프 하나를 모든 요청이 같이 쓴다
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j").lower()
+_driver = None
 
 
-def get_session():
-    session = driver.session(database=NEO4J_DATABASE)
-    return session
+def get_driver():
+    # 드라이버는 처음 세션을 열 때 만든다. memory 백엔드에서는 Neo4j 에 연결하지 않는다
+    global _driver
+    if GRAPH_BACKEND == "memory":
+        raise RuntimeError("Neo4j is not used when GRAPH_BACKEND=memory")
+    if _driver is None:
+        _driver = AsyncGraphDatabase.driver(
+            NEO4J_URI,
+            auth=(NEO4J_USER, NEO4J_PASSWORD),
+            max_transaction_retry_time=NEO4J_MAX_TRANSACTION_RETRY_TIME,
+        )
+    return _driver
+
+
+def open_session(user_node_id: Optional[str] = None):
+    # 라우터 밖(스케줄러, long-polling)에서는 `async with open_session() as session:` 으로 사용
+    # run() 은 읽기/쓰기 트랜잭션 함수로 실행되고, 쿼리 이름별 지연, 행 수, 실패를 기록한다
+    # user_node_id 를 넘기면 그 사용자가 마지막으로 쓴 내용 이후부터 읽는다
+    session = get_driver().session(
+        database=NEO4J_DATABASE, bookmarks=bookmark_store.get(user_node_id)
+    )
+    return InstrumentedSession(ManagedSession(session, user_node_id))
+
+
+def _request_user(request: Request) -> Optional[str]:
+    # 인증은 current_user 가 하고, 여기서는 bookmark 를 고르기 위해 사용자만 알아낸다
+    token = request.cookies.get(ACCESS_TOKEN)
+    if not token:
+        return None
+    try:
+        return verify_access_token_cached(token).get("user_node_id")
+    except Exception:
+        return None
+
+
+async def get_session(request: Request):
+    if GRAPH_BACKEND == "memory":
+        raise HTTPException(status_code=503, detail="Neo4j backend is disabled")
+    session = open_session(_request_user(request))
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def close_driver():
+    global _driver
+    if _driver is not None:
+        await _driver.close()
+        _driver = None
 
 
 S3_BUCKET_NAME = os.getenv("AMPLIFY_BUCKET")
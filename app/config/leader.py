@@ -0,0 +1,195 @@
+import asyncio
+import os
+import socket
+import uuid
+from app.utils import Logger
+from app.utils.metrics import (
+    scheduler_leader,
+    scheduler_lease_renewals,
+    scheduler_leader_transitions,
+)
+from app.config.connection import open_session
+
+logger = Logger(__file__)
+
+# 워커가 여러 개여도 정리 작업(delete_old_casts, delete_old_stickers)은 한 프로세스만 돌리도록 리더를 뽑는다.
+# neo4j: SchedulerLease 노드에 만료 시각이 있는 lease 를 두고 리더가 주기적으로 연장한다. 호스트가 여러 대여도 된다.
+# file: 같은 호스트의 워커끼리 파일 잠금을 잡는다. 프로세스가 죽으면 OS 가 잠금을 풀어 준다.
+# none: 모든 프로세스가 리더다. 워커가 하나일 때만 쓴다.
+SCHEDULER_LEADER_BACKEND = os.getenv("SCHEDULER_LEADER_BACKEND", "neo4j")
+SCHEDULER_LEASE_NAME = os.getenv("SCHEDULER_LEASE_NAME", "scheduler")
+SCHEDULER_LEASE_SECONDS = int(os.getenv("SCHEDULER_LEASE_SECONDS", 30))
+# lease 가 끝나기 전에 두 번은 더 연장을 시도할 수 있게 잡는다
+SCHEDULER_LEASE_RENEW_SECONDS = float(
+    os.getenv("SCHEDULER_LEASE_RENEW_SECONDS", SCHEDULER_LEASE_SECONDS / 3)
+)
+SCHEDULER_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH", "scheduler.lock")
+
+# 시각은 DB 의 datetime() 으로 비교해서 워커 사이의 시계 차이에 영향받지 않는다.
+# 먼저 SET 으로 쓰기 잠금을 잡은 뒤에 holder 를 확인하므로 두 워커가 동시에 가져갈 수 없다.
+ACQUIRE_SCHEDULER_LEASE_QUERY = """
+MERGE (l:SchedulerLease {name: $name})
+SET l.checked_at = datetime()
+WITH l
+WHERE l.holder IS NULL OR l.holder = $holder OR l.expires_at < datetime()
+SET l.acquired_at = CASE WHEN l.holder = $holder THEN l.acquired_at ELSE datetime() END,
+    l.holder = $holder,
+    l.expires_at = datetime() + duration({seconds: $lease_seconds})
+RETURN l.holder AS holder
+"""
+
+RELEASE_SCHEDULER_LEASE_QUERY = """
+MATCH (l:SchedulerLease {name: $name, holder: $holder})
+SET l.holder = NULL, l.expires_at = NULL
+"""
+
+
+class Neo4jLease:
+    name = "neo4j"
+
+    def __init__(self, lease_name: str, holder: str):
+        self._lease_name = lease_name
+        self._holder = holder
+
+    async def acquire(self) -> bool:
+        # 이미 리더면 연장, 아니면 만료된 lease 를 가져온다
+        async with open_session() as session:
+            result = await session.run(
+                ACQUIRE_SCHEDULER_LEASE_QUERY,
+                name=self._lease_name,
+                holder=self._holder,
+                lease_seconds=SCHEDULER_LEASE_SECONDS,
+            )
+            record = await result.single()
+        return record is not None
+
+    async def release(self):
+        async with open_session() as session:
+            result = await session.run(
+                RELEASE_SCHEDULER_LEASE_QUERY,
+                name=self._lease_name,
+                holder=self._holder,
+            )
+            await result.consume()
+
+
+class FileLease:
+    name = "file"
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+
+    def _acquire(self) -> bool:
+        import fcntl
+
+        if self._file is not None:
+            return True
+        lock_file = open(self._path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    async def acquire(self) -> bool:
+        return await asyncio.to_thread(self._acquire)
+
+    async def release(self):
+        if self._file is not None:
+            # 파일을 닫으면 잠금도 풀린다
+            self._file.close()
+            self._file = None
+
+
+class AlwaysLease:
+    name = "none"
+
+    async def acquire(self) -> bool:
+        return True
+
+    async def release(self):
+        pass
+
+
+class SchedulerLeader:
+    def __init__(self, lease):
+        self._lease = lease
+        self._stopping = asyncio.Event()
+        self._on_elected = []
+        self._on_demoted = []
+        self.is_leader = False
+
+    def on_elected(self, callback):
+        self._on_elected.append(callback)
+
+    def on_demoted(self, callback):
+        self._on_demoted.append(callback)
+
+    def _transition(self, is_leader: bool):
+        if is_leader == self.is_leader:
+            return
+        self.is_leader = is_leader
+        scheduler_leader.labels(self._lease.name).set(int(is_leader))
+        if is_leader:
+            logger.info("스케줄러 리더로 선출됨")
+            scheduler_leader_transitions.labels("elected").inc()
+            callbacks = self._on_elected
+        else:
+            logger.warning("스케줄러 리더에서 물러남")
+            scheduler_leader_transitions.labels("demoted").inc()
+            callbacks = self._on_demoted
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"scheduler leader callback failed: {e}")
+
+    async def run(self):
+        logger.info(f"스케줄러 리더 선출 시작 - {self._lease.name}")
+        while not self._stopping.is_set():
+            try:
+                acquired = await self._lease.acquire()
+                if acquired:
+                    scheduler_lease_renewals.labels("ok").inc()
+                elif self.is_leader:
+                    # 연장이 늦어서 다른 워커가 lease 를 가져갔다
+                    scheduler_lease_renewals.labels("lost").inc()
+            except Exception as e:
+                # lease 를 연장했는지 알 수 없으면 두 워커가 같이 돌지 않도록 물러난다
+                logger.error(f"scheduler lease renewal failed: {e}")
+                scheduler_lease_renewals.labels("error").inc()
+                acquired = False
+            self._transition(acquired)
+
+            try:
+                await asyncio.wait_for(
+                    self._stopping.wait(), timeout=SCHEDULER_LEASE_RENEW_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+        # 다음 리더가 lease 만료를 기다리지 않고 바로 가져가게 놓아 준다
+        self._transition(False)
+        try:
+            await self._lease.release()
+        except Exception as e:
+            logger.error(f"scheduler lease release failed: {e}")
+        logger.info("스케줄러 리더 선출 종료")
+
+    def stop(self):
+        self._stopping.set()
+
+
+def _create_lease():
+    if SCHEDULER_LEADER_BACKEND == "file":
+        return FileLease(SCHEDULER_LOCK_PATH)
+    if SCHEDULER_LEADER_BACKEND == "none":
+        return AlwaysLease()
+    holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    return Neo4jLease(SCHEDULER_LEASE_NAME, holder)
+
+
+scheduler_leader_election = SchedulerLeader(_create_lease())
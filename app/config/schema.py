@@ -0,0 +1,147 @@
+from datetime import datetime, timezone
+from app.utils import Logger
+from app.config.connection import open_session
+
+logger = Logger(__file__)
+
+# (버전, 설명, 쿼리 목록)
+# 이미 배포된 버전은 수정하지 말고 새 버전을 뒤에 추가할 것.
+# 모든 쿼리는 IF NOT EXISTS 로 작성해서 여러 워커가 동시에 실행해도 안전해야 한다.
+EDGE_ID_RELATIONSHIPS = [
+    "knock",
+    "is_roommate",
+    "mute",
+    "block",
+    "creator_of_sticker",
+    "is_post",
+    "creator_of_cast",
+    "receiver_of_cast",
+    "is_reply",
+]
+
+MIGRATIONS = [
+    (
+        1,
+        "node_id/email uniqueness constraints and lookup indexes",
+        [
+            "CREATE CONSTRAINT user_node_id IF NOT EXISTS FOR (n:User) REQUIRE n.node_id IS UNIQUE",
+            "CREATE CONSTRAINT private_data_node_id IF NOT EXISTS FOR (n:PrivateData) REQUIRE n.node_id IS UNIQUE",
+            "CREATE CONSTRAINT private_data_email IF NOT EXISTS FOR (n:PrivateData) REQUIRE n.email IS UNIQUE",
+            "CREATE CONSTRAINT sticker_node_id IF NOT EXISTS FOR (n:Sticker) REQUIRE n.node_id IS UNIQUE",
+            "CREATE CONSTRAINT post_node_id IF NOT EXISTS FOR (n:Post) REQUIRE n.node_id IS UNIQUE",
+            "CREATE CONSTRAINT cast_node_id IF NOT EXISTS FOR (n:Cast) REQUIRE n.node_id IS UNIQUE",
+            "CREATE INDEX sticker_deleted_at IF NOT EXISTS FOR (n:Sticker) ON (n.deleted_at)",
+            "CREATE INDEX sticker_created_at IF NOT EXISTS FOR (n:Sticker) ON (n.created_at)",
+            "CREATE INDEX cast_deleted_at IF NOT EXISTS FOR (n:Cast) ON (n.deleted_at)",
+        ]
+        + [
+            f"CREATE INDEX {rel}_edge_id IF NOT EXISTS FOR ()-[r:{rel}]-() ON (r.edge_id)"
+            for rel in EDGE_ID_RELATIONSHIPS
+        ],
+    ),
+    (
+        2,
+        "precomputed Cast.expires_at for incremental cast expiry",
+        [
+            "CREATE INDEX cast_expires_at IF NOT EXISTS FOR (n:Cast) ON (n.expires_at)",
+            """
+            MATCH (c:Cast)
+            WHERE c.expires_at IS NULL
+            CALL {
+                WITH c
+                SET c.expires_at = datetime(c.created_at) + duration({minutes: c.duration})
+            } IN TRANSACTIONS OF 1000 ROWS
+            """,
+        ],
+    ),
+    (
+        3,
+        "pending sticker fan-out lookup",
+        [
+            "CREATE INDEX sticker_fanout_pending IF NOT EXISTS FOR (n:Sticker) ON (n.fanout_pending)",
+        ],
+    ),
+    (
+        4,
+        "full-text index for user search",
+        [
+            "CREATE FULLTEXT INDEX user_search IF NOT EXISTS FOR (n:User) ON EACH [n.nickname, n.username]",
+        ],
+    ),
+    (
+        5,
+        "created_at ordering for paginated post and knock lists",
+        [
+            "CREATE INDEX post_created_at IF NOT EXISTS FOR (n:Post) ON (n.created_at)",
+            "CREATE INDEX knock_created_at IF NOT EXISTS FOR ()-[r:knock]-() ON (r.created_at)",
+            # 이전에 만들어진 knock 은 시각을 알 수 없으므로 가장 오래된 것으로 취급한다
+            """
+            MATCH ()-[k:knock]->()
+            WHERE k.created_at IS NULL
+            CALL {
+                WITH k
+                SET k.created_at = '1970-01-01T00:00:00+00:00'
+            } IN TRANSACTIONS OF 1000 ROWS
+            """,
+        ],
+    ),
+    (
+        6,
+        "scheduler leader lease",
+        [
+            "CREATE CONSTRAINT scheduler_lease_name IF NOT EXISTS FOR (n:SchedulerLease) REQUIRE n.name IS UNIQUE",
+        ],
+    ),
+    (
+        7,
+        "presigned uploads waiting for commit",
+        [
+            "CREATE CONSTRAINT pending_upload_key IF NOT EXISTS FOR (n:PendingUpload) REQUIRE n.key IS UNIQUE",
+            "CREATE INDEX pending_upload_created_at IF NOT EXISTS FOR (n:PendingUpload) ON (n.created_at)",
+        ],
+    ),
+]
+
+GET_SCHEMA_VERSION_QUERY = """
+OPTIONAL MATCH (v:SchemaVersion {name: 'gooroom'})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+SET_SCHEMA_VERSION_QUERY = """
+MERGE (v:SchemaVersion {name: 'gooroom'})
+SET v.version = $version,
+    v.description = $description,
+    v.applied_at = $applied_at
+"""
+
+
+async def run_migrations():
+    async with open_session() as session:
+        result = await session.run(GET_SCHEMA_VERSION_QUERY)
+        record = await result.single()
+        current_version = record["version"]
+
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+
+            logger.info(f"schema migration v{version}: {description}")
+            try:
+                # 스키마 변경과 데이터 변경은 한 트랜잭션에 섞을 수 없어서 쿼리마다 auto-commit 으로 실행
+                for statement in statements:
+                    result = await session.run(statement)
+                    await result.consume()
+            except Exception as e:
+                logger.error(f"schema migration v{version} failed: {e}")
+                return current_version
+
+            result = await session.run(
+                SET_SCHEMA_VERSION_QUERY,
+                version=version,
+                description=description,
+                applied_at=datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+            )
+            await result.consume()
+            current_version = version
+
+    return current_version
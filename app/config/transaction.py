@@ -0,0 +1,118 @@
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+from neo4j import Bookmarks
+from neo4j.exceptions import ResultNotSingleError
+from app.utils.cypher import AUTO_COMMIT, READ, query_access_mode
+
+# 라우터의 session.run 을 쿼리 종류에 따라 execute_read / execute_write 트랜잭션 함수로 실행한다.
+# 드라이버가 일시적인 클러스터 오류(리더 변경, 연결 끊김)를 max_transaction_retry_time 동안 다시 시도하고,
+# NEO4J_URI 가 neo4j:// 이면 읽기는 팔로워/읽기 복제본으로, 쓰기는 리더로 보낸다.
+# 사용자가 쓴 뒤의 bookmark 를 기억해 두었다가 그 사용자의 다음 세션에 넘겨서, 자기가 쓴 내용은 복제본에서도 바로 읽히게 한다.
+BOOKMARK_CACHE_MAX_SIZE = int(os.getenv("BOOKMARK_CACHE_MAX_SIZE", 10000))
+
+
+class BookmarkStore:
+    # 사용자별 마지막 쓰기 bookmark. 프로세스 메모리에만 있으므로 다른 워커에서 쓴 내용은 보장하지 않는다.
+    # 로그인 전 요청과 스케줄러 작업(key None)은 bookmark 를 저장하지도 받지도 않는다.
+    # 모두가 같이 쓰는 key 가 있으면 관계없는 쓰기를 기다리느라 읽기가 느려지기 때문이다.
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._bookmarks: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+
+    def get(self, key: Optional[str]) -> Optional[Bookmarks]:
+        if key is None:
+            return None
+        raw_values = self._bookmarks.get(key)
+        if not raw_values:
+            return None
+        self._bookmarks.move_to_end(key)
+        return Bookmarks.from_raw_values(raw_values)
+
+    def save(self, key: Optional[str], bookmarks: Bookmarks):
+        if key is None:
+            return
+        raw_values = tuple(bookmarks.raw_values)
+        if not raw_values:
+            return
+        self._bookmarks[key] = raw_values
+        self._bookmarks.move_to_end(key)
+        while len(self._bookmarks) > self._max_size:
+            self._bookmarks.popitem(last=False)
+
+
+bookmark_store = BookmarkStore(BOOKMARK_CACHE_MAX_SIZE)
+
+
+async def _fetch(tx, query, parameters: dict):
+    # 재시도될 수 있으므로 트랜잭션 함수 안에서 결과를 다 읽는다
+    result = await tx.run(query, parameters)
+    return await result.to_eager_result()
+
+
+class BufferedResult:
+    # 트랜잭션 함수가 끝난 뒤에는 AsyncResult 를 읽을 수 없어서 다 읽어 둔 결과를 같은 모양으로 돌려준다
+
+    def __init__(self, eager_result):
+        self._records = eager_result.records
+        self._summary = eager_result.summary
+        self._keys = eager_result.keys
+
+    def keys(self):
+        return tuple(self._keys)
+
+    async def single(self, strict: bool = False):
+        if strict and len(self._records) != 1:
+            raise ResultNotSingleError(f"expected one record, got {len(self._records)}")
+        return self._records[0] if self._records else None
+
+    async def data(self, *keys):
+        return [record.data(*keys) for record in self._records]
+
+    async def values(self, *keys):
+        return [record.values(*keys) for record in self._records]
+
+    async def consume(self):
+        return self._summary
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+class ManagedSession:
+    # AsyncSession.run 만 바꾸고 나머지는 그대로 넘긴다
+
+    def __init__(self, session, bookmark_key: Optional[str] = None):
+        self._session = session
+        self._bookmark_key = bookmark_key
+
+    async def run(self, query, parameters=None, **kwargs):
+        parameters = dict(parameters or {}, **kwargs)
+        mode = query_access_mode(getattr(query, "text", query))
+
+        # CALL IN TRANSACTIONS 와 스키마 변경은 auto-commit 으로만 실행할 수 있다
+        if mode == AUTO_COMMIT:
+            return await self._session.run(query, parameters)
+        if mode == READ:
+            return BufferedResult(await self._session.execute_read(_fetch, query, parameters))
+
+        result = BufferedResult(await self._session.execute_write(_fetch, query, parameters))
+        # 사용자 없이 연 세션은 bookmark 를 남기지 않는다
+        if self._bookmark_key is not None:
+            bookmark_store.save(self._bookmark_key, await self._session.last_bookmarks())
+        return result
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._session.__aexit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
@@ -11,6 +11,7 @@ from .service import (
     mute_router,
     block_router,
     alert_router,
+    upload_router,
 )
 
 __all__ = [
@@ -23,4 +24,5 @@ __all__ = [
     "friend_router",
     "test_router",
     "alert_router",
+    "upload_router",
 ]
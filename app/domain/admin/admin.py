@@ -1,63 +1,42 @@
 # backend/domain/admin/admin.py
-from fastapi import HTTPException, APIRouter, Depends, Body, Request, Response
+from fastapi import HTTPException, APIRouter, Depends, Body, Response, Query
 from app.utils import (
-    verify_access_token,
+    current_user,
     Logger,
 )
-from app.config.connection import get_session
-from .response import DeleteUserResponse
+from app.utils.roommate_index import roommate_index
+from app.utils.slow_query import slow_query_log, SLOW_QUERY_THRESHOLD_MS
+from app.repository import GraphRepository, get_repository
+from .response import DeleteUserResponse, SlowQueriesResponse
 from .request import DeleteUserRequest
 
 logger = Logger(__file__)
 
 router = APIRouter()
 
-ACCESS_TOKEN = "access_token"
-
 
 @router.post("/admin/user/delete")
 async def delete_user(
     response: Response,
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     delete_user_request: DeleteUserRequest = Body(...),
+    admin_node_id: str = Depends(current_user),
 ):
     logger.info("admin delete user")
 
-    token = request.cookies.get(ACCESS_TOKEN)
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    admin_node_id = verify_access_token(token)["user_node_id"]
-
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{admin_node_id}'}})<-[:is_info]-(p:PrivateData {{grant: 'admin'}})
-        RETURN p
-        """
-        result = session.run(query, admin_node_id=admin_node_id)
-        record = result.single()
-
-        if not record:
+        if not await repository.is_admin(admin_node_id):
             raise HTTPException(
                 status_code=403,
                 detail="Access denied. User does not have admin privileges.",
             )
 
-        delete_query = f"""
-        MATCH (u:User {{node_id: '{delete_user_request.node_id}'}})
-        OPTIONAL MATCH (u)<-[r:is_info]-(p:PrivateData)
-        DETACH DELETE u, p
-        RETURN COUNT(u) AS deleted_count
-        """
-        delete_result = session.run(delete_query)
-        delete_record = delete_result.single()
-
-        if delete_record["deleted_count"] == 0:
+        if await repository.delete_user(delete_user_request.node_id) == 0:
             raise HTTPException(
                 status_code=400, detail="User not found or failed to delete"
             )
 
+        roommate_index.remove_user(delete_user_request.node_id)
         return DeleteUserResponse()
 
     except HTTPException as e:
@@ -65,3 +44,29 @@ async def delete_user(
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/admin/slow-queries", response_model=SlowQueriesResponse)
+async def get_slow_queries(
+    repository: GraphRepository = Depends(get_repository),
+    limit: int = Query(100, ge=1, le=1000),
+    admin_node_id: str = Depends(current_user),
+):
+    # 최근 느린 쿼리와 PROFILE 로 다시 실행한 계획 요약. 이 워커에서 잡힌 것만 보인다
+    try:
+        if not await repository.is_admin(admin_node_id):
+            raise HTTPException(
+                status_code=403,
+                detail="Access denied. User does not have admin privileges.",
+            )
+
+        return SlowQueriesResponse(
+            threshold_ms=SLOW_QUERY_THRESHOLD_MS,
+            queries=slow_query_log.entries(limit),
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
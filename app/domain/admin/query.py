@@ -0,0 +1,12 @@
+ADMIN_CHECK_QUERY = """
+MATCH (u:User {node_id: $admin_node_id})<-[:is_info]-(p:PrivateData {grant: 'admin'})
+RETURN p
+"""
+
+
+ADMIN_DELETE_USER_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+OPTIONAL MATCH (u)<-[r:is_info]-(p:PrivateData)
+DETACH DELETE u, p
+RETURN COUNT(u) AS deleted_count
+"""
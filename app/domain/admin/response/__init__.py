@@ -1 +1,2 @@
 from .delete_user_response import DeleteUserResponse
+from .slow_queries_response import SlowQueriesResponse
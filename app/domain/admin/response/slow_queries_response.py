@@ -0,0 +1,38 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SlowQueryOperator(BaseModel):
+    operator: str
+    details: Optional[str] = None
+    rows: int
+    db_hits: int
+    depth: int
+
+
+class SlowQueryPlan(BaseModel):
+    db_hits: int
+    rows: int
+    planner: Optional[str] = None
+    runtime: Optional[str] = None
+    available_after_ms: Optional[int] = None
+    consumed_after_ms: Optional[int] = None
+    operators: List[SlowQueryOperator]
+
+
+class SlowQuery(BaseModel):
+    query: str
+    text: str
+    elapsed_ms: float
+    rows: int
+    parameters: List[str]
+    captured_at: str
+    # skipped, pending, done, failed
+    profile_status: str
+    profile_error: Optional[str] = None
+    plan: Optional[SlowQueryPlan] = None
+
+
+class SlowQueriesResponse(BaseModel):
+    threshold_ms: float
+    queries: List[SlowQuery]
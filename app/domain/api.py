@@ -8,6 +8,7 @@ from domain import (
     block_router as block,
     mute_router as mute,
     content_router as content,
+    upload_router as upload,
     user_router as user,
     friend_router as friend,
     test_router as test,
@@ -20,6 +21,7 @@ router.include_router(auth, prefix="/auth", tags=["auth"])
 router.include_router(block, prefix="/block", tags=["block"])
 router.include_router(mute, prefix="/mute", tags=["mute"])
 router.include_router(content, prefix="/content", tags=["content"])
+router.include_router(upload, prefix="/upload", tags=["upload"])
 router.include_router(user, prefix="/user", tags=["user"])
 router.include_router(friend, prefix="/friend", tags=["friend"])
 router.include_router(test, prefix="/test", tags=["test"])
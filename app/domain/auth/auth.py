@@ -6,18 +6,21 @@ import re
 import uuid
 import random
 import string
+import secrets
 from fastapi import HTTPException, APIRouter, Depends, Body, Request, Response
-from app.config.connection import get_session
+from app.repository import GraphRepository, get_repository
+from app.utils.current_user import verify_access_token_cached, evict_access_token
 from app.utils import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
-    verify_access_token,
     verify_refresh_token,
+    current_user,
     Logger,
     send_email,
 )
+from .mail import VERIFICATION_CODE_TEMPLATE, PASSWORD_RESET_TEMPLATE
 from .request import (
     SignInRequest,
     SignUpRequest,
@@ -49,7 +52,7 @@ refresh_token = "refresh_token"
 @router.post("/send-verification-code")
 async def send_verification_code(
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     send_verification_code_request: SendVerificationCodeRequest = Body(...),
 ):
     logger.info("send verify code")
@@ -60,72 +63,49 @@ async def send_verification_code(
             random.choices(string.ascii_uppercase + string.digits, k=6)
         )
         expiration_time = datetime.now() + timedelta(minutes=30)
-        verification_info = (
-            verification_code
-            + " : "
-            + expiration_time.replace(microsecond=0).isoformat()
+        expires_at = expiration_time.replace(microsecond=0).isoformat()
+        verification_info = verification_code + " : " + expires_at
+        message = await repository.record_verification_code(
+            send_verification_code_request.email, verification_info
         )
-        update_query = f"""
-        MATCH (p:PrivateData {{email: '{send_verification_code_request.email}'}})
-        WITH p
-        WHERE p.verification_count < 5
-        SET p.verification_count = p.verification_count + 1, 
-            p.verification_info = '{verification_info}'
-        RETURN 'verification code sent' AS message
-        """
 
-        result = session.run(update_query)
-
-        update_record = result.single()
-
-        if not update_record:
+        if not message:
             raise HTTPException(
                 status_code=400,
                 detail="User not found or exceeded verification attempts",
             )
 
-        if update_record["message"] != "verification code sent":
+        if message != "verification code sent":
             raise HTTPException(status_code=400, detail="Error occurred")
 
-        send_email(
+        # 코드는 메일 워커가 DB 에서 읽어서 보낸다
+        await send_email(
             send_verification_code_request.email,
-            f"Your verification code: '{verification_code}'",
+            VERIFICATION_CODE_TEMPLATE,
+            {"expires_at": expires_at},
         )
 
         return SendVerificationCodeResponse(message="verification code sent")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/verify-code")
 async def verify_code(
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     verification_request: VerificationRequest = Body(...),
 ):
     logger.info("verify code")
 
     try:
         datetimenow = datetime.now().replace(microsecond=0).isoformat()
-        query = f"""
-        MATCH (p:PrivateData {{email: '{verification_request.email}'}})
-        WHERE p.grant = "not-verified"
-        WITH p, right(p.verification_info, 19) AS expiration_time_str
-        WITH p, expiration_time_str, datetime(expiration_time_str) AS expiration_time
-        WHERE expiration_time > datetime("{datetimenow}")
-        WITH p, left(p.verification_info,6) AS verify_code
-        WHERE verify_code = '{verification_request.verifycode}'
-        SET p.grant = 'user'
-        RETURN 'Verified successfully' AS message
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if record == None:
+        verified = await repository.verify_code(
+            verification_request.email, verification_request.verifycode, datetimenow
+        )
+
+        if not verified:
             raise HTTPException(
                 status_code=400,
                 detail="invalid email or request (already verified or expired)",
@@ -135,14 +115,12 @@ async def verify_code(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/signup")
 async def signup(
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     signup_request: SignUpRequest = Body(...),
 ):
     logger.info("signup")
@@ -156,54 +134,35 @@ async def signup(
         )
 
     try:
-        encrypted_password = hash_password(signup_request.password)
+        encrypted_password = await hash_password_async(signup_request.password)
 
         private_node_id = str(uuid.uuid4())
         user_node_id = str(uuid.uuid4())
 
-        query = f"""
-        OPTIONAL MATCH (p:PrivateData {{email: '{signup_request.email}'}})
-        WITH p
-        WHERE p IS NULL
-        CREATE (new_p:PrivateData {{
-                  email: '{signup_request.email}'
-                , password: '{encrypted_password}'
-                , username: '{signup_request.username}'
-                , link_info: ''
-                , verification_info: ''
-                , link_count: 0
-                , verification_count: 0
-                , grant: 'not-verified'
-                , node_id: '{private_node_id}'
-                }})
-        CREATE (u:User {{
-                  username: '{signup_request.username}'
-                , nickname: '{signup_request.nickname}'
-                , tags: {signup_request.tags}
-                , my_memo: ''
-                , node_id: '{user_node_id}'
-                , groups: ['']
-                }})
-        CREATE (new_p)-[:is_info]->(u)
-        RETURN p,new_p,u
-        """
-        result = session.run(query)
-        record = result.single()
-
-        if record == None:
+        created = await repository.signup(
+            signup_request.email,
+            encrypted_password,
+            signup_request.username,
+            signup_request.nickname,
+            signup_request.tags,
+            private_node_id,
+            user_node_id,
+        )
+
+        if not created:
             raise HTTPException(status_code=400, detail="already registered email")
 
         return SignUpResponse()
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/dummy_create")
 async def dummy_create(
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     signup_request: SignUpRequest = Body(...),
 ):
     logger.info("signup-dummy-create")
@@ -217,39 +176,30 @@ async def dummy_create(
         )
 
     try:
-        encrypted_password = hash_password(signup_request.password)
-
-        query = f"""
-        MATCH (p:PrivateData {{email: '{signup_request.email}'}})
-        RETURN p
-        """
-        result = session.run(query, email=signup_request.email)
-        record = result.single()
-
-        if record:
+        if await repository.get_private_data(signup_request.email):
             return {"message": "Email already exists. Please use a different email."}
 
+        encrypted_password = await hash_password_async(signup_request.password)
         private_node_id = str(uuid.uuid4())
         user_node_id = str(uuid.uuid4())
-        create_query = f"""
-        CREATE (p:PrivateData {{email: '{signup_request.email}', password: '{encrypted_password}', username: '{signup_request.username}',
-                               link_info: '', verification_info: '', link_count: 0,
-                               verification_count: 0, grant: 'user', node_id: '{private_node_id}',profile_image_url:'{signup_request.profile_image_url}'}})
-        CREATE (u:User {{username: '{signup_request.username}', nickname: '{signup_request.nickname}', tags: {signup_request.tags}, my_memo: '',node_id: '{user_node_id}'}})
-        MERGE (p)-[:is_info]->(u)
-        RETURN p, u
-        """
-
-        result = session.run(create_query)
-        record = result.single()
+        await repository.dummy_create(
+            signup_request.email,
+            encrypted_password,
+            signup_request.username,
+            signup_request.nickname,
+            signup_request.tags,
+            private_node_id,
+            user_node_id,
+            getattr(signup_request, "profile_image_url", ""),
+        )
 
         token = create_access_token(user_node_id)
         response.set_cookie(key=access_token, value=f"{token}", httponly=True)
         return SignUpResponse()
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.get("/verify-access-token")
@@ -260,7 +210,7 @@ async def verify_access_token_api(request: Request):
     if not token:
         raise HTTPException(status_code=401, detail="access token missing")
     try:
-        user_node_id = verify_access_token(token)["user_node_id"]
+        user_node_id = verify_access_token_cached(token)["user_node_id"]
         return user_node_id
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -286,27 +236,20 @@ async def refresh_acc_token(request: Request, response: Response):
 @router.post("/signin")
 async def signin(
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     signin_request: SignInRequest = Body(...),
 ):
     logger.info("signin")
 
-    query = f"""
-    MATCH (p:PrivateData {{email: '{signin_request.email}'}})
-    MATCH (p)-[:is_info]->(u)
-    RETURN p.password AS password, p.grant AS grant, u.node_id AS user_node_id
-    """
-
     try:
-        result = session.run(query)
-        record = result.single()
+        record = await repository.get_credentials(signin_request.email)
 
         if not record:
             raise HTTPException(status_code=400, detail="not registered email")
 
         password = record["password"]
         grant = record["grant"]
-        if not verify_password(signin_request.password, password):
+        if not await verify_password_async(signin_request.password, password):
             raise HTTPException(status_code=400, detail="inconsistent password")
 
         if grant == "not-verified":
@@ -336,8 +279,6 @@ async def signin(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/logout")
@@ -348,7 +289,9 @@ async def logout(request: Request, response: Response):
     if not token:
         raise HTTPException(status_code=401, detail="access token missing")
 
-    verify_access_token(token)
+    verify_access_token_cached(token)
+    # 로그아웃한 토큰은 검증 캐시에서 바로 뺀다
+    evict_access_token(token)
 
     if token:
         response.delete_cookie(key=access_token)
@@ -361,110 +304,78 @@ async def logout(request: Request, response: Response):
 @router.post("/pw/reset")
 async def pw_reset(
     request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     pw_reset_request: PwResetRequest = Body(...),
 ):
 
     logger.info("reset password")
 
     try:
-        random_password = "".join(
-            random.choices(string.ascii_letters + string.digits, k=10)
-        )
-        hashed_password = hash_password(random_password)
-        query = f"""
-        MATCH (p:PrivateData {{email: '{pw_reset_request.email}'}})
-        WHERE NOT p.grant = 'not-verified' 
-        SET p.password = '{hashed_password}'
-        RETURN 'Password reset successfully' AS message, p.email AS email
-        """
-
-        result = session.run(query)
-        record = result.single()
+        record = await repository.get_credentials(pw_reset_request.email)
 
-        if not record:
+        if not record or record["grant"] == "not-verified":
             raise HTTPException(
                 status_code=400,
                 detail="Error occurred during password reset or not verified",
             )
 
-        # 이메일로 랜덤 생성 비밀번호 전송
-        send_email(
-            record["email"],
-            f"Password Reset : '{random_password}'. Change your password after login",
+        # 임시 비밀번호는 메일 워커가 nonce 로 만들고, 메일이 나간 뒤에 저장한다
+        await send_email(
+            pw_reset_request.email,
+            PASSWORD_RESET_TEMPLATE,
+            {"nonce": secrets.token_urlsafe(16)},
         )
 
         return PwResetResponse(message="Password reset successfully, check your email")
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/pw/change")
 async def pw_change(
     request: Request,
     response: Response,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     pw_change_req: PwChangeRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("pw change")
-    token = request.cookies.get(access_token)
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token missing")
+    new_pw = pw_change_req.changepw
 
-    token_payload = verify_access_token(token)
-    user_node_id = token_payload.get("user_node_id")
-
-    if not user_node_id:
-        raise HTTPException(status_code=400, detail="Invalid input")
+    if not re.match(
+        r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*(),.?":{}|<>]).{8,}$', new_pw
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="New password must contain at least one lowercase letter, one uppercase letter, one number, and one special character, and must be at least 8 characters long",
+        )
 
     try:
         # 현재 비밀번호 가져오기
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})<-[:is_info]-(p:PrivateData)
-        RETURN p.password AS password
-        """
-        result = session.run(query)
-        record = result.single()
+        password = await repository.get_password(user_node_id)
 
-        if not record:
+        if not password:
             raise HTTPException(status_code=400, detail="User not found")
 
-        password = record["password"]
-
-        new_pw = pw_change_req.changepw
-
-        if not re.match(
-            r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*(),.?":{}|<>]).{8,}$', new_pw
-        ):
-            raise HTTPException(
-                status_code=400,
-                detail="New password must contain at least one lowercase letter, one uppercase letter, one number, and one special character, and must be at least 8 characters long",
-            )
+        # 현재 비밀번호를 먼저 확인하고, 새 비밀번호는 모든 검사를 통과한 뒤에만 해싱한다
+        if not await verify_password_async(pw_change_req.currentpw, password):
+            raise HTTPException(status_code=400, detail="Incorrect current password")
 
-        if verify_password(pw_change_req.changepw, password):
+        # currentpw 가 해시와 일치함이 확인됐으므로 평문 비교만으로 충분하다
+        if new_pw == pw_change_req.currentpw:
             raise HTTPException(
                 status_code=400,
                 detail="Changed password should not be the same as the current password",
             )
 
-        hashed_new_pw = hash_password(new_pw)
-
-        if not verify_password(pw_change_req.currentpw, password):
-            raise HTTPException(status_code=400, detail="Incorrect current password")
+        hashed_new_pw = await hash_password_async(new_pw)
 
-        update_query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})<-[:is_info]-(p:PrivateData)
-        SET p.password = '{hashed_new_pw}'
-        RETURN 'Password changed successfully' AS message
-        """
-        result = session.run(update_query)
-        update_record = result.single()
+        message = await repository.change_password(user_node_id, hashed_new_pw)
 
-        if update_record["message"] != "Password changed successfully":
+        if message != "Password changed successfully":
             raise HTTPException(status_code=400, detail="Error occurred")
 
         return PwChangeResponse(message="Password changed successfully")
@@ -472,43 +383,28 @@ async def pw_change(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/signout")
 async def signout(
     response: Response,
     request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("signout")
     try:
-        token = request.cookies.get(access_token)
+        message = await repository.delete_account(user_node_id)
 
-        if not token:
-            raise HTTPException(status_code=401, detail="Access token missing")
-
-        token_payload = verify_access_token(token)
-        user_node_id = token_payload.get("user_node_id")
-        if not user_node_id:
-            raise HTTPException(status_code=400, detail="Invalid input")
-
-        delete_user_query = f"""
-            MATCH (u:User {{node_id: '{user_node_id}'}})<-[r:is_info]-(p: PrivateData)
-            DETACH DELETE p, u
-            RETURN 'User deleted successfully' AS message
-        """
-        result = session.run(delete_user_query)
-        record = result.single()
-
-        if record["message"] == "User deleted successfully":
+        if message == "User deleted successfully":
+            # 탈퇴한 계정의 토큰은 검증 캐시에서 바로 뺀다
+            evict_access_token(request.cookies.get(access_token))
             response.delete_cookie(key=access_token)
             response.delete_cookie(key=refresh_token)
             return SignOutResponse()
         else:
             raise HTTPException(status_code=500, detail="Failed to sign out")
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
@@ -0,0 +1,77 @@
+# backend/domain/auth/mail.py
+import hashlib
+import hmac
+import string
+from app.repository import open_repository
+from app.utils import hash_password_async
+from app.utils.jwt_utils import SECRET_KEY
+from app.utils.mail_outbox import mail_outbox, PermanentMailError
+
+# 인증 메일 본문은 보낼 때 만든다. outbox 에는 비밀 값이 아닌 파라미터만 저장된다
+
+VERIFICATION_CODE_TEMPLATE = "verification_code"
+PASSWORD_RESET_TEMPLATE = "password_reset"
+TEMPORARY_PASSWORD_ALPHABET = string.ascii_letters + string.digits
+TEMPORARY_PASSWORD_LENGTH = 10
+
+
+async def render_verification_code(email: str, params: dict):
+    # 코드는 DB 에서 읽는다. expires_at 은 이 메시지를 넣을 때 저장한 만료 시각이다
+    async with open_repository() as repository:
+        private_data = await repository.get_private_data(email)
+
+    if not private_data:
+        raise PermanentMailError("not registered email")
+
+    # verification_info 는 "코드 : 만료 시각" 형식이다
+    verification_info = private_data.get("verification_info") or ""
+    expires_at = verification_info[-19:]
+    if expires_at > params["expires_at"]:
+        raise PermanentMailError("superseded by a newer verification code")
+    if expires_at != params["expires_at"]:
+        # 방금 쓴 코드가 아직 보이지 않는다 (읽기 복제본 지연). 다음 시도에서 다시 읽는다
+        raise RuntimeError("verification code not visible yet")
+
+    verification_code = verification_info[:6]
+    return "Your verification code", f"Your verification code: '{verification_code}'"
+
+
+def _temporary_password(email: str, params: dict) -> str:
+    # outbox 항목의 nonce 와 서버 키로 만든다. 같은 항목을 다시 보내도 같은 비밀번호가 나오고,
+    # outbox 에 남는 nonce 만으로는 비밀번호를 알 수 없다
+    nonce = params.get("nonce")
+    if not nonce:
+        raise PermanentMailError("password reset without nonce")
+    digest = hmac.new(
+        SECRET_KEY.encode(), f"{email}:{nonce}".encode(), hashlib.sha256
+    ).digest()
+    return "".join(
+        TEMPORARY_PASSWORD_ALPHABET[byte % len(TEMPORARY_PASSWORD_ALPHABET)]
+        for byte in digest[:TEMPORARY_PASSWORD_LENGTH]
+    )
+
+
+async def render_password_reset(email: str, params: dict):
+    # 비밀번호는 메일이 나간 뒤 commit_password_reset 에서 바꾼다. 보내지 못하면 예전 비밀번호가 그대로다
+    async with open_repository() as repository:
+        credentials = await repository.get_credentials(email)
+    if not credentials or credentials["grant"] == "not-verified":
+        raise PermanentMailError("not registered or not verified email")
+
+    return (
+        "Your password has been reset",
+        f"Password Reset : '{_temporary_password(email, params)}'. Change your password after login",
+    )
+
+
+async def commit_password_reset(email: str, params: dict):
+    hashed_password = await hash_password_async(_temporary_password(email, params))
+    async with open_repository() as repository:
+        if not await repository.reset_password(email, hashed_password):
+            raise PermanentMailError("not registered or not verified email")
+
+
+mail_outbox.register_template(VERIFICATION_CODE_TEMPLATE, render_verification_code)
+mail_outbox.register_template(
+    PASSWORD_RESET_TEMPLATE, render_password_reset, on_sent=commit_password_reset
+)
@@ -0,0 +1,100 @@
+SEND_VERIFICATION_CODE_QUERY = """
+MATCH (p:PrivateData {email: $email})
+WITH p
+WHERE p.verification_count < 5
+SET p.verification_count = p.verification_count + 1,
+    p.verification_info = $verification_info
+RETURN 'verification code sent' AS message
+"""
+
+
+VERIFY_CODE_QUERY = """
+MATCH (p:PrivateData {email: $email})
+WHERE p.grant = "not-verified"
+WITH p, right(p.verification_info, 19) AS expiration_time_str
+WITH p, expiration_time_str, datetime(expiration_time_str) AS expiration_time
+WHERE expiration_time > datetime($now)
+WITH p, left(p.verification_info,6) AS verify_code
+WHERE verify_code = $verify_code
+SET p.grant = 'user'
+RETURN 'Verified successfully' AS message
+"""
+
+
+SIGNUP_QUERY = """
+OPTIONAL MATCH (p:PrivateData {email: $email})
+WITH p
+WHERE p IS NULL
+CREATE (new_p:PrivateData {
+          email: $email
+        , password: $password
+        , username: $username
+        , link_info: ''
+        , verification_info: ''
+        , link_count: 0
+        , verification_count: 0
+        , grant: 'not-verified'
+        , node_id: $private_node_id
+        })
+CREATE (u:User {
+          username: $username
+        , nickname: $nickname
+        , tags: $tags
+        , my_memo: ''
+        , node_id: $user_node_id
+        , groups: ['']
+        })
+CREATE (new_p)-[:is_info]->(u)
+RETURN p,new_p,u
+"""
+
+
+GET_PRIVATE_DATA_BY_EMAIL_QUERY = """
+MATCH (p:PrivateData {email: $email})
+RETURN p
+"""
+
+
+DUMMY_CREATE_QUERY = """
+CREATE (p:PrivateData {email: $email, password: $password, username: $username,
+                       link_info: '', verification_info: '', link_count: 0,
+                       verification_count: 0, grant: 'user', node_id: $private_node_id, profile_image_url: $profile_image_url})
+CREATE (u:User {username: $username, nickname: $nickname, tags: $tags, my_memo: '', node_id: $user_node_id})
+MERGE (p)-[:is_info]->(u)
+RETURN p, u
+"""
+
+
+SIGNIN_QUERY = """
+MATCH (p:PrivateData {email: $email})
+MATCH (p)-[:is_info]->(u)
+RETURN p.password AS password, p.grant AS grant, u.node_id AS user_node_id
+"""
+
+
+PW_RESET_QUERY = """
+MATCH (p:PrivateData {email: $email})
+WHERE NOT p.grant = 'not-verified'
+SET p.password = $password
+RETURN 'Password reset successfully' AS message, p.email AS email
+"""
+
+
+GET_PASSWORD_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[:is_info]-(p:PrivateData)
+RETURN p.password AS password
+"""
+
+
+CHANGE_PASSWORD_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[:is_info]-(p:PrivateData)
+SET p.password = $password
+RETURN 'Password changed successfully' AS message
+"""
+
+
+SIGNOUT_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[r:is_info]-(p: PrivateData)
+DETACH DELETE p, u
+RETURN 'User deleted successfully' AS message
+"""
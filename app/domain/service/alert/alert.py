@@ -1,60 +1,45 @@
-import asyncio
 from typing import List
 from datetime import datetime, timezone
-from fastapi import HTTPException, APIRouter, Depends, Body, Request
-from app.utils import verify_access_token, Logger
-from app.config.connection import get_session
+from fastapi import HTTPException, APIRouter, Depends, Body
+from app.utils import current_user, Logger, hub
+from app.repository import open_repository
+from app.utils.metrics import long_poll_waiters
 
 logger = Logger(__file__)
 router = APIRouter()
-ACCESS_TOKEN = "access_token"
+LONG_POLLING_TIMEOUT = 30
+
+
+async def _fetch_alerts(user_node_id: str) -> dict:
+    alerts = {"new_roommates": [], "stickers_from": [], "casts_received": []}
+    try:
+        async with open_repository(user_node_id) as repository:
+            record = await repository.get_alerts(user_node_id)
+
+        # 알림이 하나도 없으면 레코드가 없다
+        if not record:
+            return alerts
+
+        for key in alerts:
+            if record.get(key):
+                alerts[key] = record[key]
+        return alerts
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/get-members")
 async def get_alerts(
-    request: Request,
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
-    for _ in range(3):
-        alerts = {"new_roommates": [], "stickers_from": [], "casts_received": []}
-        session = get_session()
-        try:
-            query = f"""
-            MATCH (me:User {{node_id: '{user_node_id}'}})
-            with me
-            match (me)<-[new_roommate_edge:is_roommate {{new:true}}]-(new_roommate:User)
-            set new_roommate_edge.new = false
-            with me, collect(new_roommate) as new_roommates
-            MATCH (me)<-[:receiver_of_cast {{new:true}}]-(cast:Cast)<-[:creator_of_cast]-(cast_creator:User)
-            return me,new_roommates,cast,cast_creator
-            """
-
-            result = session.run(query)
-            record = result.single()
-
-            if not record:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"no such user {user_node_id} or its alertBox",
-                )
-
-            if record["new_roommates"]:
-                alerts["new_roommates"] = record["new_roommates"]
-            if record["stickers_from"]:
-                alerts["stickers_from"] = record["stickers_from"]
-            if record["casts_received"]:
-                alerts["casts_received"] = record["casts_received"]
-
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        finally:
-            session.close()
-
-        if any(alerts.values()):
-            return {"alerts": alerts}
-        else:
-            await asyncio.sleep(10)
-
+    with long_poll_waiters.labels("get_alerts").track_inprogress():
+        alerts = await hub.poll(
+            user_node_id,
+            _fetch_alerts,
+            lambda alerts: not any(alerts.values()),
+            LONG_POLLING_TIMEOUT,
+        )
     return {"alerts": alerts}
@@ -0,0 +1,9 @@
+GET_ALERTS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+with me
+match (me)<-[new_roommate_edge:is_roommate {new:true}]-(new_roommate:User)
+set new_roommate_edge.new = false
+with me, collect(new_roommate) as new_roommates
+MATCH (me)<-[:receiver_of_cast {new:true}]-(cast:Cast)<-[:creator_of_cast]-(cast_creator:User)
+return me,new_roommates,cast,cast_creator
+"""
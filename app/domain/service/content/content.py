@@ -1,9 +1,9 @@
 # backend/domain/service/content/content.py
-import asyncio
-import mimetypes
-from urllib.parse import quote, unquote
-from typing import List
-from datetime import datetime, timezone
+import json
+import os
+import time
+from typing import List, Optional, Union
+from datetime import datetime, timedelta, timezone
 from fastapi import (
     File,
     Form,
@@ -11,21 +11,29 @@ from fastapi import (
     APIRouter,
     Depends,
     Body,
-    Request,
+    Query,
     UploadFile,
 )
-from botocore.exceptions import (
-    ConnectTimeoutError,
-    ReadTimeoutError,
-    EndpointConnectionError,
+from app.utils.roommate_index import roommate_index
+from app.utils.s3_client import s3_key_from_url
+from app.utils.s3_delete_queue import s3_delete_queue
+from app.utils.s3_uploader import uploaded_images
+from app.utils.pagination import decode_cursor, page_limit, split_page
+from app.utils.json_response import model_response, json_bytes_response
+from app.utils.metrics import long_poll_waiters
+from app.utils import current_user, Logger, dispatcher, hub, feed_cache
+from pydantic_core import to_json
+from app.config.connection import open_session
+from app.repository import GraphRepository, get_repository, open_repository
+from .feed import invalidate_feeds
+from .query import (
+    MARK_EXPIRED_STICKERS_QUERY,
+    GET_PURGEABLE_STICKERS_QUERY,
+    PURGE_STICKERS_QUERY,
+    GET_STICKER_PURGE_CHECKPOINT_QUERY,
+    SAVE_STICKER_PURGE_CHECKPOINT_QUERY,
+    DELETE_OLD_CASTS_QUERY,
 )
-from app.utils.s3_client import s3_client
-from app.config.connection import (
-    S3_REGION,
-    S3_BUCKET_NAME,
-)
-from app.utils import verify_access_token, Logger
-from app.config.connection import get_session
 from .request import (
     GetStickersRequest,
     DeleteStickerRequest,
@@ -40,10 +48,13 @@ from .request import (
 from .response import (
     CreateStickerResponse,
     GetStickersResponse,
+    GetStickersPageResponse,
     GetMyStickersResponse,
+    GetMyStickersPageResponse,
     DeleteStickerResponse,
     CreatePostResponse,
     GetPostsResponse,
+    GetPostsPageResponse,
     DeleteMyPostResponse,
     SendCastResponse,
     GetContentsResponse,
@@ -54,415 +65,410 @@ from .response import (
 
 logger = Logger(__file__)
 router = APIRouter()
-ACCESS_TOKEN = "access_token"
+LONG_POLLING_TIMEOUT = 30
+CAST_EXPIRY_BATCH_SIZE = int(os.getenv("CAST_EXPIRY_BATCH_SIZE", 1000))
+STICKER_EXPIRY_BATCH_SIZE = int(os.getenv("STICKER_EXPIRY_BATCH_SIZE", 500))
+STICKER_LIFETIME_HOURS = 24
+# 만료된 스티커를 완전히 지우기 전까지 남겨두는 기간
+STICKER_RETENTION_DAYS = int(os.getenv("STICKER_RETENTION_DAYS", 7))
+
+
+def _content_cursor(content) -> tuple:
+    return content["created_at"], content["node_id"]
+
+
+# delete_old_casts 실행 통계
+cast_expiry_stats = {
+    "runs": 0,
+    "processed_total": 0,
+    "last_processed": 0,
+    "last_duration_seconds": 0.0,
+}
 
 
 @router.post("/sticker/create")
 async def create_sticker(
-    request: Request,
     content: str = Form(""),
     images: List[UploadFile] = File([]),
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
-    uploaded_image_urls = []
     logger.info("create_sticker")
-    token = request.cookies.get(ACCESS_TOKEN)
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-    user_node_id = verify_access_token(token)["user_node_id"]
     datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
     try:
-        for index, image in enumerate(images):
-            s3_key = f"{user_node_id}/sticker/{datetimenow}/{index}_{image.filename}"
-            encoded_s3_key = quote(s3_key)
-            image_url = f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{encoded_s3_key}"
-
-            mime_type, _ = mimetypes.guess_type(image.filename)
-            extra_args = {"ContentType": mime_type, "ACL": "public-read"}
-            try:
-                s3_client.upload_fileobj(
-                    image.file,
-                    S3_BUCKET_NAME,
-                    s3_key,
-                    ExtraArgs=extra_args,
-                )
-                uploaded_image_urls.append(image_url)
-            except s3_client.exceptions.ClientError as e:
-                logger.error(f"Failed to upload {image.filename} to S3: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail=f"Failed to upload {image.filename} to S3"
-                ) from e
-
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        CREATE (s:Sticker {{
-                content : '{content}',
-                image_url : {uploaded_image_urls},
-                created_at : '{datetimenow}',
-                deleted_at : '',
-                node_id : randomUUID()
-            }})
-        CREATE (s)-[creator:creator_of_sticker {{edge_id : randomUUID()}}]->(u)
-        RETURN creator
-        """
-        result = session.run(query)
-        record = result.single()
-        logger.info(f"""create_sticker success {record}""")
+        async with uploaded_images(
+            images, f"{user_node_id}/sticker/{datetimenow}"
+        ) as image_urls:
+            sticker_node_id = await repository.create_sticker(
+                user_node_id, content, image_urls, datetimenow
+            )
+            logger.debug("create_sticker success %s", sticker_node_id)
 
-        if not record:
-            raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
+            if not sticker_node_id:
+                raise HTTPException(
+                    status_code=404, detail=f"no such user {user_node_id}"
+                )
 
+        await invalidate_feeds(repository, [user_node_id])
+        dispatcher.dispatch(dispatcher.STICKER_FANOUT_REQUESTED, [sticker_node_id])
         return CreateStickerResponse()
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"S3 upload fails: {str(e)}")
 
-    finally:
-        session.close()
-
 
-@router.post("/sticker/get-members", response_model=List[GetStickersResponse])
+@router.post(
+    "/sticker/get-members",
+    response_model=Union[List[GetStickersResponse], GetStickersPageResponse],
+)
 async def get_stickers(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     get_sticker_request: GetStickersRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
+    paginated = (
+        get_sticker_request.limit is not None or get_sticker_request.cursor is not None
+    )
     try:
-        query = f"""
-        OPTIONAL MATCH (me: User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (friend:User {{node_id: '{get_sticker_request.user_node_id}'}})
-        OPTIONAL MATCH (friend)<-[:creator_of_sticker]-(sticker:Sticker)
-        WHERE sticker.deleted_at = ""
-        WITH friend, me, collect(sticker) AS stickers
-        RETURN 
-        CASE 
-            WHEN me IS NULL THEN "no such node {user_node_id}"
-            WHEN friend IS NULL THEN "no such node {get_sticker_request.user_node_id}"
-            WHEN EXISTS((me)-[:block]-(friend)) THEN "block exists"
-            WHEN EXISTS((me)-[:mute]->(friend)) THEN "mute exists"
-            ELSE "get stickers"
-        END AS message, stickers
-        """
-
-        result = session.run(query)
-        record = result.single()
-        logger.info(f"""get_stickers success {record}""")
-
-        if record["message"] != "get stickers":
-            raise HTTPException(status_code=404, detail=record["message"])
-
-        return [
-            GetStickersResponse.from_data(dict(sticker))
-            for sticker in record["stickers"]
-        ]
+        if paginated:
+            page_size = page_limit(get_sticker_request.limit)
+            message, stickers = await repository.list_stickers(
+                user_node_id,
+                get_sticker_request.user_node_id,
+                # 다음 페이지가 있는지 알기 위해 하나 더 가져온다
+                limit=page_size + 1,
+                cursor=decode_cursor(get_sticker_request.cursor, 2),
+            )
+        else:
+            message, stickers = await repository.list_stickers(
+                user_node_id, get_sticker_request.user_node_id
+            )
+        logger.debug("get_stickers success %s", message)
+
+        if message != "get stickers":
+            raise HTTPException(status_code=404, detail=message)
+
+        if not paginated:
+            return model_response(
+                [GetStickersResponse.from_data(sticker) for sticker in stickers]
+            )
+
+        stickers, next_cursor = split_page(stickers, page_size, _content_cursor)
+        return model_response(
+            GetStickersPageResponse(
+                stickers=[GetStickersResponse.from_data(sticker) for sticker in stickers],
+                next_cursor=next_cursor,
+            )
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-@router.get("/sticker/get-my-contents", response_model=List[GetMyStickersResponse])
-async def get_my_stickers(request: Request, session=Depends(get_session)):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
+@router.get(
+    "/sticker/get-my-contents",
+    response_model=Union[List[GetMyStickersResponse], GetMyStickersPageResponse],
+)
+async def get_my_stickers(
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
+):
+    paginated = limit is not None or cursor is not None
     try:
-        query = f"""
-        MATCH (me: User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (me)<-[:creator_of_sticker]-(sticker:Sticker)
-        WHERE sticker.deleted_at = "" 
-        RETURN collect(sticker) AS stickers
-        """
-
-        result = session.run(query)
-        record = result.single()
+        if paginated:
+            page_size = page_limit(limit)
+            stickers = await repository.list_my_stickers(
+                user_node_id, limit=page_size + 1, cursor=decode_cursor(cursor, 2)
+            )
+        else:
+            stickers = await repository.list_my_stickers(user_node_id)
 
-        if not record:
+        if stickers is None:
             raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
 
-        return [
-            GetMyStickersResponse.from_data(dict(sticker))
-            for sticker in record["stickers"]
-        ]
+        if not paginated:
+            return model_response(
+                [GetMyStickersResponse.from_data(sticker) for sticker in stickers]
+            )
+
+        stickers, next_cursor = split_page(stickers, page_size, _content_cursor)
+        return model_response(
+            GetMyStickersPageResponse(
+                stickers=[GetMyStickersResponse.from_data(sticker) for sticker in stickers],
+                next_cursor=next_cursor,
+            )
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.put("/sticker/read")
 async def put_receiver_of_sticker_as_read(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     read_sticker_request: ReadStickerRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     try:
-        query = f"""
-        MATCH (me:User {{node_id:'{user_node_id}'}})<-[receiver_of_sticker_edge:receiver_of_sticker]-(sticker:Sticker {{node_id:'{read_sticker_request.sticker_id}'}})
-        SET receiver_of_sticker_edge.read = true
-        RETURN receiver_of_sticker_edge
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        if not await repository.read_sticker(
+            user_node_id, read_sticker_request.sticker_id
+        ):
             raise HTTPException(
                 status_code=500,
                 detail=f"""invalid receiver_of_sticker_edge between {user_node_id},{read_sticker_request.sticker_id}""",
             )
 
+        # 읽은 스티커는 내 피드에서만 빠진다
+        await feed_cache.invalidate([user_node_id])
+
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/sticker/delete", response_model=DeleteStickerResponse)
 async def delete_sticker(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     delete_sticker_request: DeleteStickerRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
     datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
     try:
-        if len(delete_sticker_request.sticker_image_urls) != 0:
-            for image_url in delete_sticker_request.sticker_image_urls:
-                file_name = "/".join(image_url.split("/")[3:])
-                file_name = unquote(file_name)
-                try:
-                    s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key=file_name)
-                except ConnectTimeoutError:
-                    logger.error("스티커 삭제 S3 연결 시간 초과 - 재시도 필요")
-                except ReadTimeoutError:
-                    logger.error("스티커 삭제 S3 응답 대기 시간 초과 - 재시도 필요")
-                except EndpointConnectionError:
-                    logger.error("스티커 삭제 S3 엔드포인트 연결 실패 - URL 확인 필요")
-        query = f"""
-        OPTIONAL MATCH (me:User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (sticker:Sticker {{node_id: '{delete_sticker_request.sticker_node_id}'}})
-        OPTIONAL MATCH (sticker)-[r:creator_of_sticker]->(me)
-        WITH me, sticker, r
-        CALL apoc.do.case(
-        [
-            me IS NULL, 'RETURN "User does not exist" AS message',
-            sticker IS NULL, 'RETURN "Sticker does not exist" AS message',
-            r IS NULL, 'RETURN "Relationship does not exist" AS message'
-        ],
-        'SET sticker.deleted_at = "{datetimenow}"  RETURN "Sticker and relationship deleted" AS message',
-        {{sticker: sticker}}
-        ) YIELD value
-        RETURN value.message AS message
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if record["message"] != "Sticker and relationship deleted":
-            logger.error(f"delete_sticker error: {record['message']}")
-            raise HTTPException(status_code=500, detail=record["message"])
-        return DeleteStickerResponse(message=record["message"])
+        message, image_urls = await repository.delete_sticker(
+            user_node_id, delete_sticker_request.sticker_node_id, datetimenow
+        )
+
+        if message != "Sticker and relationship deleted":
+            logger.error(f"delete_sticker error: {message}")
+            raise HTTPException(status_code=500, detail=message)
+
+        await invalidate_feeds(repository, [user_node_id])
+
+        # 이미지 키는 클라이언트가 보낸 값이 아니라 그래프에 기록된 값을 쓴다
+        await s3_delete_queue.enqueue(
+            [s3_key_from_url(image_url) for image_url in image_urls]
+        )
+        return DeleteStickerResponse(message=message)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-async def delete_old_stickers():
-    session = get_session()
-    datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+async def _save_sticker_purge_checkpoint(session, node_ids, keys):
+    result = await session.run(
+        SAVE_STICKER_PURGE_CHECKPOINT_QUERY,
+        pending_node_ids=node_ids,
+        pending_keys=keys,
+        updated_at=datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+    )
+    await result.consume()
 
-    try:
-        query = f"""
-        MATCH (s:Sticker)
-        WHERE datetime(s.created_at) <= datetime() - duration({{hours: 24}})
-        SET s.deleted_at = '{datetimenow}'
-        RETURN s
-        """
 
-        result = session.run(query)
-        record = result.single()
+async def _purge_sticker_batch(session, node_ids, keys):
+    # 체크포인트에 배치를 먼저 기록해 두면 노드 삭제 도중 죽어도 다음 실행에서 이어서 처리한다.
+    # S3 객체는 삭제 큐가 재시도까지 맡는다.
+    await _save_sticker_purge_checkpoint(session, node_ids, keys)
 
-    except Exception as e:
-        raise e
-    finally:
-        session.close()
+    await s3_delete_queue.enqueue(keys)
+
+    result = await session.run(PURGE_STICKERS_QUERY, node_ids=node_ids)
+    await result.consume()
+
+    await _save_sticker_purge_checkpoint(session, [], [])
+
+
+async def delete_old_stickers():
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    expired_before = (now - timedelta(hours=STICKER_LIFETIME_HOURS)).isoformat()
+    purge_before = (now - timedelta(days=STICKER_RETENTION_DAYS)).isoformat()
+    purged = 0
+
+    async with open_session() as session:
+        # 1. 만료된 스티커에 삭제 표시
+        result = await session.run(
+            MARK_EXPIRED_STICKERS_QUERY,
+            expired_before=expired_before,
+            deleted_at=now.isoformat(),
+            batch_size=STICKER_EXPIRY_BATCH_SIZE,
+        )
+        record = await result.single()
+        marked = record["marked"] if record else 0
+
+        # 2. 이전 실행이 끝내지 못한 배치부터 마무리
+        result = await session.run(GET_STICKER_PURGE_CHECKPOINT_QUERY)
+        checkpoint = await result.single()
+        if checkpoint["pending_node_ids"]:
+            await _purge_sticker_batch(
+                session, checkpoint["pending_node_ids"], checkpoint["pending_keys"]
+            )
+            purged += len(checkpoint["pending_node_ids"])
+
+        # 3. 보관 기간이 지난 스티커의 이미지를 S3 에서 지우고 노드를 삭제
+        while True:
+            result = await session.run(
+                GET_PURGEABLE_STICKERS_QUERY,
+                purge_before=purge_before,
+                batch_size=STICKER_EXPIRY_BATCH_SIZE,
+            )
+            records = await result.data()
+            if not records:
+                break
+
+            node_ids = [record["node_id"] for record in records]
+            keys = [
+                s3_key_from_url(image_url)
+                for record in records
+                for image_url in record["image_url"] or []
+            ]
+            await _purge_sticker_batch(session, node_ids, keys)
+            purged += len(node_ids)
+
+    if marked:
+        await feed_cache.clear()
+    logger.info(f"delete_old_stickers marked={marked} purged={purged}")
 
 
 @router.post("/post/create", response_model=CreatePostResponse)
 async def create_post(
-    request: Request,
     content: str = Form(...),
     images: List[UploadFile] = File([]),
     is_public: bool = True,
     title: str = Form(...),
     tags: List[str] = Form([""]),
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
-    uploaded_image_urls = []
     logger.info("create_post")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
     try:
-        for index, image in enumerate(images):
-            s3_key = f"{user_node_id}/post/{datetimenow}/{index}_{image.filename}"
-            encoded_s3_key = quote(s3_key)
-            image_url = f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{encoded_s3_key}"
-
-            mime_type, _ = mimetypes.guess_type(image.filename)
-            extra_args = {"ContentType": mime_type, "ACL": "public-read"}
-            try:
-                s3_client.upload_fileobj(
-                    image.file,
-                    S3_BUCKET_NAME,
-                    s3_key,
-                    ExtraArgs=extra_args,
-                )
-                uploaded_image_urls.append(image_url)
-            except s3_client.exceptions.ClientError as e:
-                logger.error(f"Failed to upload {image.filename} to S3: {str(e)}")
-                raise HTTPException(
-                    status_code=500, detail=f"Failed to upload {image.filename} to S3"
-                ) from e
-
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        CREATE (p:Post {{
-                content : '{content}',
-                image_url : {uploaded_image_urls},
-                is_public : {is_public},
-                title : '{title}',
-                tags : {tags[0]},
-                created_at : '{datetimenow}',
-                node_id : randomUUID()
-            }})
-        CREATE (p)-[is_post:is_post {{edge_id : randomUUID()}}]->(u)
-        RETURN is_post
-        """
-
-        result = session.run(query)
-        record = result.single()
+        tags = json.loads(tags[0])
 
-        if not record:
-            raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
+        async with uploaded_images(
+            images, f"{user_node_id}/post/{datetimenow}"
+        ) as image_urls:
+            created = await repository.create_post(
+                user_node_id, content, image_urls, is_public, title, tags, datetimenow
+            )
+
+            if not created:
+                raise HTTPException(
+                    status_code=404, detail=f"no such user {user_node_id}"
+                )
 
-        return CreatePostResponse
+        return CreatePostResponse()
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-@router.post("/post/get-contents", response_model=List[GetPostsResponse])
+@router.post(
+    "/post/get-contents",
+    response_model=Union[List[GetPostsResponse], GetPostsPageResponse],
+)
 async def get_posts(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     get_post_request: GetPostsRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
+    paginated = get_post_request.limit is not None or get_post_request.cursor is not None
     try:
-        query = f"""
-        OPTIONAL MATCH (me: User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (friend:User {{node_id: '{get_post_request.user_node_id}'}})
-        OPTIONAL MATCH (me)<-[b:block]-(friend)
-        OPTIONAL MATCH (me)-[m:mute]->(friend)
-        OPTIONAL MATCH (friend)<-[:is_post]-(post:Post {{is_public : true}})
-        WITH friend, me, b, m, collect(post) AS posts
-        RETURN 
-        CASE 
-            WHEN me IS NULL THEN "no such user {user_node_id}"
-            WHEN friend IS NULL THEN "no such friend {get_post_request.user_node_id}"
-            WHEN b IS NOT NULL THEN "is_blocked exists"
-            WHEN m IS NOT NULL THEN "mute exists"
-            ELSE "get posts"
-        END AS message, 
-        posts
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if record["message"] != "get posts":
-            raise HTTPException(status_code=404, detail=record["message"])
-
-        return [GetPostsResponse.from_data(dict(post)) for post in record["posts"]]
+        if paginated:
+            page_size = page_limit(get_post_request.limit)
+            message, posts = await repository.list_posts(
+                user_node_id,
+                get_post_request.user_node_id,
+                # 다음 페이지가 있는지 알기 위해 하나 더 가져온다
+                limit=page_size + 1,
+                cursor=decode_cursor(get_post_request.cursor, 2),
+            )
+        else:
+            message, posts = await repository.list_posts(
+                user_node_id, get_post_request.user_node_id
+            )
+
+        if message != "get posts":
+            raise HTTPException(status_code=404, detail=message)
+
+        if not paginated:
+            return model_response([GetPostsResponse.from_data(post) for post in posts])
+
+        posts, next_cursor = split_page(posts, page_size, _content_cursor)
+        return model_response(
+            GetPostsPageResponse(
+                posts=[GetPostsResponse.from_data(post) for post in posts],
+                next_cursor=next_cursor,
+            )
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-@router.get("/post/get-my-contents", response_model=List[GetPostsResponse])
+@router.get(
+    "/post/get-my-contents",
+    response_model=Union[List[GetPostsResponse], GetPostsPageResponse],
+)
 async def get_my_posts(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
+    paginated = limit is not None or cursor is not None
     try:
-        query = f"""
-        MATCH (me: User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (me)<-[:is_post]-(post:Post)
-        RETURN collect(post) AS posts
-        """
-
-        result = session.run(query)
-        record = result.single()
+        if paginated:
+            page_size = page_limit(limit)
+            posts = await repository.list_my_posts(
+                user_node_id, limit=page_size + 1, cursor=decode_cursor(cursor, 2)
+            )
+        else:
+            posts = await repository.list_my_posts(user_node_id)
 
-        if not record:
+        if posts is None:
             raise HTTPException(
                 status_code=404, detail=f"invalid user_node_id {user_node_id}"
             )
 
-        return [GetPostsResponse.from_data(dict(post)) for post in record["posts"]]
+        if not paginated:
+            return model_response([GetPostsResponse.from_data(post) for post in posts])
+
+        posts, next_cursor = split_page(posts, page_size, _content_cursor)
+        return model_response(
+            GetPostsPageResponse(
+                posts=[GetPostsResponse.from_data(post) for post in posts],
+                next_cursor=next_cursor,
+            )
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/post/modify-my-content", response_model=GetPostsResponse)
 async def modify_my_post(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     modify_my_post_request: ModifyMyPostRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     post_node_id = modify_my_post_request.post_node_id
     new_content = modify_my_post_request.new_content
     new_image_url = modify_my_post_request.new_image_url
@@ -471,175 +477,97 @@ async def modify_my_post(
     new_tag = modify_my_post_request.new_tag
 
     try:
-        query = f"""
-        OPTIONAL MATCH (me:User {{node_id : '{user_node_id}'}})
-        OPTIONAL MATCH (p:Post {{node_id : '{post_node_id}'}})
-        OPTIONAL MATCH (me)<-[is_post:is_post]-(p)
-        WITH me,p,is_post
-
-        CALL apoc.do.case(
-        [
-            me is NULL, 'RETURN "no such user" As result',
-            p IS NULL, 'RETURN "no such post" AS result',
-            is_post IS NULL, 'RETURN "the user is not owner of the post" AS result'
-        ],
-        'SET 
-            p.content = $new_content,
-            p.image_url = $new_image_url,
-            p.is_public = $new_is_public,
-            p.title = $new_title,
-            p.tag = $new_tag
-        RETURN p AS result',
-        {{
-            p:p,
-            new_content: '{new_content}',
-            new_image_url: {new_image_url}, 
-            new_is_public: {new_is_public}, 
-            new_title: '{new_title}', 
-            new_tag: {new_tag}
-        }}
-        ) YIELD value
-        RETURN value.result AS result
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if type(record["result"]) == str:
-            raise HTTPException(status_code=404, detail=record["result"])
-
-        return GetPostsResponse.from_data(dict(record["result"]))
+        result = await repository.modify_post(
+            user_node_id,
+            post_node_id,
+            new_content,
+            new_image_url,
+            new_is_public,
+            new_title,
+            new_tag,
+        )
+
+        if type(result) == str:
+            raise HTTPException(status_code=404, detail=result)
+
+        return GetPostsResponse.from_data(result)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/post/delete-my-content", response_model=DeleteMyPostResponse)
 async def delete_my_post(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     delete_my_post_request: DeleteMyPostRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
     try:
-        if len(delete_my_post_request.post_image_urls) != 0:
-            for image_url in delete_my_post_request.post_image_urls:
-                file_name = "/".join(image_url.split("/")[3:])
-                file_name = unquote(file_name)
-                try:
-                    s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key=file_name)
-                except ConnectTimeoutError:
-                    logger.error("게시물 삭제 S3 연결 시간 초과 - 재시도 필요")
-                except ReadTimeoutError:
-                    logger.error("게시물 삭제 S3 응답 대기 시간 초과 - 재시도 필요")
-                except EndpointConnectionError:
-                    logger.error("게시물 삭제 S3 엔드포인트 연결 실패 - URL 확인 필요")
-        query = f"""
-        OPTIONAL MATCH (me:User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (p:Post {{node_id: '{delete_my_post_request.post_node_id}'}})
-        OPTIONAL MATCH (p)-[is_post:is_post]->(me)
-        WITH me, p, is_post
-        CALL apoc.do.case(
-        [
-            me IS NULL, 'RETURN "User does not exist" AS message',
-            p IS NULL, 'RETURN "Sticker does not exist" AS message',
-            is_post IS NULL, 'RETURN "Relationship does not exist" AS message'
-        ],
-        'DETACH DELETE p RETURN "Sticker and relationship deleted" AS message',
-        {{p: p}}
-        ) YIELD value
-        RETURN value.message AS message
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if record["message"] != "Sticker and relationship deleted":
-            raise HTTPException(status_code=500, detail=record["message"])
-
-        return DeleteStickerResponse(message=record["message"])
+        message, image_urls = await repository.delete_post(
+            user_node_id, delete_my_post_request.post_node_id
+        )
+
+        if message != "Sticker and relationship deleted":
+            raise HTTPException(status_code=500, detail=message)
+
+        await s3_delete_queue.enqueue(
+            [s3_key_from_url(image_url) for image_url in image_urls]
+        )
+        return DeleteStickerResponse(message=message)
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/cast/create", response_model=SendCastResponse)
 async def create_cast(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     send_cast_request: SendCastRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
     try:
-        query = f"""
-        MATCH (me:User {{node_id: '{user_node_id}'}})
-        CREATE (cast_node:Cast {{
-            node_id:randomUUID(),
-            message:'{send_cast_request.message}',
-            reply_visible: True,
-            created_at:'{datetimenow}',
-            duration:{send_cast_request.duration},
-            deleted_at:''}})
-        CREATE (me)<-[:creator_of_cast {{edge_id:randomUUID()}}]-(cast_node)
-        WITH cast_node,me
-        UNWIND {send_cast_request.friends} AS receivers_node_id
-        MATCH (receiver:User {{node_id: receivers_node_id}})
-        WHERE NOT (receiver)-[:mute]->(me) AND NOT (receiver)-[:block]-(me)
-        CREATE (receiver)<-[:receiver_of_cast {{open:true, new:true,edge_id:randomUUID()}}]-(cast_node)
-        RETURN cast_node.node_id AS cast_node, collect(receiver.node_id) AS receivers
-        """
-
-        result = session.run(query)
-        record = result.single()
+        receivers = await repository.create_cast(
+            user_node_id,
+            send_cast_request.message,
+            send_cast_request.duration,
+            send_cast_request.friends,
+            datetimenow,
+        )
 
-        if not record:
+        if not receivers:
             raise HTTPException(
                 status_code=404,
                 detail=f"no such user {user_node_id} or no any valid friends",
             )
 
-        # dispatcher.dispatch(dispatcher.NEW_CAST_CREATED,record["cast_node"],record["receivers"])
+        # cast 는 받는 사람 피드에만 보인다
+        await feed_cache.invalidate(receivers)
+        dispatcher.dispatch(dispatcher.NEW_CAST_CREATED, receivers)
         return SendCastResponse()
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/cast/reply", response_model=ReplyCastResponse)
 async def put_receiver_of_cast_as_read(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     reply_cast_request: ReplyCastRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     try:
-        query = f"""
-        MATCH (me:User {{node_id:'{user_node_id}'}})<-[receiver_of_cast:receiver_of_cast]-(case:Cast {{node_id:'{reply_cast_request.cast_id}'}})
-        CREATE (me)-[is_reply:is_reply {{message: '{reply_cast_request.message}', edge_id:randomUUID()}}]->(case)
-        RETURN is_reply
-        """
-
-        result = session.run(query)
-        record = result.single()
+        replied = await repository.reply_cast(
+            user_node_id, reply_cast_request.cast_id, reply_cast_request.message
+        )
 
-        if not record:
+        if not replied:
             raise HTTPException(
                 status_code=500,
                 detail=f"""invalid receiver_of_sticker_edge between {user_node_id},{reply_cast_request.cast_id}""",
@@ -649,74 +577,45 @@ async def put_receiver_of_cast_as_read(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 async def delete_old_casts():
-    session = get_session()
     datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    started_at = time.perf_counter()
 
-    print("datetimenow : ", datetimenow)
-
-    try:
-        query = f"""
-        MATCH (cast_node:Cast)
-        WHERE datetime(cast_node.created_at)+duration({{minutes:cast_node.duration}}) <= datetime()
-        SET cast_node.deleted_at = '{datetimenow}'
-        return cast_node
-        """
-        result = session.run(query)
-        record = result.data()
-
+    async with open_session() as session:
+        result = await session.run(
+            DELETE_OLD_CASTS_QUERY,
+            deleted_at=datetimenow,
+            batch_size=CAST_EXPIRY_BATCH_SIZE,
+        )
+        record = await result.single()
 
-    except Exception as e:
-        raise e
-    finally:
-        session.close()
+    processed = record["processed"] if record else 0
+    if processed:
+        # 만료된 cast 를 받은 사람을 따로 모으지 않고 캐시 전체를 비운다
+        await feed_cache.clear()
+    elapsed = time.perf_counter() - started_at
+    cast_expiry_stats["runs"] += 1
+    cast_expiry_stats["processed_total"] += processed
+    cast_expiry_stats["last_processed"] = processed
+    cast_expiry_stats["last_duration_seconds"] = elapsed
+    logger.info(f"delete_old_casts processed={processed} duration={elapsed:.3f}s")
+    return processed
 
 
 @router.get("/get-contents")
 async def get_contents(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
     try:
-        query = f"""
-        MATCH (me:User {{node_id:'{user_node_id}'}})
-        OPTIONAL MATCH (me)<-[r:receiver_of_cast]-(cast:Cast {{deleted_at:''}})-[:creator_of_cast]->(creator_of_cast:User)
-            WHERE NOT (me)-[:block]-(creator_of_cast) 
-            AND NOT (me)-[:mute]->(creator_of_cast)
-        REMOVE r.new
-        WITH me,collect({{cast:properties(cast),creator:creator_of_cast.node_id}}) as casts
-
-        OPTIONAL MATCH (me)-[:is_roommate]->(roommate:User)<-[:creator_of_sticker]-(sticker:Sticker {{deleted_at:''}})
-            WHERE NOT (me)<-[:receiver_of_sticker {{read: true}}]-(sticker)
-            AND NOT (me)-[:block]-(roommate) 
-            AND NOT (me)-[:mute]->(roommate)
-        WITH me,casts,roommate,sticker
-        FOREACH (s IN CASE WHEN sticker IS NOT NULL THEN [sticker] ELSE [] END |
-            MERGE (me)<-[:receiver_of_sticker]-(s))
-        WITH me,casts,collect(DISTINCT roommate.node_id) AS stickered_roommates
-        
-        OPTIONAL MATCH (me)-[:is_roommate]->(:User)-[:is_roommate]->(neighbor:User)<-[:creator_of_sticker]-(sticker:Sticker {{deleted_at: ''}})
-            WHERE NOT (me)<-[:receiver_of_sticker {{read: true}}]-(sticker) 
-            AND neighbor <> me 
-            AND NOT (me)-[:is_roommate]->(neighbor)
-            AND NOT (me)-[:block]-(neighbor) 
-            AND NOT (me)-[:mute]->(neighbor)
-        WITH me, casts,stickered_roommates, neighbor, sticker
-        FOREACH (s IN CASE WHEN sticker IS NOT NULL THEN [sticker] ELSE [] END |
-            MERGE (me)<-[:receiver_of_sticker]-(s))
-        RETURN casts,stickered_roommates,collect(DISTINCT neighbor.node_id) AS stickered_neighbors
-        """
-
-        result = session.run(query)
-        record = result.single()
-        logger.info(record)
+        cached = await feed_cache.get(user_node_id)
+        if cached is not None:
+            return json_bytes_response(cached)
+
+        token = feed_cache.begin()
+        record = await repository.get_contents(user_node_id)
 
         if not record:
             raise HTTPException(
@@ -725,126 +624,105 @@ async def get_contents(
             )
 
         # Todo. return with cast_creator node_id
-        return GetContentsResponse.from_datas(
-            record["casts"],
-            record["stickered_roommates"],
-            record["stickered_neighbors"],
+        # 직렬화한 bytes 를 캐시해서 캐시 적중 시에는 직렬화도 하지 않는다
+        contents = to_json(
+            GetContentsResponse.from_datas(
+                record["casts"],
+                record["stickered_roommates"],
+                record["stickered_neighbors"],
+            )
         )
+        await feed_cache.set(user_node_id, contents, token)
+        return json_bytes_response(contents)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
-@router.get("/get-new-contents")
-async def get_new_contents(
-    request: Request,
-):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
-    for _ in range(3):
-        response = {"new_roommates": [], "stickers_from": [], "casts_received": []}
-        session = get_session()
-        try:
-            query = f"""
-            MATCH (me:User {{node_id: '{user_node_id}'}})
-            OPTIONAL MATCH (me)<-[new_roommate_edge:is_roommate {{new:true}}]-(new_roommate:User)
-            REMOVE new_roommate_edge.new
-            WITH me,new_roommate
-            OPTIONAL MATCH (new_roommate)-[:is_roommate]->(neighbor:User)
-                WHERE neighbor <> me 
-                AND NOT (new_roommate)-[:block]->(neighbor)
-            WITH me, new_roommate, collect(properties(neighbor)) AS neighbors
-            WITH me, collect({{new_roommate:properties(new_roommate),neighbors:neighbors}}) AS new_roommates
-
-            OPTIONAL MATCH (me)<-[r:receiver_of_cast {{new:true}}]-(cast:Cast {{deleted_at:''}})-[:creator_of_cast]->(cast_creator:User)
-                WHERE NOT (me)-[:mute]->(cast_creator)
-                AND NOT (me)-[:block]-(cast_creator)
-            REMOVE r.new
-            WITH me,new_roommates,collect({{cast:properties(cast),cast_creator:cast_creator.node_id}}) AS casts_received
-            
-            OPTIONAL MATCH (me)-[:is_roommate]->(roommate:User)-[:creator_of_sticker]->(sticker:Sticker {{deleted_at:''}})
-                WHERE not (me)-[:receiver_of_sticker]->(sticker)
-                AND NOT (me)-[:mute]->(roommate)
-                AND NOT (me)-[:block]-(roommate)
-            FOREACH (s IN CASE WHEN sticker IS NOT NULL THEN [sticker] ELSE [] END |
-            MERGE (me)<-[:receiver_of_sticker]-(s))
-            return new_roommates,casts_received,collect(DISTINCT(roommate.node_id)) AS stickers_from
-            """
-
-            result = session.run(query)
-            record = result.single()
-
-            if not record:
-                raise HTTPException(
-                    status_code=404, detail=f"no such user {user_node_id}"
-                )
-            response = GetNewContentsResponse.from_datas(
-                record["new_roommates"],
-                record["casts_received"],
-                record["stickers_from"],
-            )
+async def _fetch_new_contents(user_node_id: str) -> GetNewContentsResponse:
+    try:
+        async with open_repository(user_node_id) as repository:
+            record = await repository.get_new_contents(user_node_id)
 
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        finally:
-            session.close()
+        if not record:
+            raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
+        return GetNewContentsResponse.from_datas(
+            record["new_roommates"],
+            record["casts_received"],
+            record["stickers_from"],
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        if not response.is_empty():
-            return response
-        else:
-            await asyncio.sleep(10)
 
-    return response
+@router.get("/get-new-contents")
+async def get_new_contents(
+    user_node_id: str = Depends(current_user),
+):
+    # 비어 있으면 관련 쓰기 이벤트가 오거나 재조회 간격이 지날 때마다 다시 조회한다
+    with long_poll_waiters.labels("get_new_contents").track_inprogress():
+        response = await hub.poll(
+            user_node_id,
+            _fetch_new_contents,
+            lambda response: response.is_empty(),
+            LONG_POLLING_TIMEOUT,
+        )
+    return model_response(response)
 
 
 @router.post("/get_neighbors_with_stickers")
 async def get_neighbors_with_stickers(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     get_neighbors_with_sticker_request: GetNeighborsWithStickerRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
-
     try:
-        query = f"""        
-        MATCH (me:User {{node_id:'{user_node_id}'}})-[:is_roommate]->(roommate:User {{node_id:'{get_neighbors_with_sticker_request.roommate_node_id}'}})
-        OPTIONAL MATCH (roommate)-[:is_roommate]->(neighbor:User)
-            WHERE neighbor <> me
-            AND NOT (me)-[:block]-(neighbor)
-        OPTIONAL MATCH (neighbor)<-[:creator_of_sticker]-(sticker:Sticker {{deleted_at:''}})
-            WHERE NOT (me)<-[:receiver_of_sticker {{read: true}}]-(sticker) 
-            AND NOT (me)-[:mute]->(neighbor)
-        FOREACH (s IN CASE WHEN sticker IS NOT NULL THEN [sticker] ELSE [] END |
-            MERGE (me)<-[:receiver_of_sticker]-(s))
-        RETURN properties(neighbor) AS neighbor,collect(sticker.node_id) AS stickers
-        """
-
-        result = session.run(query)
-        records = result.data()
-        logger.info(records)
+        roommate_node_id = get_neighbors_with_sticker_request.roommate_node_id
+        # 인덱스에 없다고 roommate 가 아닌 것은 아니므로 아래 Cypher 조회로 확인하고 나서 404 를 낸다
+        if roommate_index.loaded and roommate_index.is_roommate(
+            user_node_id, roommate_node_id
+        ):
+            records = await repository.list_neighbor_stickers(
+                user_node_id,
+                roommate_index.neighbors_via(
+                    user_node_id, roommate_node_id, exclude_blocked=True
+                ),
+            )
+            return model_response(
+                [
+                    GetNeighborsWithStickerResponse.from_data(
+                        record["neighbor"], record["stickers"]
+                    )
+                    for record in records
+                ]
+            )
+
+        records = await repository.list_neighbors_with_stickers(
+            user_node_id, roommate_node_id
+        )
+        logger.debug("%s", records)
 
         if not records:
             raise HTTPException(
                 status_code=404,
-                detail=f"invalid is_roommate {user_node_id},{get_neighbors_with_sticker_request.roommate_node_id}",
+                detail=f"invalid is_roommate {user_node_id},{roommate_node_id}",
             )
 
-        return [
-            GetNeighborsWithStickerResponse.from_data(
-                record["neighbor"], record["stickers"]
-            )
-            for record in records
-        ]
+        return model_response(
+            [
+                GetNeighborsWithStickerResponse.from_data(
+                    record["neighbor"], record["stickers"]
+                )
+                for record in records
+            ]
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
@@ -0,0 +1,106 @@
+# backend/domain/service/content/fanout.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from app.utils import Logger, dispatcher
+from app.config.connection import open_session
+from .query import (
+    CLAIM_PENDING_FANOUT_QUERY,
+    FANOUT_STICKER_QUERY,
+    FINISH_FANOUT_QUERY,
+)
+
+# 스티커 배달(receiver_of_sticker 엣지 생성)을 피드 조회 시점이 아니라 작성 직후 백그라운드에서 한다.
+# 배달할 스티커는 노드의 fanout_pending 표시로 남기 때문에 서버가 재시작돼도 다음 실행에서 이어서 처리한다.
+logger = Logger(__file__)
+
+STICKER_FANOUT_BATCH_SIZE = int(os.getenv("STICKER_FANOUT_BATCH_SIZE", 1000))
+STICKER_FANOUT_CLAIM_LIMIT = int(os.getenv("STICKER_FANOUT_CLAIM_LIMIT", 50))
+STICKER_FANOUT_POLL_INTERVAL = float(os.getenv("STICKER_FANOUT_POLL_INTERVAL", 10))
+# 가져간 뒤 이 시간 안에 끝나지 않으면 다른 워커가 다시 가져갈 수 있다
+STICKER_FANOUT_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+fanout_stats = {
+    "stickers": 0,
+    "receivers": 0,
+    "failures": 0,
+    "last_duration_seconds": 0.0,
+}
+
+
+class StickerFanoutWorker:
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        dispatcher.subscribe(dispatcher.STICKER_FANOUT_REQUESTED, self.wake)
+
+    def wake(self, *args, **kwargs):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+    async def _fanout(self, session, sticker_node_id: str):
+        started_at = time.perf_counter()
+        result = await session.run(
+            FANOUT_STICKER_QUERY,
+            sticker_node_id=sticker_node_id,
+            batch_size=STICKER_FANOUT_BATCH_SIZE,
+        )
+        record = await result.single()
+
+        result = await session.run(FINISH_FANOUT_QUERY, sticker_node_id=sticker_node_id)
+        await result.consume()
+
+        fanout_stats["stickers"] += 1
+        fanout_stats["receivers"] += record["receivers"]
+        fanout_stats["last_duration_seconds"] = time.perf_counter() - started_at
+
+        # 배달이 끝난 뒤에 roommate 의 long-polling 을 깨워야 새 스티커가 보인다
+        dispatcher.dispatch(dispatcher.NEW_STICKER_CREATED, record["roommates"])
+
+    async def run_once(self) -> int:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        async with open_session() as session:
+            result = await session.run(
+                CLAIM_PENDING_FANOUT_QUERY,
+                stale_before=(now - STICKER_FANOUT_CLAIM_TIMEOUT).isoformat(),
+                claimed_at=now.isoformat(),
+                limit=STICKER_FANOUT_CLAIM_LIMIT,
+            )
+            records = await result.data()
+
+            for record in records:
+                try:
+                    await self._fanout(session, record["sticker_node_id"])
+                except Exception as e:
+                    # 표시가 남아 있으므로 claim timeout 이 지나면 다시 시도된다
+                    fanout_stats["failures"] += 1
+                    logger.error(f"sticker fan-out failed {record['sticker_node_id']}: {e}")
+
+        return len(records)
+
+    async def run(self):
+        logger.info("스티커 fan-out 워커 시작")
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"스티커 fan-out 처리 실패: {e}")
+                claimed = 0
+
+            if claimed >= STICKER_FANOUT_CLAIM_LIMIT:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=STICKER_FANOUT_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+        logger.info("스티커 fan-out 워커 종료")
+
+
+sticker_fanout = StickerFanoutWorker()
@@ -0,0 +1,9 @@
+# backend/domain/service/content/feed.py
+from typing import List
+from app.utils import feed_cache
+
+
+async def invalidate_feeds(repository, user_node_ids: List[str]):
+    # user_node_ids 와 그 2홉 이내 사용자의 피드 캐시를 지운다. 그래프 쓰기가 끝난 뒤에 호출할 것.
+    audience = await repository.feed_audience(user_node_ids)
+    await feed_cache.invalidate(set(user_node_ids) | set(audience))
@@ -0,0 +1,500 @@
+CREATE_STICKER_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+CREATE (s:Sticker {
+        content : $content,
+        image_url : $image_url,
+        created_at : $created_at,
+        deleted_at : '',
+        fanout_pending : true,
+        node_id : randomUUID()
+    })
+CREATE (s)-[creator:creator_of_sticker {edge_id : randomUUID()}]->(u)
+RETURN creator, s.node_id AS sticker_node_id
+"""
+
+
+GET_STICKERS_QUERY = """
+OPTIONAL MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (friend:User {node_id: $friend_node_id})
+OPTIONAL MATCH (friend)<-[:creator_of_sticker]-(sticker:Sticker)
+WHERE sticker.deleted_at = ""
+WITH friend, me, collect(sticker) AS stickers
+RETURN
+CASE
+    WHEN me IS NULL THEN "no such node " + $user_node_id
+    WHEN friend IS NULL THEN "no such node " + $friend_node_id
+    WHEN EXISTS((me)-[:block]-(friend)) THEN "block exists"
+    WHEN EXISTS((me)-[:mute]->(friend)) THEN "mute exists"
+    ELSE "get stickers"
+END AS message, stickers
+"""
+
+
+GET_MY_STICKERS_QUERY = """
+MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (me)<-[:creator_of_sticker]-(sticker:Sticker)
+WHERE sticker.deleted_at = ""
+RETURN collect(sticker) AS stickers
+"""
+
+
+# 페이지 단위 조회. 최신순으로 (created_at, node_id) 키셋 cursor 다음부터 $limit 개를 가져온다
+GET_STICKERS_PAGE_QUERY = """
+OPTIONAL MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (friend:User {node_id: $friend_node_id})
+WITH me, friend,
+CASE
+    WHEN me IS NULL THEN "no such node " + $user_node_id
+    WHEN friend IS NULL THEN "no such node " + $friend_node_id
+    WHEN EXISTS((me)-[:block]-(friend)) THEN "block exists"
+    WHEN EXISTS((me)-[:mute]->(friend)) THEN "mute exists"
+    ELSE "get stickers"
+END AS message
+CALL {
+    WITH friend, message
+    OPTIONAL MATCH (friend)<-[:creator_of_sticker]-(sticker:Sticker)
+    WHERE message = "get stickers"
+    AND sticker.deleted_at = ""
+    AND (
+        $cursor_created_at IS NULL
+        OR sticker.created_at < $cursor_created_at
+        OR (sticker.created_at = $cursor_created_at AND sticker.node_id < $cursor_node_id)
+    )
+    WITH sticker
+    ORDER BY sticker.created_at DESC, sticker.node_id DESC
+    LIMIT $limit
+    RETURN collect(sticker) AS stickers
+}
+RETURN message, stickers
+"""
+
+
+GET_MY_STICKERS_PAGE_QUERY = """
+MATCH (me: User {node_id: $user_node_id})
+CALL {
+    WITH me
+    OPTIONAL MATCH (me)<-[:creator_of_sticker]-(sticker:Sticker)
+    WHERE sticker.deleted_at = ""
+    AND (
+        $cursor_created_at IS NULL
+        OR sticker.created_at < $cursor_created_at
+        OR (sticker.created_at = $cursor_created_at AND sticker.node_id < $cursor_node_id)
+    )
+    WITH sticker
+    ORDER BY sticker.created_at DESC, sticker.node_id DESC
+    LIMIT $limit
+    RETURN collect(sticker) AS stickers
+}
+RETURN stickers
+"""
+
+
+# fan-out 이전에 만들어진 스티커나 roommate 가 된 뒤 처음 보는 스티커는 받은 엣지가 없을 수 있어서 MERGE 한다
+READ_STICKER_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+MATCH (sticker:Sticker {node_id: $sticker_node_id})
+MERGE (me)<-[receiver_of_sticker_edge:receiver_of_sticker]-(sticker)
+SET receiver_of_sticker_edge.read = true
+REMOVE receiver_of_sticker_edge.new
+RETURN receiver_of_sticker_edge
+"""
+
+
+DELETE_STICKER_QUERY = """
+OPTIONAL MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (sticker:Sticker {node_id: $sticker_node_id})
+OPTIONAL MATCH (sticker)-[r:creator_of_sticker]->(me)
+WITH me, sticker, r
+CALL apoc.do.case(
+[
+    me IS NULL, 'RETURN "User does not exist" AS message',
+    sticker IS NULL, 'RETURN "Sticker does not exist" AS message',
+    r IS NULL, 'RETURN "Relationship does not exist" AS message'
+],
+'SET sticker.deleted_at = $deleted_at RETURN "Sticker and relationship deleted" AS message, sticker.image_url AS image_url',
+{sticker: sticker, deleted_at: $deleted_at}
+) YIELD value
+RETURN value.message AS message, coalesce(value.image_url, []) AS image_url
+"""
+
+
+# created_at/deleted_at 은 모두 같은 형식의 UTC ISO 문자열이라 문자열 비교로 범위 인덱스를 탄다
+MARK_EXPIRED_STICKERS_QUERY = """
+MATCH (s:Sticker)
+WHERE s.created_at <= $expired_before
+AND s.deleted_at = ''
+CALL {
+    WITH s
+    SET s.deleted_at = $deleted_at
+} IN TRANSACTIONS OF $batch_size ROWS
+RETURN count(s) AS marked
+"""
+
+
+GET_PURGEABLE_STICKERS_QUERY = """
+MATCH (s:Sticker)
+WHERE s.deleted_at > '' AND s.deleted_at <= $purge_before
+RETURN s.node_id AS node_id, s.image_url AS image_url
+LIMIT $batch_size
+"""
+
+
+PURGE_STICKERS_QUERY = """
+UNWIND $node_ids AS node_id
+MATCH (s:Sticker {node_id: node_id})
+DETACH DELETE s
+"""
+
+
+GET_STICKER_PURGE_CHECKPOINT_QUERY = """
+MERGE (c:JobCheckpoint {name: 'delete_old_stickers'})
+ON CREATE SET c.pending_node_ids = [], c.pending_keys = []
+RETURN c.pending_node_ids AS pending_node_ids,
+       c.pending_keys AS pending_keys
+"""
+
+
+SAVE_STICKER_PURGE_CHECKPOINT_QUERY = """
+MERGE (c:JobCheckpoint {name: 'delete_old_stickers'})
+SET c.pending_node_ids = $pending_node_ids,
+    c.pending_keys = $pending_keys,
+    c.updated_at = $updated_at
+"""
+
+
+CREATE_POST_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+CREATE (p:Post {
+        content : $content,
+        image_url : $image_url,
+        is_public : $is_public,
+        title : $title,
+        tags : $tags,
+        created_at : $created_at,
+        node_id : randomUUID()
+    })
+CREATE (p)-[is_post:is_post {edge_id : randomUUID()}]->(u)
+RETURN is_post
+"""
+
+
+GET_POSTS_QUERY = """
+OPTIONAL MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (friend:User {node_id: $friend_node_id})
+OPTIONAL MATCH (me)<-[b:block]-(friend)
+OPTIONAL MATCH (me)-[m:mute]->(friend)
+OPTIONAL MATCH (friend)<-[:is_post]-(post:Post {is_public : true})
+WITH friend, me, b, m, collect(post) AS posts
+RETURN
+CASE
+    WHEN me IS NULL THEN "no such user " + $user_node_id
+    WHEN friend IS NULL THEN "no such friend " + $friend_node_id
+    WHEN b IS NOT NULL THEN "is_blocked exists"
+    WHEN m IS NOT NULL THEN "mute exists"
+    ELSE "get posts"
+END AS message,
+posts
+"""
+
+
+GET_MY_POSTS_QUERY = """
+MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (me)<-[:is_post]-(post:Post)
+RETURN collect(post) AS posts
+"""
+
+
+GET_POSTS_PAGE_QUERY = """
+OPTIONAL MATCH (me: User {node_id: $user_node_id})
+OPTIONAL MATCH (friend:User {node_id: $friend_node_id})
+OPTIONAL MATCH (me)<-[b:block]-(friend)
+OPTIONAL MATCH (me)-[m:mute]->(friend)
+WITH me, friend,
+CASE
+    WHEN me IS NULL THEN "no such user " + $user_node_id
+    WHEN friend IS NULL THEN "no such friend " + $friend_node_id
+    WHEN b IS NOT NULL THEN "is_blocked exists"
+    WHEN m IS NOT NULL THEN "mute exists"
+    ELSE "get posts"
+END AS message
+CALL {
+    WITH friend, message
+    OPTIONAL MATCH (friend)<-[:is_post]-(post:Post {is_public : true})
+    WHERE message = "get posts"
+    AND (
+        $cursor_created_at IS NULL
+        OR post.created_at < $cursor_created_at
+        OR (post.created_at = $cursor_created_at AND post.node_id < $cursor_node_id)
+    )
+    WITH post
+    ORDER BY post.created_at DESC, post.node_id DESC
+    LIMIT $limit
+    RETURN collect(post) AS posts
+}
+RETURN message, posts
+"""
+
+
+GET_MY_POSTS_PAGE_QUERY = """
+MATCH (me: User {node_id: $user_node_id})
+CALL {
+    WITH me
+    OPTIONAL MATCH (me)<-[:is_post]-(post:Post)
+    WHERE $cursor_created_at IS NULL
+    OR post.created_at < $cursor_created_at
+    OR (post.created_at = $cursor_created_at AND post.node_id < $cursor_node_id)
+    WITH post
+    ORDER BY post.created_at DESC, post.node_id DESC
+    LIMIT $limit
+    RETURN collect(post) AS posts
+}
+RETURN posts
+"""
+
+
+MODIFY_MY_POST_QUERY = """
+OPTIONAL MATCH (me:User {node_id : $user_node_id})
+OPTIONAL MATCH (p:Post {node_id : $post_node_id})
+OPTIONAL MATCH (me)<-[is_post:is_post]-(p)
+WITH me,p,is_post
+
+CALL apoc.do.case(
+[
+    me is NULL, 'RETURN "no such user" As result',
+    p IS NULL, 'RETURN "no such post" AS result',
+    is_post IS NULL, 'RETURN "the user is not owner of the post" AS result'
+],
+'SET
+    p.content = $new_content,
+    p.image_url = $new_image_url,
+    p.is_public = $new_is_public,
+    p.title = $new_title,
+    p.tag = $new_tag
+RETURN p AS result',
+{
+    p:p,
+    new_content: $new_content,
+    new_image_url: $new_image_url,
+    new_is_public: $new_is_public,
+    new_title: $new_title,
+    new_tag: $new_tag
+}
+) YIELD value
+RETURN value.result AS result
+"""
+
+
+DELETE_MY_POST_QUERY = """
+OPTIONAL MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (p:Post {node_id: $post_node_id})
+OPTIONAL MATCH (p)-[is_post:is_post]->(me)
+WITH me, p, is_post
+CALL apoc.do.case(
+[
+    me IS NULL, 'RETURN "User does not exist" AS message',
+    p IS NULL, 'RETURN "Sticker does not exist" AS message',
+    is_post IS NULL, 'RETURN "Relationship does not exist" AS message'
+],
+'WITH p, p.image_url AS image_url DETACH DELETE p RETURN "Sticker and relationship deleted" AS message, image_url',
+{p: p}
+) YIELD value
+RETURN value.message AS message, coalesce(value.image_url, []) AS image_url
+"""
+
+
+CREATE_CAST_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+CREATE (cast_node:Cast {
+    node_id:randomUUID(),
+    message: $message,
+    reply_visible: True,
+    created_at: $created_at,
+    duration: $duration,
+    expires_at: datetime($created_at) + duration({minutes: $duration}),
+    deleted_at:''})
+CREATE (me)<-[:creator_of_cast {edge_id:randomUUID()}]-(cast_node)
+WITH cast_node,me
+UNWIND $friends AS receivers_node_id
+MATCH (receiver:User {node_id: receivers_node_id})
+WHERE NOT (receiver)-[:mute]->(me) AND NOT (receiver)-[:block]-(me)
+CREATE (receiver)<-[:receiver_of_cast {open:true, new:true,edge_id:randomUUID()}]-(cast_node)
+RETURN cast_node.node_id AS cast_node, collect(receiver.node_id) AS receivers
+"""
+
+
+REPLY_CAST_QUERY = """
+MATCH (me:User {node_id: $user_node_id})<-[receiver_of_cast:receiver_of_cast]-(case:Cast {node_id: $cast_node_id})
+CREATE (me)-[is_reply:is_reply {message: $message, edge_id:randomUUID()}]->(case)
+RETURN is_reply
+"""
+
+
+# expires_at 인덱스로 만료된 것 중 아직 삭제 표시가 안 된 cast 만 골라 배치 단위로 커밋한다.
+# CALL IN TRANSACTIONS 는 auto-commit 트랜잭션(session.run)에서만 쓸 수 있다.
+DELETE_OLD_CASTS_QUERY = """
+MATCH (cast_node:Cast)
+WHERE cast_node.expires_at <= datetime($deleted_at)
+AND cast_node.deleted_at = ''
+CALL {
+    WITH cast_node
+    SET cast_node.deleted_at = $deleted_at
+} IN TRANSACTIONS OF $batch_size ROWS
+RETURN count(cast_node) AS processed
+"""
+
+
+GET_CONTENTS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (me)<-[r:receiver_of_cast]-(cast:Cast {deleted_at:''})-[:creator_of_cast]->(creator_of_cast:User)
+    WHERE NOT (me)-[:block]-(creator_of_cast)
+    AND NOT (me)-[:mute]->(creator_of_cast)
+WITH me,
+     collect({cast:properties(cast),creator:creator_of_cast.node_id}) as casts,
+     collect(CASE WHEN r.new THEN r.edge_id END) AS new_cast_edge_ids
+
+OPTIONAL MATCH (me)-[:is_roommate]->(roommate:User)<-[:creator_of_sticker]-(sticker:Sticker {deleted_at:''})
+    WHERE NOT (me)<-[:receiver_of_sticker {read: true}]-(sticker)
+    AND NOT (me)-[:block]-(roommate)
+    AND NOT (me)-[:mute]->(roommate)
+WITH me,casts,new_cast_edge_ids,collect(DISTINCT roommate.node_id) AS stickered_roommates
+
+OPTIONAL MATCH (me)-[:is_roommate]->(:User)-[:is_roommate]->(neighbor:User)<-[:creator_of_sticker]-(sticker:Sticker {deleted_at: ''})
+    WHERE NOT (me)<-[:receiver_of_sticker {read: true}]-(sticker)
+    AND neighbor <> me
+    AND NOT (me)-[:is_roommate]->(neighbor)
+    AND NOT (me)-[:block]-(neighbor)
+    AND NOT (me)-[:mute]->(neighbor)
+RETURN casts,new_cast_edge_ids,stickered_roommates,collect(DISTINCT neighbor.node_id) AS stickered_neighbors
+"""
+
+
+# get-contents 는 읽기 전용으로 두고, 새로 받은 cast 표시는 있을 때만 따로 지운다
+CLEAR_NEW_CAST_FLAGS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+UNWIND $edge_ids AS edge_id
+MATCH (me)<-[r:receiver_of_cast {edge_id: edge_id}]-(:Cast)
+REMOVE r.new
+"""
+
+
+GET_NEW_CONTENTS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (me)<-[:is_roommate {new:true}]-(new_roommate:User)
+WITH me,new_roommate
+OPTIONAL MATCH (new_roommate)-[:is_roommate]->(neighbor:User)
+    WHERE neighbor <> me
+    AND NOT (new_roommate)-[:block]->(neighbor)
+WITH me, new_roommate, collect(properties(neighbor)) AS neighbors
+WITH me,
+     collect({new_roommate:properties(new_roommate),neighbors:neighbors}) AS new_roommates,
+     collect(new_roommate.node_id) AS new_roommate_node_ids
+
+OPTIONAL MATCH (me)<-[:receiver_of_cast {new:true}]-(cast:Cast {deleted_at:''})-[:creator_of_cast]->(cast_creator:User)
+    WHERE NOT (me)-[:mute]->(cast_creator)
+    AND NOT (me)-[:block]-(cast_creator)
+WITH me,new_roommates,new_roommate_node_ids,
+     collect({cast:properties(cast),cast_creator:cast_creator.node_id}) AS casts_received,
+     collect(cast.node_id) AS new_cast_node_ids
+
+OPTIONAL MATCH (me)<-[:receiver_of_sticker {new:true}]-(sticker:Sticker {deleted_at:''})-[:creator_of_sticker]->(roommate:User)
+    WHERE (me)-[:is_roommate]->(roommate)
+    AND NOT (me)-[:mute]->(roommate)
+    AND NOT (me)-[:block]-(roommate)
+RETURN new_roommates,casts_received,collect(DISTINCT(roommate.node_id)) AS stickers_from,
+       new_roommate_node_ids,new_cast_node_ids,collect(sticker.node_id) AS new_sticker_node_ids
+"""
+
+
+# get-new-contents 도 읽기 전용으로 두고, 돌려준 항목의 new 표시는 있을 때만 따로 지운다
+CLEAR_NEW_CONTENT_FLAGS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (me)<-[new_roommate_edge:is_roommate {new:true}]-(new_roommate:User)
+    WHERE new_roommate.node_id IN $roommate_node_ids
+REMOVE new_roommate_edge.new
+WITH DISTINCT me
+OPTIONAL MATCH (me)<-[r:receiver_of_cast {new:true}]-(cast:Cast)
+    WHERE cast.node_id IN $cast_node_ids
+REMOVE r.new
+WITH DISTINCT me
+OPTIONAL MATCH (me)<-[delivery:receiver_of_sticker {new:true}]-(sticker:Sticker)
+    WHERE sticker.node_id IN $sticker_node_ids
+REMOVE delivery.new
+"""
+
+
+# roommate_index 가 골라준 neighbor 들의 속성과 아직 읽지 않은 스티커
+GET_NEIGHBOR_STICKERS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+UNWIND $neighbor_node_ids AS neighbor_node_id
+MATCH (neighbor:User {node_id: neighbor_node_id})
+OPTIONAL MATCH (neighbor)<-[:creator_of_sticker]-(sticker:Sticker {deleted_at:''})
+    WHERE NOT (me)<-[:receiver_of_sticker {read: true}]-(sticker)
+    AND NOT (me)-[:mute]->(neighbor)
+RETURN properties(neighbor) AS neighbor, collect(sticker.node_id) AS stickers
+"""
+
+
+GET_NEIGHBORS_WITH_STICKERS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})-[:is_roommate]->(roommate:User {node_id: $roommate_node_id})
+OPTIONAL MATCH (roommate)-[:is_roommate]->(neighbor:User)
+    WHERE neighbor <> me
+    AND NOT (me)-[:block]-(neighbor)
+OPTIONAL MATCH (neighbor)<-[:creator_of_sticker]-(sticker:Sticker {deleted_at:''})
+    WHERE NOT (me)<-[:receiver_of_sticker {read: true}]-(sticker)
+    AND NOT (me)-[:mute]->(neighbor)
+RETURN properties(neighbor) AS neighbor,collect(sticker.node_id) AS stickers
+"""
+
+
+# is_roommate 는 항상 양방향으로 만들어지므로 방향 없이 2홉까지 보면
+# 이 사용자를 roommate 나 neighbor 로 피드에 보여주는 사용자가 모두 나온다
+GET_FEED_AUDIENCE_QUERY = """
+UNWIND $user_node_ids AS user_node_id
+MATCH (u:User {node_id: user_node_id})
+OPTIONAL MATCH (u)-[:is_roommate*1..2]-(n:User)
+RETURN collect(DISTINCT n.node_id) AS audience
+"""
+
+
+# fan-out 대기 중인 스티커를 가져가면서 표시한다. 오래된 표시는 다른 워커가 죽은 것으로 보고 다시 가져간다.
+# 여러 워커가 같은 스티커를 가져가지 않도록, 먼저 SET 으로 쓰기 잠금을 잡은 뒤 claim 상태를 다시 확인한다.
+# 잠금을 기다리는 동안 다른 워커가 가져갔거나 끝냈으면 claimable 이 false 가 되어 빠진다. 잠금 표시는 모든 행에서 지운다.
+CLAIM_PENDING_FANOUT_QUERY = """
+MATCH (s:Sticker)
+WHERE s.fanout_pending = true
+AND (s.fanout_claimed_at IS NULL OR s.fanout_claimed_at < $stale_before)
+WITH s
+ORDER BY s.created_at
+LIMIT $limit
+SET s._lock = true
+WITH s, s.fanout_pending = true
+AND (s.fanout_claimed_at IS NULL OR s.fanout_claimed_at < $stale_before) AS claimable
+REMOVE s._lock
+WITH s
+WHERE claimable
+SET s.fanout_claimed_at = $claimed_at
+RETURN s.node_id AS sticker_node_id
+"""
+
+
+# 만든 사람의 roommate 와 2홉 neighbor 에게 받은 엣지를 만든다. roommate 에게만 new 표시를 붙인다.
+FANOUT_STICKER_QUERY = """
+MATCH (s:Sticker {node_id: $sticker_node_id})-[:creator_of_sticker]->(creator:User)
+MATCH (me:User)-[:is_roommate*1..2]->(creator)
+WHERE me <> creator
+WITH DISTINCT s, creator, me
+WITH s, creator, me, EXISTS { (me)-[:is_roommate]->(creator) } AS is_roommate
+CALL {
+    WITH s, me, is_roommate
+    MERGE (me)<-[r:receiver_of_sticker]-(s)
+    ON CREATE SET r.new = CASE WHEN is_roommate THEN true ELSE null END
+} IN TRANSACTIONS OF $batch_size ROWS
+RETURN count(me) AS receivers,
+       collect(CASE WHEN is_roommate THEN me.node_id END) AS roommates
+"""
+
+
+FINISH_FANOUT_QUERY = """
+MATCH (s:Sticker {node_id: $sticker_node_id})
+REMOVE s.fanout_pending, s.fanout_claimed_at
+"""
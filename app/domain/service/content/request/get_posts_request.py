@@ -1,4 +1,8 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field
 
 class GetPostsRequest(BaseModel):
     user_node_id:str
+    # limit 이나 cursor 를 주면 페이지 단위로 돌려준다
+    limit: Optional[int] = Field(None, ge=1)
+    cursor: Optional[str] = None
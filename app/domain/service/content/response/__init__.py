@@ -1,9 +1,9 @@
 from .create_sticker_response import CreateStickerResponse
-from .get_stickers_response import GetStickersResponse
+from .get_stickers_response import GetStickersResponse, GetStickersPageResponse
 from .create_post_response import CreatePostResponse
 from .delete_sticker_response import DeleteStickerResponse
-from .get_my_stickers_response import GetMyStickersResponse
-from .get_posts_response import GetPostsResponse
+from .get_my_stickers_response import GetMyStickersResponse, GetMyStickersPageResponse
+from .get_posts_response import GetPostsResponse, GetPostsPageResponse
 from .delete_my_post_response import DeleteMyPostResponse
 from .send_cast_response import SendCastResponse
 from .get_casts_response import GetCastsResponse
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict,List
+from typing import Dict,List,Optional
 
 class GetMyStickersResponse(BaseModel):
     sticker_node_id:str
@@ -10,8 +10,13 @@ class GetMyStickersResponse(BaseModel):
     @classmethod
     def from_data(cls, sticker: Dict[str,List[str]|str] ):
         return cls(
-            sticker_node_id = sticker["node_id"],
-            content=sticker["content"],
-            image_url=sticker["image_url"],
-            created_at=sticker["created_at"]
-        )
\ No newline at end of file
+            sticker_node_id = sticker.get('node_id',''),
+            content=sticker.get("content", ''),
+            image_url=sticker.get("image_url", []),
+            created_at=sticker.get("created_at", '')
+        )
+
+
+class GetMyStickersPageResponse(BaseModel):
+    stickers: List[GetMyStickersResponse]
+    next_cursor: Optional[str] = None
@@ -17,11 +17,11 @@ class GetNeighborsWithStickerResponse(BaseModel):
         stickers: List[str],
     ):
         return cls(
-            tags=neighbor["tags"],
-            username=neighbor["username"],
-            nickname=neighbor["nickname"],
-            my_memo=neighbor["my_memo"],
-            node_id=neighbor["node_id"],
-            profile_image_url=neighbor["profile_image_url"],
+            tags=neighbor.get("tags", []),
+            username=neighbor.get("username", ""),
+            nickname=neighbor.get("nickname", ""),
+            my_memo=neighbor.get("my_memo", ""),
+            node_id=neighbor.get("node_id", ""),
+            profile_image_url=neighbor.get("profile_image_url") or "",
             has_sticker= False if not stickers else True
         )
\ No newline at end of file
@@ -9,6 +9,16 @@ class Friend(BaseModel):
     my_memo: str
     node_id: str
 
+    @classmethod
+    def from_data(cls, user: Dict):
+        return cls(
+            tags=user.get("tags", []),
+            username=user.get("username", ""),
+            nickname=user.get("nickname", ""),
+            my_memo=user.get("my_memo", ""),
+            node_id=user.get("node_id", ""),
+        )
+
 
 class NewRoommate(BaseModel):
     new_roommate: Friend
@@ -40,8 +50,8 @@ class GetNewContentsResponse(BaseModel):
         else:
             new_roommate_objects = [
                 NewRoommate(
-                    new_roommate=Friend(**roommate["new_roommate"]),
-                    neighbors=[Friend(**neighbor) for neighbor in roommate["neighbors"]]
+                    new_roommate=Friend.from_data(roommate["new_roommate"]),
+                    neighbors=[Friend.from_data(neighbor) for neighbor in roommate["neighbors"]]
                 )
                 for roommate in new_roommates
             ]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 class GetPostsResponse(BaseModel):
@@ -20,3 +20,8 @@ class GetPostsResponse(BaseModel):
             tags=post.get("tags", []),
             title=post.get("title", ""),
         )
+
+
+class GetPostsPageResponse(BaseModel):
+    posts: List[GetPostsResponse]
+    next_cursor: Optional[str] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Dict,List
+from typing import Dict,List,Optional
 
 class GetStickersResponse(BaseModel):
     sticker_node_id:str
@@ -14,4 +14,9 @@ class GetStickersResponse(BaseModel):
             content=sticker.get("content", ''),
             image_url=sticker.get("image_url", []),
             created_at=sticker.get("created_at", '')
-        )
\ No newline at end of file
+        )
+
+
+class GetStickersPageResponse(BaseModel):
+    stickers: List[GetStickersResponse]
+    next_cursor: Optional[str] = None
@@ -1,75 +1,58 @@
 # backend/domain/service/friend/block/block.py
 from typing import List
-from fastapi import APIRouter, HTTPException, Depends, Body, Request
-from app.utils import verify_access_token, Logger
-from app.config.connection import get_session
+from fastapi import APIRouter, HTTPException, Depends, Body
+from app.utils import current_user, Logger, feed_cache
+from app.utils.roommate_index import roommate_index
+from app.repository import GraphRepository, get_repository
+from ...content.feed import invalidate_feeds
 from .request import BlockFriendRequest, PopBlockedRequest
 from .response import BlockFriendResponse, GetBlockedResponse, PopBlockedResponse
 
 router = APIRouter()
-ACCESS_TOKEN = "access_token"
 logger = Logger(__file__)
 
 
 @router.post("/add_member", response_model=BlockFriendResponse)
 async def block_friend(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     block_friend_request: BlockFriendRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("block_friend")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-            MATCH (from_user:User {{node_id: '{user_node_id}'}}), (to_user:User {{node_id: '{block_friend_request.user_node_id}'}})
-            OPTIONAL MATCH (from_user)-[b:block]->(to_user)
-            WHERE b IS NULL
-            MERGE (from_user)-[:block {{edge_id: randomUUID()}}]->(to_user)
-            WITH from_user, to_user, b
-            OPTIONAL MATCH (from_user)<-[r:is_roommate]->(to_user)
-            OPTIONAL MATCH (from_user)<-[m:mute]->(to_user)
-            DELETE r, m
-            RETURN 
-                CASE WHEN b IS NULL THEN 'User blocked successfully' ELSE 'User was already blocked' END AS message
-            """
-
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        message = await repository.block(
+            user_node_id, block_friend_request.user_node_id
+        )
+
+        if not message:
             raise HTTPException(status_code=400, detail="Failed to block")
-        return BlockFriendResponse(message=record["message"])
+
+        roommate_index.add_block(user_node_id, block_friend_request.user_node_id)
+        # block 은 roommate 관계도 끊으므로 2홉 범위까지 무효화한다
+        await invalidate_feeds(
+            repository, [user_node_id, block_friend_request.user_node_id]
+        )
+        return BlockFriendResponse(message=message)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/get-members", response_model=List[GetBlockedResponse])
 async def get_blocked(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_blocked")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})-[b:block]->(blocked_user:User)
-        RETURN b.edge_id, blocked_user
-        """
-
-        result = session.run(query)
-        records = result.data()
+        blocked = await repository.list_blocked(user_node_id)
         response = [
-            GetBlockedResponse.from_data(record["b.edge_id"], record["blocked_user"])
-            for record in records
+            GetBlockedResponse.from_data(block_edge_id, blocked_user)
+            for block_edge_id, blocked_user in blocked
         ]
         return response
 
@@ -77,33 +60,26 @@ async def get_blocked(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/pop-members")
 async def pop_blocked(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     pop_blocked_request: PopBlockedRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("pop_blocked")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (from_user:User {{node_id: '{user_node_id}'}})-[b:block {{edge_id: '{pop_blocked_request.block_edge_id}'}}]->(to_user:User)
-        DELETE b
-        RETURN b
-        """
-
-        result = session.run(query)
-        record = result.single()
+        to_user_node_id = await repository.unblock(
+            user_node_id, pop_blocked_request.block_edge_id
+        )
 
-        if not record:
+        if not to_user_node_id:
             raise HTTPException(status_code=400, detail="Failed to block")
         else:
+            roommate_index.remove_block(user_node_id, to_user_node_id)
+            await feed_cache.invalidate([user_node_id, to_user_node_id])
             return PopBlockedResponse(
                 message=f"'{pop_blocked_request.block_edge_id}' dropped"
             )
@@ -112,5 +88,3 @@ async def pop_blocked(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
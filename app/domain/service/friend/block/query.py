@@ -0,0 +1,25 @@
+BLOCK_FRIEND_QUERY = """
+MATCH (from_user:User {node_id: $user_node_id}), (to_user:User {node_id: $friend_node_id})
+OPTIONAL MATCH (from_user)-[b:block]->(to_user)
+WHERE b IS NULL
+MERGE (from_user)-[:block {edge_id: randomUUID()}]->(to_user)
+WITH from_user, to_user, b
+OPTIONAL MATCH (from_user)<-[r:is_roommate]->(to_user)
+OPTIONAL MATCH (from_user)<-[m:mute]->(to_user)
+DELETE r, m
+RETURN
+    CASE WHEN b IS NULL THEN 'User blocked successfully' ELSE 'User was already blocked' END AS message
+"""
+
+
+GET_BLOCKED_QUERY = """
+MATCH (u:User {node_id: $user_node_id})-[b:block]->(blocked_user:User)
+RETURN b.edge_id, blocked_user
+"""
+
+
+POP_BLOCKED_QUERY = """
+MATCH (from_user:User {node_id: $user_node_id})-[b:block {edge_id: $block_edge_id}]->(to_user:User)
+DELETE b
+RETURN b, to_user.node_id AS to_user_node_id
+"""
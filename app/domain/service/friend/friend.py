@@ -1,9 +1,21 @@
 # backend/domain/service/friend/friend.py
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 import uuid
-from fastapi import HTTPException, APIRouter, Depends, Body, Request
-from app.utils import verify_access_token, Logger
-from app.config.connection import get_session
+from fastapi import HTTPException, APIRouter, Depends, Body, Query
+from fastapi.responses import ORJSONResponse
+from app.utils import current_user, Logger, dispatcher
+from app.utils.roommate_index import roommate_index
+from app.utils.pagination import decode_cursor, page_limit, split_page
+from app.utils.json_response import model_response
+from app.config.connection import open_session
+from app.repository import GraphRepository, get_repository
+from ..content.feed import invalidate_feeds
+from .query import (
+    GET_ROOMMATE_EDGES_QUERY,
+    GET_BLOCK_EDGES_QUERY,
+    GET_MUTE_EDGES_QUERY,
+)
 from .request import (
     SendKnockRequest,
     RejectKnockRequest,
@@ -29,7 +41,6 @@ from .response import (
 import os
 from dotenv import load_dotenv
 
-ACCESS_TOKEN = "access_token"
 router = APIRouter()
 logger = Logger(__file__)
 load_dotenv()
@@ -37,51 +48,29 @@ load_dotenv()
 
 @router.post("/knock/send", response_model=SendKnockResponse)
 async def send_knock(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     send_knock_request: SendKnockRequest = Body(...),
+    from_user_node_id: str = Depends(current_user),
 ):
     logger.info("send_knock")
-    token = request.cookies.get(ACCESS_TOKEN)
-    from_user_node_id = verify_access_token(token)["user_node_id"]
     to_user_node_id = send_knock_request.to_user_node_id
     group = send_knock_request.group
     knock_edge_id = str(uuid.uuid4())
 
     try:
-        query = f"""
-        MATCH (from_user:User {{node_id: '{from_user_node_id}'}})
-        MATCH (to_user:User {{node_id: '{to_user_node_id}'}})
-
-        OPTIONAL MATCH (from_user)-[k:knock]->(to_user)
-        OPTIONAL MATCH (from_user)-[b:block]->(to_user)
-        OPTIONAL MATCH (to_user)-[r:is_roommate]->(from_user)
-
-        WITH from_user, to_user, k, b, r
-
-        CALL apoc.do.case(
-        [
-            from_user.node_id = to_user.node_id, 'RETURN "cannot send to myself" AS message',
-            from_user IS NULL, 'RETURN "User does not exist" AS message',
-            to_user IS NULL, 'RETURN "User does not exist" AS message',
-            k IS NOT NULL, 'RETURN "knock already sent" AS message',
-            b IS NOT NULL, 'RETURN "User does not exist" AS message',
-            r IS NOT NULL, 'RETURN "already roommate" AS message'
-        ],
-        'CREATE (from_user)-[k: knock {{edge_id: \\\'{knock_edge_id}\\\', group: \\\'{group}\\\'}}]->(to_user) RETURN "send knock successfully" AS message',
-        {{from_user:from_user, to_user:to_user}}
-        ) YIELD value
-        RETURN value.message AS message
-    """
-
-        result = session.run(query)
-        record = result.single()
-        if not record:
+        message = await repository.send_knock(
+            from_user_node_id,
+            to_user_node_id,
+            knock_edge_id,
+            group,
+            datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        )
+        if not message:
             raise HTTPException(
                 status_code=404,
                 detail="Cannot create knock_edge",
             )
-        return record
+        return SendKnockResponse(message=message)
 
         # return SendKnockResponse()
 
@@ -89,128 +78,111 @@ async def send_knock(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/knock/get-members", response_model=GetKnocksResponse)
 async def get_knocks(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
 ):
     logger.info("list_knock")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
+    paginated = limit is not None or cursor is not None
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})<-[k:knock]-(from_user:User)
-        RETURN k.edge_id AS knock_edge_id, from_user.nickname AS nickname
-        """
-
-        result = session.run(query)
-        records = result.data()
+        if paginated:
+            page_size = page_limit(limit)
+            records = await repository.list_knocks(
+                user_node_id,
+                # 다음 페이지가 있는지 알기 위해 하나 더 가져온다
+                limit=page_size + 1,
+                cursor=decode_cursor(cursor, 2),
+            )
+        else:
+            records = await repository.list_knocks(user_node_id)
 
         result_list = GetKnocksResponse(knocks=[])
+        if paginated:
+            records, result_list.next_cursor = split_page(
+                records,
+                page_size,
+                lambda record: (record["created_at"], record["knock_edge_id"]),
+            )
         for record in records:
             edge_id = record["knock_edge_id"]
             nickname = record.get("nickname", "")
             result_list.append_knock(edge_id, nickname)
 
-        return result_list
+        return model_response(result_list)
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/knock/reject")
 async def reject_knock(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     reject_knock_request: RejectKnockRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("reject_knock")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (from_user:User)-[k:knock]->(to_user:User {{node_id: '{user_node_id}'}})
-        WHERE k.edge_id = '{reject_knock_request.knock_id}'
-        DELETE k
-        RETURN "knock deleted successfully" AS message
-        """
-        result = session.run(query)
-        record = result.single()
-        if not record:
+        message = await repository.reject_knock(
+            user_node_id, reject_knock_request.knock_id
+        )
+        if not message:
             raise HTTPException(status_code=400, detail="no such knock_edge")
 
-        return RejectKnockResponse(message=record["message"])
+        return RejectKnockResponse(message=message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/knock/accept", response_model=AcceptKnockResponse)
 async def accept_knock(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     accept_knock_request: AcceptKnockRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("accept_knock")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (to_user:User {{node_id: '{user_node_id}'}})<-[k1:knock {{edge_id:'{accept_knock_request.knock_id}'}}]-(from_user:User)
-            WHERE NOT (to_user)-[:is_roommate]-(from_user)
-        OPTIONAL MATCH (from_user)-[knock_edge:knock]->(to_user)
-        OPTIONAL MATCH (to_user)-[knock_edge2:knock]->(from_user)
-        CREATE (from_user)-[:is_roommate {{memo: '', edge_id: randomUUID(),group: knock_edge.group}}]->(to_user)
-        CREATE (to_user)-[:is_roommate {{memo: '', edge_id: randomUUID(),group: '{accept_knock_request.group}',new:true}}]->(from_user)
-        SET from_user.groups = 
-        CASE
-            WHEN knock_edge.group IN from_user.groups THEN from_user.groups
-            ELSE from_user.groups + knock_edge.group
-        END
-        DELETE knock_edge, knock_edge2
-        WITH from_user,to_user
-        OPTIONAL MATCH (from_user)-[:is_roommate]->(new_neighbor:User)
-            WHERE new_neighbor <> to_user AND NOT (from_user)-[:block]-(new_neighbor)
-        RETURN from_user AS new_roommate ,collect(new_neighbor) AS new_neighbors
-        """
-        print(query)
-
-        result = session.run(query)
-        record = result.single()
+        record = await repository.accept_knock(
+            user_node_id, accept_knock_request.knock_id, accept_knock_request.group
+        )
         if not record:
             raise HTTPException(
                 status_code=400,
                 detail="no such knock_edge or already other relations(another knock,is_roommate) exist",
             )
 
-        return AcceptKnockResponse.from_data(
-            record["new_roommate"], record["new_neighbors"]
+        roommate_index.add_roommate(user_node_id, record["new_roommate"]["node_id"])
+        await invalidate_feeds(
+            repository, [user_node_id, record["new_roommate"]["node_id"]]
+        )
+        dispatcher.dispatch(
+            dispatcher.NEW_ROOMMATE_CREATED, [record["new_roommate"]["node_id"]]
+        )
+        return model_response(
+            AcceptKnockResponse.from_data(
+                record["new_roommate"], record["new_neighbors"]
+            )
         )
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.get("/knock/create_link")
 async def create_knock_by_link(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("create_knock_by_link")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     link_code = str(uuid.uuid4())
 
@@ -218,100 +190,125 @@ async def create_knock_by_link(
     link_info = link_code + " : " + expiration_time.replace(microsecond=0).isoformat()
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})<-[:is_info]-(p:PrivateData)
-        WITH p
-        WHERE p.link_count < 5
-        SET p.link_count = p.link_count + 1, 
-            p.link_info = '{link_info}'
-        RETURN 'knock link created' AS message
-        """
-
-        result = session.run(query)
-        record = result.single()
-        if not record:
+        if not await repository.create_knock_link(user_node_id, link_info):
             raise HTTPException(status_code=400, detail="failed to create link")
 
         front_url = os.getenv("FRONT_URL")
         return f"{front_url}/knock/{link_code}"
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/knock/accept_by_link/{knock_id}")
 async def accept_knock_by_link(
     knock_id: str,
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("accept_knock_by_link")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
         datetimenow = datetime.now().replace(microsecond=0).isoformat()
 
-        query = f"""
-            MATCH (u:User)<-[:is_info]-(p:PrivateData)
-            WHERE left(p.link_info, 36) = '{knock_id}'
-            WITH p, u, right(p.link_info, 19) AS expiration_time_str
-            WITH p, u, expiration_time_str, datetime(expiration_time_str) AS expiration_time
-            WHERE expiration_time > datetime("{datetimenow}")
-            MATCH (from_user:User {{node_id: u.node_id}}), (to_user:User {{node_id: '{user_node_id}'}})
-            WHERE NOT (from_user)-[:is_roommate]-(to_user)
-            AND NOT (from_user)-[:block]-(to_user)
-            AND NOT (to_user)-[:block]-(from_user)
-            CREATE (from_user)-[:is_roommate {{memo: '', edge_id: randomUUID(),group: ''}}]->(to_user)
-            CREATE (to_user)-[:is_roommate {{memo: '', edge_id: randomUUID(),group: '',new:true}}]->(from_user)
-            RETURN 'Knock accepted successfully' AS message, from_user.node_id AS link_creator
-            """
-
-        result = session.run(query)
-        record = result.single()
+        record = await repository.accept_knock_by_link(
+            user_node_id, knock_id, datetimenow
+        )
         if not record:
             raise HTTPException(
                 status_code=400, detail="Cannot create is_roommate relationship"
             )
 
-        # dispatcher.dispatch(dispatcher.NEW_ROOMMATE_CREATED,record["link_creator"],user_node_id)
+        roommate_index.add_roommate(user_node_id, record["link_creator"])
+        await invalidate_feeds(repository, [user_node_id, record["link_creator"]])
+        dispatcher.dispatch(dispatcher.NEW_ROOMMATE_CREATED, [record["link_creator"]])
         return record["message"]
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
+
+
+async def reload_roommate_index():
+    # 읽는 동안 이 워커에서 생긴 변경은 인덱스가 기록해 두었다가 load() 에서 다시 적용한다
+    roommate_index.begin_reload()
+    try:
+        async with open_session() as session:
+            edges = []
+            for query in (
+                GET_ROOMMATE_EDGES_QUERY,
+                GET_BLOCK_EDGES_QUERY,
+                GET_MUTE_EDGES_QUERY,
+            ):
+                result = await session.run(query)
+                edges.append(
+                    [
+                        (record["from_node_id"], record["to_node_id"])
+                        async for record in result
+                    ]
+                )
+    except Exception:
+        roommate_index.cancel_reload()
+        raise
+
+    # 다 읽은 뒤 await 없이 바꿔 끼우므로 요청은 이전 인덱스나 새 인덱스 중 하나만 본다
+    roommate_index.load(*edges)
+    logger.info(f"roommate index loaded {roommate_index.stats()}")
+
+
+async def _get_members_from_index(repository: GraphRepository, user_node_id: str):
+    # 응답 모양은 GET_MEMBERS_QUERY 결과와 같다
+    record = await repository.get_member_properties(
+        user_node_id, roommate_index.pure_neighbors(user_node_id)
+    )
+    if not record:
+        raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
+
+    roommates_with_neighbors = []
+    has_new_roommate = False
+    for roommate in record["roommates"]:
+        if roommate["roommate"] is None:
+            continue
+        roommate_edge = dict(roommate["roommate_edge"])
+        if roommate_edge.pop("new", None):
+            has_new_roommate = True
+        roommates_with_neighbors.append(
+            {
+                "roommate_edge": roommate_edge,
+                "roommate": roommate["roommate"],
+                "neighbors": roommate_index.neighbors_via(
+                    user_node_id, roommate["roommate"]["node_id"]
+                ),
+            }
+        )
+
+    if has_new_roommate:
+        await repository.clear_new_roommate_flags(user_node_id)
+
+    return [
+        {
+            "me": record["me"],
+            "pure_neighbors": record["pure_neighbors"],
+            "roommatesWithNeighbors": roommates_with_neighbors,
+        }
+    ]
 
 
 @router.get("/get-members")
 async def get_members(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_members")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     try:
-        query = f"""
-        MATCH (me:User {{node_id: '{user_node_id}'}})
-            OPTIONAL MATCH (me)-[r1:is_roommate]->(r:User)
-            REMOVE r1.new
-            WITH me,r1,r
-            OPTIONAL MATCH (r)-[:is_roommate]->(n:User)
-                WHERE n<>me
-            WITH me, r1,collect(n.node_id) as ns
-            WITH collect({{roommate_edge:properties(r1),roommate:properties(endNode(r1)),neighbors:ns}}) as collected,collect(endNode(r1)) as roommates, me
-            OPTIONAL MATCH (me)-[r1:is_roommate]->(r:User)
-            OPTIONAL MATCH (r)-[:is_roommate]->(n:User)
-            WHERE n<>me AND NOT (me)<-[:block]->(n) AND NOT n in roommates
-            RETURN me,collect(DISTINCT n) as pure_neighbors,collected as roommatesWithNeighbors    
-        """
-        result = session.run(query)
-        record = result.data()
+        # 응답이 DB 에서 읽은 dict/list 뿐이라 jsonable_encoder 를 거치지 않고 orjson 으로 바로 쓴다
+        if roommate_index.loaded:
+            return ORJSONResponse(await _get_members_from_index(repository, user_node_id))
+
+        record = await repository.get_members(user_node_id)
 
         if record[0]["roommatesWithNeighbors"][0] == {
             "neighbors": [],
@@ -319,165 +316,116 @@ async def get_members(
             "roommate": None,
         }:
             record[0]["roommatesWithNeighbors"] = []
-        return record
+        return ORJSONResponse(record)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/get-member", response_model=GetFriendResponse)
 async def get_member(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     get_friend_request: GetFriendRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_member")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        OPTIONAL MATCH (friend:User {{node_id: '{get_friend_request.user_node_id}'}})
-        OPTIONAL MATCH (me:User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (friend)<-[b:block]->(me)
-        OPTIONAL MATCH (me)-[r:is_roommate]->(friend)
-        OPTIONAL MATCH (friend)<-[:creator_of_sticker]-(sticker:Sticker) WHERE sticker.deleted_at = ""
-        OPTIONAL MATCH (friend)<-[:is_post]-(post:Post)
-        WITH friend, b, r, collect(sticker) AS stickers, collect(post) AS posts
-        RETURN
-        CASE
-            WHEN friend IS NULL THEN "no such node {get_friend_request.user_node_id}"
-            WHEN b IS NOT NULL THEN "block exists"
-            ELSE "welcome my friend"
-        END AS message,
-        friend, COALESCE(properties(r), []) AS roommate_edge, stickers, posts
-        """
-
-        result = session.run(query)
-        record = result.single()
+        record = await repository.get_member(
+            user_node_id, get_friend_request.user_node_id
+        )
 
         if record["message"] != "welcome my friend":
             raise HTTPException(status_code=404, detail=record["message"])
 
-        return GetFriendResponse.from_data(
-            dict(record["friend"]),
-            dict(record["roommate_edge"]),
-            record["stickers"],
-            record["posts"],
+        return model_response(
+            GetFriendResponse.from_data(
+                record["friend"],
+                record["roommate_edge"],
+                record["stickers"],
+                record["posts"],
+            )
         )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/delete-member", response_model=DeleteFriendResponse)
 async def delete_member(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     delete_friend_request: DeleteFriendRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("delete_member")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
     try:
-        query = f"""
-        MATCH (u:User)-[r:is_roommate]->(f:User {{node_id: '{delete_friend_request.user_node_id}'}})
-        WHERE u.node_id = '{user_node_id}'
-        DELETE r
-        WITH u, f
-        MATCH (f)-[r2:is_roommate]->(u)
-        DELETE r2
-        RETURN 'Edge deleted' AS message
-        """
-
-        result = session.run(query)
-        record = result.single()
-        if not record:
+        message = await repository.delete_roommate(
+            user_node_id, delete_friend_request.user_node_id
+        )
+        if not message:
             raise HTTPException(
                 status_code=404,
                 detail=f"No such friend {delete_friend_request.user_node_id} to delete relationship",
             )
 
-        return DeleteFriendResponse(message=record["message"])
+        roommate_index.remove_roommate(
+            user_node_id, delete_friend_request.user_node_id
+        )
+        # 끊긴 뒤의 2홉 범위에도 서로의 예전 roommate 가 포함되므로 삭제 후 계산해도 된다
+        await invalidate_feeds(
+            repository, [user_node_id, delete_friend_request.user_node_id]
+        )
+        return DeleteFriendResponse(message=message)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/memo/get-content", response_model=GetMemoResponse)
 async def get_memo(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     get_memo_request: GetMemoRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_memo")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})-[r:is_roommate]->(f:User {{node_id: '{get_memo_request.user_node_id}'}})
-        RETURN r.memo AS memo
-        """
-        # f"""
-        # MATCH (u:User)-[r:is_roommate]->(f:User {{node_id: '{get_memo_request.user_node_id}'}})
-        # WHERE f.node_id = '{user_node_id}'
-        # RETURN r.memo AS memo
-        # """
-
-        result = session.run(query)
-        record = result.single()
+        memo = await repository.get_memo(user_node_id, get_memo_request.user_node_id)
 
-        if not record:
+        if memo is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"No memo found for friend {get_memo_request.user_node_id}",
             )
 
-        return GetMemoResponse(memo=record["memo"])
+        return GetMemoResponse(memo=memo)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/memo/modify", response_model=ModifyMemoResponse)
 async def modify_memo(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     modify_memo_request: ModifyMemoRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("modify_memo")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User)-[r:is_roommate]->(f:User {{node_id: '{modify_memo_request.user_node_id}'}})
-        WHERE u.node_id = '{user_node_id}'
-        SET r.memo = '{modify_memo_request.new_memo}'
-        RETURN r.memo AS memo
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        if not await repository.modify_memo(
+            user_node_id,
+            modify_memo_request.user_node_id,
+            modify_memo_request.new_memo,
+        ):
             raise HTTPException(
                 status_code=404,
                 detail=f"No such friend {modify_memo_request.user_node_id} to modify memo",
@@ -489,33 +437,19 @@ async def modify_memo(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.get(
     "/group/get-groups-name-and-number", response_model=GetGroupsNameAndNumberResponse
 )
 async def get_group(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_groups_name_and_number")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        WITH u, u.groups AS myGroups
-        UNWIND myGroups AS name
-        OPTIONAL MATCH (u)-[r:is_roommate]->(f:User)
-        WHERE r.group = name
-        RETURN name, COUNT(r) as count
-        """
-
-        result = session.run(query)
-        record = result.data()
+        record = await repository.get_groups(user_node_id)
 
         if not record:
             raise HTTPException(
@@ -529,32 +463,22 @@ async def get_group(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/group/modify", response_model=ModifyGroupResponse)
 async def modify_group(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     modify_group_request: ModifyGroupRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("modify_group")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User)-[r:is_roommate]->(f:User {{node_id: '{modify_group_request.user_node_id}'}})
-        WHERE u.node_id = '{user_node_id}'
-        SET r.group = '{modify_group_request.new_group}'
-        RETURN r.group AS group
-        """
-
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        if not await repository.modify_group(
+            user_node_id,
+            modify_group_request.user_node_id,
+            modify_group_request.new_group,
+        ):
             raise HTTPException(
                 status_code=404,
                 detail=f"No such group {modify_group_request.user_node_id} to modify group",
@@ -566,5 +490,3 @@ async def modify_group(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
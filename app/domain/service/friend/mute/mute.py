@@ -1,80 +1,57 @@
 # backend/domain/service/friend/block/block.py
 from typing import List
-from fastapi import APIRouter, HTTPException, Depends, Body, Request
-from app.utils import verify_access_token, Logger
-from app.config.connection import get_session
+from fastapi import APIRouter, HTTPException, Depends, Body
+from app.utils import current_user, Logger, feed_cache
+from app.utils.roommate_index import roommate_index
+from app.repository import GraphRepository, get_repository
 from .request import MuteFriendRequest, PopMutedRequest
 from .response import MuteFriendResponse, GetMutedResponse, PopMutedResponse
 
 router = APIRouter()
-ACCESS_TOKEN = "access_token"
 
 logger = Logger(__file__)
 
 
 @router.post("/add_member", response_model=MuteFriendResponse)
 async def mute_friend(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     mute_friend_request: MuteFriendRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("mute_friend")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-            MATCH (from_user:User {{node_id: '{user_node_id}'}}), (to_user:User {{node_id: '{mute_friend_request.user_node_id}'}})
-            OPTIONAL MATCH (from_user)-[m:mute]->(to_user)
-
-            WITH from_user, to_user, m
-
-            CALL apoc.do.case(
-            [
-                from_user.node_id = to_user.node_id, 'RETURN "cannot mute myself" AS message',
-                m IS NOT NULL, 'RETURN "already muted" AS message'
-            ],
-            'MERGE (from_user)-[:mute {{edge_id: randomUUID()}}]->(to_user) RETURN "muted successfully" AS message',
-            {{from_user: from_user, to_user: to_user, m: m}}
-            ) YIELD value
-            RETURN value.message AS message
-            """
-
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        message = await repository.mute(
+            user_node_id, mute_friend_request.user_node_id
+        )
+
+        if not message:
             raise HTTPException(status_code=400, detail="Failed to mute")
-        return MuteFriendResponse(message=record["message"])
+
+        if message != "cannot mute myself":
+            roommate_index.add_mute(user_node_id, mute_friend_request.user_node_id)
+        # mute 는 내 피드에서만 상대를 가린다
+        await feed_cache.invalidate([user_node_id])
+        return MuteFriendResponse(message=message)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/get-members", response_model=List[GetMutedResponse])
 async def get_muteed(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_muted")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})-[m:mute]->(muted_user:User)
-        RETURN m.edge_id, muted_user
-        """
-
-        result = session.run(query)
-        records = result.data()
+        muted = await repository.list_muted(user_node_id)
         response = [
-            GetMutedResponse.from_data(record["m.edge_id"], record["muted_user"])
-            for record in records
+            GetMutedResponse.from_data(mute_edge_id, muted_user)
+            for mute_edge_id, muted_user in muted
         ]
         return response
 
@@ -82,33 +59,26 @@ async def get_muteed(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/pop-members")
 async def pop_muted(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     pop_muted_request: PopMutedRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("pop_muted")
-    token = request.cookies.get(ACCESS_TOKEN)
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (from_user:User {{node_id: '{user_node_id}'}})-[m:mute {{edge_id: '{pop_muted_request.mute_edge_id}'}}]->(to_user:User)
-        DELETE m
-        RETURN m
-        """
-
-        result = session.run(query)
-        record = result.single()
+        to_user_node_id = await repository.unmute(
+            user_node_id, pop_muted_request.mute_edge_id
+        )
 
-        if not record:
+        if not to_user_node_id:
             raise HTTPException(status_code=400, detail="Failed to mute")
         else:
+            roommate_index.remove_mute(user_node_id, to_user_node_id)
+            await feed_cache.invalidate([user_node_id])
             return PopMutedResponse(
                 message=f"'{pop_muted_request.mute_edge_id}' dropped"
             )
@@ -117,5 +87,3 @@ async def pop_muted(
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
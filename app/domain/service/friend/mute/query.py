@@ -0,0 +1,29 @@
+MUTE_FRIEND_QUERY = """
+MATCH (from_user:User {node_id: $user_node_id}), (to_user:User {node_id: $friend_node_id})
+OPTIONAL MATCH (from_user)-[m:mute]->(to_user)
+
+WITH from_user, to_user, m
+
+CALL apoc.do.case(
+[
+    from_user.node_id = to_user.node_id, 'RETURN "cannot mute myself" AS message',
+    m IS NOT NULL, 'RETURN "already muted" AS message'
+],
+'MERGE (from_user)-[:mute {edge_id: randomUUID()}]->(to_user) RETURN "muted successfully" AS message',
+{from_user: from_user, to_user: to_user, m: m}
+) YIELD value
+RETURN value.message AS message
+"""
+
+
+GET_MUTED_QUERY = """
+MATCH (u:User {node_id: $user_node_id})-[m:mute]->(muted_user:User)
+RETURN m.edge_id, muted_user
+"""
+
+
+POP_MUTED_QUERY = """
+MATCH (from_user:User {node_id: $user_node_id})-[m:mute {edge_id: $mute_edge_id}]->(to_user:User)
+DELETE m
+RETURN m, to_user.node_id AS to_user_node_id
+"""
@@ -0,0 +1,208 @@
+SEND_KNOCK_QUERY = """
+MATCH (from_user:User {node_id: $from_user_node_id})
+MATCH (to_user:User {node_id: $to_user_node_id})
+
+OPTIONAL MATCH (from_user)-[k:knock]->(to_user)
+OPTIONAL MATCH (from_user)-[b:block]->(to_user)
+OPTIONAL MATCH (to_user)-[r:is_roommate]->(from_user)
+
+WITH from_user, to_user, k, b, r
+
+CALL apoc.do.case(
+[
+    from_user.node_id = to_user.node_id, 'RETURN "cannot send to myself" AS message',
+    from_user IS NULL, 'RETURN "User does not exist" AS message',
+    to_user IS NULL, 'RETURN "User does not exist" AS message',
+    k IS NOT NULL, 'RETURN "knock already sent" AS message',
+    b IS NOT NULL, 'RETURN "User does not exist" AS message',
+    r IS NOT NULL, 'RETURN "already roommate" AS message'
+],
+'CREATE (from_user)-[k: knock {edge_id: $knock_edge_id, group: $group, created_at: $created_at}]->(to_user) RETURN "send knock successfully" AS message',
+{from_user:from_user, to_user:to_user, knock_edge_id: $knock_edge_id, group: $group, created_at: $created_at}
+) YIELD value
+RETURN value.message AS message
+"""
+
+
+GET_KNOCKS_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[k:knock]-(from_user:User)
+RETURN k.edge_id AS knock_edge_id, from_user.nickname AS nickname
+"""
+
+
+# 최신순으로 (created_at, edge_id) 키셋 cursor 다음부터 $limit 개
+GET_KNOCKS_PAGE_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[k:knock]-(from_user:User)
+WHERE $cursor_created_at IS NULL
+OR k.created_at < $cursor_created_at
+OR (k.created_at = $cursor_created_at AND k.edge_id < $cursor_edge_id)
+RETURN k.edge_id AS knock_edge_id, from_user.nickname AS nickname, k.created_at AS created_at
+ORDER BY k.created_at DESC, k.edge_id DESC
+LIMIT $limit
+"""
+
+
+REJECT_KNOCK_QUERY = """
+MATCH (from_user:User)-[k:knock]->(to_user:User {node_id: $user_node_id})
+WHERE k.edge_id = $knock_id
+DELETE k
+RETURN "knock deleted successfully" AS message
+"""
+
+
+ACCEPT_KNOCK_QUERY = """
+MATCH (to_user:User {node_id: $user_node_id})<-[k1:knock {edge_id: $knock_id}]-(from_user:User)
+    WHERE NOT (to_user)-[:is_roommate]-(from_user)
+OPTIONAL MATCH (from_user)-[knock_edge:knock]->(to_user)
+OPTIONAL MATCH (to_user)-[knock_edge2:knock]->(from_user)
+CREATE (from_user)-[:is_roommate {memo: '', edge_id: randomUUID(),group: knock_edge.group}]->(to_user)
+CREATE (to_user)-[:is_roommate {memo: '', edge_id: randomUUID(),group: $group,new:true}]->(from_user)
+SET from_user.groups =
+CASE
+    WHEN knock_edge.group IN from_user.groups THEN from_user.groups
+    ELSE from_user.groups + knock_edge.group
+END
+DELETE knock_edge, knock_edge2
+WITH from_user,to_user
+OPTIONAL MATCH (from_user)-[:is_roommate]->(new_neighbor:User)
+    WHERE new_neighbor <> to_user AND NOT (from_user)-[:block]-(new_neighbor)
+RETURN from_user AS new_roommate ,collect(new_neighbor) AS new_neighbors
+"""
+
+
+CREATE_KNOCK_LINK_QUERY = """
+MATCH (u:User {node_id: $user_node_id})<-[:is_info]-(p:PrivateData)
+WITH p
+WHERE p.link_count < 5
+SET p.link_count = p.link_count + 1,
+    p.link_info = $link_info
+RETURN 'knock link created' AS message
+"""
+
+
+ACCEPT_KNOCK_BY_LINK_QUERY = """
+MATCH (u:User)<-[:is_info]-(p:PrivateData)
+WHERE left(p.link_info, 36) = $knock_id
+WITH p, u, right(p.link_info, 19) AS expiration_time_str
+WITH p, u, expiration_time_str, datetime(expiration_time_str) AS expiration_time
+WHERE expiration_time > datetime($now)
+MATCH (from_user:User {node_id: u.node_id}), (to_user:User {node_id: $user_node_id})
+WHERE NOT (from_user)-[:is_roommate]-(to_user)
+AND NOT (from_user)-[:block]-(to_user)
+AND NOT (to_user)-[:block]-(from_user)
+CREATE (from_user)-[:is_roommate {memo: '', edge_id: randomUUID(),group: ''}]->(to_user)
+CREATE (to_user)-[:is_roommate {memo: '', edge_id: randomUUID(),group: '',new:true}]->(from_user)
+RETURN 'Knock accepted successfully' AS message, from_user.node_id AS link_creator
+"""
+
+
+GET_MEMBERS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+    OPTIONAL MATCH (me)-[r1:is_roommate]->(r:User)
+    REMOVE r1.new
+    WITH me,r1,r
+    OPTIONAL MATCH (r)-[:is_roommate]->(n:User)
+        WHERE n<>me
+    WITH me, r1,collect(n.node_id) as ns
+    WITH collect({roommate_edge:properties(r1),roommate:properties(endNode(r1)),neighbors:ns}) as collected,collect(endNode(r1)) as roommates, me
+    OPTIONAL MATCH (me)-[r1:is_roommate]->(r:User)
+    OPTIONAL MATCH (r)-[:is_roommate]->(n:User)
+    WHERE n<>me AND NOT (me)<-[:block]->(n) AND NOT n in roommates
+    RETURN me,collect(DISTINCT n) as pure_neighbors,collected as roommatesWithNeighbors
+"""
+
+
+GET_MEMBER_QUERY = """
+OPTIONAL MATCH (friend:User {node_id: $friend_node_id})
+OPTIONAL MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (friend)<-[b:block]->(me)
+OPTIONAL MATCH (me)-[r:is_roommate]->(friend)
+OPTIONAL MATCH (friend)<-[:creator_of_sticker]-(sticker:Sticker) WHERE sticker.deleted_at = ""
+OPTIONAL MATCH (friend)<-[:is_post]-(post:Post)
+WITH friend, b, r, collect(sticker) AS stickers, collect(post) AS posts
+RETURN
+CASE
+    WHEN friend IS NULL THEN "no such node " + $friend_node_id
+    WHEN b IS NOT NULL THEN "block exists"
+    ELSE "welcome my friend"
+END AS message,
+friend, COALESCE(properties(r), []) AS roommate_edge, stickers, posts
+"""
+
+
+DELETE_MEMBER_QUERY = """
+MATCH (u:User)-[r:is_roommate]->(f:User {node_id: $friend_node_id})
+WHERE u.node_id = $user_node_id
+DELETE r
+WITH u, f
+MATCH (f)-[r2:is_roommate]->(u)
+DELETE r2
+RETURN 'Edge deleted' AS message
+"""
+
+
+GET_MEMO_QUERY = """
+MATCH (u:User {node_id: $user_node_id})-[r:is_roommate]->(f:User {node_id: $friend_node_id})
+RETURN r.memo AS memo
+"""
+
+
+MODIFY_MEMO_QUERY = """
+MATCH (u:User)-[r:is_roommate]->(f:User {node_id: $friend_node_id})
+WHERE u.node_id = $user_node_id
+SET r.memo = $new_memo
+RETURN r.memo AS memo
+"""
+
+
+GET_GROUPS_NAME_AND_NUMBER_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+WITH u, u.groups AS myGroups
+UNWIND myGroups AS name
+OPTIONAL MATCH (u)-[r:is_roommate]->(f:User)
+WHERE r.group = name
+RETURN name, COUNT(r) as count
+"""
+
+
+MODIFY_GROUP_QUERY = """
+MATCH (u:User)-[r:is_roommate]->(f:User {node_id: $friend_node_id})
+WHERE u.node_id = $user_node_id
+SET r.group = $new_group
+RETURN r.group AS group
+"""
+
+
+# get-members 의 2홉 탐색은 roommate_index 가 하고, 여기서는 속성만 가져온다
+GET_MEMBERS_PROPERTIES_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+OPTIONAL MATCH (me)-[r:is_roommate]->(roommate:User)
+WITH me, collect({roommate_edge: properties(r), roommate: properties(roommate)}) AS roommates
+OPTIONAL MATCH (n:User)
+    WHERE n.node_id IN $pure_neighbor_ids
+RETURN properties(me) AS me, roommates, collect(properties(n)) AS pure_neighbors
+"""
+
+
+CLEAR_NEW_ROOMMATE_FLAGS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})-[r:is_roommate {new: true}]->(:User)
+REMOVE r.new
+"""
+
+
+GET_ROOMMATE_EDGES_QUERY = """
+MATCH (u:User)-[:is_roommate]->(f:User)
+RETURN u.node_id AS from_node_id, f.node_id AS to_node_id
+"""
+
+
+GET_BLOCK_EDGES_QUERY = """
+MATCH (u:User)-[:block]->(f:User)
+RETURN u.node_id AS from_node_id, f.node_id AS to_node_id
+"""
+
+
+GET_MUTE_EDGES_QUERY = """
+MATCH (u:User)-[:mute]->(f:User)
+RETURN u.node_id AS from_node_id, f.node_id AS to_node_id
+"""
@@ -1,5 +1,15 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import Any, List, Dict
+
+
+def _properties(data: Dict[str, Any]) -> Dict[str, str | List[str]]:
+    # 노드/엣지 속성을 응답 타입(문자열 또는 문자열 목록)으로 바꾼다. 값이 없는(None) 속성은 뺀다
+    return {
+        key: [str(item) for item in value] if isinstance(value, list) else str(value)
+        for key, value in data.items()
+        if value is not None
+    }
+
 
 class Sticker(BaseModel):
     sticker_node_id:str
@@ -43,16 +53,17 @@ class GetFriendResponse(BaseModel):
 
     @classmethod
     def from_data(cls, 
-            friend: Dict[str, str],
-            roommate_edge: Dict[str, str|List[str]], 
+            friend: Dict[str, Any],
+            roommate_edge: Dict[str, Any],
             stickers: List[Dict[str, str]], 
             posts: List[Dict[str, str]]
         ):
         sticker_objects = [Sticker.from_data(dict(sticker)) for sticker in stickers]
         post_objects = [Post.from_data(dict(post)) for post in posts]
+        # roommate 가 아니면 쿼리가 roommate_edge 로 빈 목록을 돌려준다
         return cls(
-            friend=friend,
-            roommate_edge=roommate_edge,
+            friend=_properties(dict(friend)),
+            roommate_edge=_properties(dict(roommate_edge or {})),
             stickers=sticker_objects,
             posts=post_objects,
         )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class KnockData(BaseModel):
@@ -9,7 +9,9 @@ class KnockData(BaseModel):
 
 class GetKnocksResponse(BaseModel):
     knocks: List[KnockData]
+    # limit 이나 cursor 를 주고 다음 페이지가 있을 때만 채워진다
+    next_cursor: Optional[str] = None
 
     def append_knock(self, edge_id: str, nickname: str):
-        edge_data = KnockData(edge_id=edge_id, nickname=nickname)
+        edge_data = KnockData(edge_id=edge_id, nickname=nickname or "")
         self.knocks.append(edge_data)
@@ -0,0 +1,4 @@
+# domain/service/upload/__init__.py
+from .upload import router as upload_router
+
+__all__ = ["upload_router"]
@@ -0,0 +1,37 @@
+COMMIT_PROFILE_IMAGE_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+SET u.profile_image_url = $profile_image_url
+RETURN u.node_id AS node_id
+"""
+
+
+# presign 으로 발급한 키. commit 되면 지우고, 끝내 commit 되지 않은 키는 정리 작업이 S3 에서 지운다
+CREATE_PENDING_UPLOADS_QUERY = """
+UNWIND $keys AS key
+MERGE (p:PendingUpload {key: key})
+SET p.user_node_id = $user_node_id,
+    p.created_at = $created_at
+"""
+
+# commit 하는 사용자에게 발급한 키만 가져간다. 가져간 키는 지워지므로 같은 키로 두 번 commit 할 수 없다
+CLAIM_PENDING_UPLOADS_QUERY = """
+MATCH (p:PendingUpload)
+WHERE p.key IN $keys
+AND p.user_node_id = $user_node_id
+WITH p, p.key AS key
+DELETE p
+RETURN key
+"""
+
+DELETE_PENDING_UPLOADS_QUERY = """
+MATCH (p:PendingUpload)
+WHERE p.key IN $keys
+DELETE p
+"""
+
+GET_ABANDONED_UPLOADS_QUERY = """
+MATCH (p:PendingUpload)
+WHERE p.created_at < $created_before
+RETURN p.key AS key
+LIMIT $batch_size
+"""
@@ -0,0 +1,4 @@
+from .presign_upload_request import PresignUploadRequest
+from .commit_sticker_request import CommitStickerRequest
+from .commit_post_request import CommitPostRequest
+from .commit_profile_image_request import CommitProfileImageRequest
@@ -0,0 +1,10 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class CommitPostRequest(BaseModel):
+    title: str
+    content: str
+    is_public: bool = True
+    tags: List[str] = []
+    image_keys: List[str] = []
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class CommitProfileImageRequest(BaseModel):
+    image_key: str
@@ -0,0 +1,7 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class CommitStickerRequest(BaseModel):
+    content: str = ""
+    image_keys: List[str] = []
@@ -0,0 +1,7 @@
+from typing import List, Literal
+from pydantic import BaseModel, Field
+
+
+class PresignUploadRequest(BaseModel):
+    kind: Literal["sticker", "post", "profile_image"]
+    filenames: List[str] = Field(..., min_length=1, max_length=10)
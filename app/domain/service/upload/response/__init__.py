@@ -0,0 +1,2 @@
+from .presign_upload_response import PresignUploadResponse, PresignedUpload
+from .commit_upload_response import CommitUploadResponse
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class CommitUploadResponse(BaseModel):
+    message: str = "upload committed successfully"
@@ -0,0 +1,13 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class PresignedUpload(BaseModel):
+    key: str
+    url: str
+    fields: Dict[str, str]
+
+
+class PresignUploadResponse(BaseModel):
+    uploads: List[PresignedUpload]
+    expires_in: int
@@ -0,0 +1,270 @@
+# backend/domain/service/upload/upload.py
+import asyncio
+import mimetypes
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Body, Depends, HTTPException
+from app.utils import current_user, Logger, dispatcher
+from app.utils.s3_client import s3_client
+from app.utils.s3_uploader import s3_url_from_key
+from app.utils.s3_delete_queue import s3_delete_queue
+from app.utils.s3_client import S3_DELETE_BATCH_SIZE
+from app.config.connection import S3_BUCKET_NAME
+from app.repository import GraphRepository, get_repository, open_repository
+from ..content.feed import invalidate_feeds
+from .request import (
+    PresignUploadRequest,
+    CommitStickerRequest,
+    CommitPostRequest,
+    CommitProfileImageRequest,
+)
+from .response import PresignUploadResponse, PresignedUpload, CommitUploadResponse
+
+# 이미지 바이트는 클라이언트가 S3 로 직접 올리고, API 는 서명된 업로드 정책 발급과 키 기록만 한다.
+# 1. /presign 으로 키와 업로드 정책을 받는다
+# 2. 클라이언트가 url 에 fields + file 을 multipart/form-data 로 POST 한다
+# 3. /commit/* 에 키를 넘기면 객체가 실제로 올라갔는지 확인하고 노드에 기록한다
+# 발급한 키는 PendingUpload 로 남겨 두고, commit 할 때 그 사용자에게 발급된 키인지 확인하며 가져간다.
+# commit 되지 않은 채 UPLOAD_COMMIT_GRACE_MINUTES 가 지나면 delete_abandoned_uploads 가 S3 삭제 큐로 넘긴다.
+# 프로필 이미지는 키가 하나로 고정이라 남지 않는다.
+logger = Logger(__file__)
+router = APIRouter()
+PRESIGN_EXPIRES_IN = int(os.getenv("S3_PRESIGN_EXPIRES_IN", 300))
+MAX_UPLOAD_BYTES = int(os.getenv("S3_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+UPLOAD_COMMIT_GRACE_MINUTES = int(os.getenv("UPLOAD_COMMIT_GRACE_MINUTES", 60))
+
+
+def _presign(s3_key: str, filename: str) -> PresignedUpload:
+    mime_type, _ = mimetypes.guess_type(filename)
+    content_type = mime_type or "application/octet-stream"
+    presigned = s3_client.generate_presigned_post(
+        Bucket=S3_BUCKET_NAME,
+        Key=s3_key,
+        Fields={"acl": "public-read", "Content-Type": content_type},
+        Conditions=[
+            {"acl": "public-read"},
+            {"Content-Type": content_type},
+            ["content-length-range", 1, MAX_UPLOAD_BYTES],
+        ],
+        ExpiresIn=PRESIGN_EXPIRES_IN,
+    )
+    return PresignedUpload(
+        key=s3_key, url=presigned["url"], fields=presigned["fields"]
+    )
+
+
+def _object_exists(s3_key: str) -> bool:
+    try:
+        s3_client.head_object(Bucket=S3_BUCKET_NAME, Key=s3_key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+            return False
+        raise
+
+
+async def _verify_keys(
+    repository: GraphRepository, user_node_id: str, kind: str, s3_keys: List[str]
+):
+    # 다른 사용자의 키나 다른 종류의 키를 기록하지 못하게 prefix 를 확인하고, 실제로 올라왔는지 본다
+    # 스티커/게시글 키는 presign 이 이 사용자에게 발급한 PendingUpload 를 가져가야 통과한다
+    if kind == "profile_image":
+        allowed = [key == f"{user_node_id}/profile_image" for key in s3_keys]
+    else:
+        allowed = [key.startswith(f"{user_node_id}/{kind}/") for key in s3_keys]
+    if not all(allowed):
+        raise HTTPException(status_code=403, detail="invalid upload key")
+
+    exists = await asyncio.gather(
+        *(asyncio.to_thread(_object_exists, s3_key) for s3_key in s3_keys)
+    )
+    missing = [s3_key for s3_key, found in zip(s3_keys, exists) if not found]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"upload not found: {missing}")
+
+    if kind == "profile_image" or not s3_keys:
+        return
+    claimed = await repository.claim_pending_uploads(user_node_id, s3_keys)
+    if set(claimed) != set(s3_keys):
+        await _release_keys(repository, user_node_id, claimed)
+        raise HTTPException(status_code=403, detail="invalid upload key")
+
+
+async def _release_keys(
+    repository: GraphRepository, user_node_id: str, s3_keys: List[str]
+):
+    # 가져간 키를 기록하지 못했으면 PendingUpload 로 되돌려서 정리 작업이 S3 객체를 지우게 한다
+    if s3_keys:
+        await repository.create_pending_uploads(
+            user_node_id,
+            s3_keys,
+            datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        )
+
+
+async def delete_abandoned_uploads():
+    # 스케줄러 작업. S3 삭제 큐에 먼저 넣고 나서 PendingUpload 를 지우므로 중간에 죽어도 키를 잃지 않는다
+    created_before = (
+        datetime.now(timezone.utc).replace(microsecond=0)
+        - timedelta(seconds=PRESIGN_EXPIRES_IN, minutes=UPLOAD_COMMIT_GRACE_MINUTES)
+    ).isoformat()
+    deleted = 0
+
+    async with open_repository() as repository:
+        while True:
+            keys = await repository.list_abandoned_uploads(
+                created_before, S3_DELETE_BATCH_SIZE
+            )
+            if not keys:
+                break
+
+            await s3_delete_queue.enqueue(keys)
+            await repository.delete_pending_uploads(keys)
+            deleted += len(keys)
+
+    logger.info(f"delete_abandoned_uploads deleted={deleted}")
+    return deleted
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+async def presign_upload(
+    repository: GraphRepository = Depends(get_repository),
+    presign_upload_request: PresignUploadRequest = Body(...),
+    user_node_id: str = Depends(current_user),
+):
+    kind = presign_upload_request.kind
+    filenames = presign_upload_request.filenames
+
+    if kind == "profile_image":
+        # 프로필 이미지는 사용자당 하나라서 기존 키를 덮어쓴다
+        if len(filenames) != 1:
+            raise HTTPException(
+                status_code=400, detail="profile_image takes exactly one file"
+            )
+        s3_keys = [f"{user_node_id}/profile_image"]
+    else:
+        datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        upload_id = f"{datetimenow}_{uuid.uuid4().hex[:8]}"
+        s3_keys = [
+            f"{user_node_id}/{kind}/{upload_id}/{index}_{os.path.basename(filename)}"
+            for index, filename in enumerate(filenames)
+        ]
+
+    try:
+        if kind != "profile_image":
+            await repository.create_pending_uploads(
+                user_node_id,
+                s3_keys,
+                datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+            )
+        uploads = [
+            _presign(s3_key, filename) for s3_key, filename in zip(s3_keys, filenames)
+        ]
+        return PresignUploadResponse(uploads=uploads, expires_in=PRESIGN_EXPIRES_IN)
+    except Exception as e:
+        logger.error(f"Failed to presign upload: {e}")
+        raise HTTPException(status_code=500, detail="Failed to presign upload")
+
+
+@router.post("/commit/sticker", response_model=CommitUploadResponse)
+async def commit_sticker(
+    repository: GraphRepository = Depends(get_repository),
+    commit_sticker_request: CommitStickerRequest = Body(...),
+    user_node_id: str = Depends(current_user),
+):
+    datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+    try:
+        image_keys = commit_sticker_request.image_keys
+        await _verify_keys(repository, user_node_id, "sticker", image_keys)
+
+        try:
+            sticker_node_id = await repository.create_sticker(
+                user_node_id,
+                commit_sticker_request.content,
+                [s3_url_from_key(key) for key in image_keys],
+                datetimenow,
+            )
+
+            if not sticker_node_id:
+                raise HTTPException(
+                    status_code=404, detail=f"no such user {user_node_id}"
+                )
+        except Exception:
+            await _release_keys(repository, user_node_id, image_keys)
+            raise
+
+        await invalidate_feeds(repository, [user_node_id])
+        dispatcher.dispatch(dispatcher.STICKER_FANOUT_REQUESTED, [sticker_node_id])
+        return CommitUploadResponse()
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/commit/post", response_model=CommitUploadResponse)
+async def commit_post(
+    repository: GraphRepository = Depends(get_repository),
+    commit_post_request: CommitPostRequest = Body(...),
+    user_node_id: str = Depends(current_user),
+):
+    datetimenow = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+    try:
+        image_keys = commit_post_request.image_keys
+        await _verify_keys(repository, user_node_id, "post", image_keys)
+
+        try:
+            created = await repository.create_post(
+                user_node_id,
+                commit_post_request.content,
+                [s3_url_from_key(key) for key in image_keys],
+                commit_post_request.is_public,
+                commit_post_request.title,
+                commit_post_request.tags,
+                datetimenow,
+            )
+
+            if not created:
+                raise HTTPException(
+                    status_code=404, detail=f"no such user {user_node_id}"
+                )
+        except Exception:
+            await _release_keys(repository, user_node_id, image_keys)
+            raise
+
+        return CommitUploadResponse()
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/commit/profile-image", response_model=CommitUploadResponse)
+async def commit_profile_image(
+    repository: GraphRepository = Depends(get_repository),
+    commit_profile_image_request: CommitProfileImageRequest = Body(...),
+    user_node_id: str = Depends(current_user),
+):
+    image_key = commit_profile_image_request.image_key
+
+    try:
+        await _verify_keys(repository, user_node_id, "profile_image", [image_key])
+
+        if not await repository.set_profile_image(
+            user_node_id, s3_url_from_key(image_key)
+        ):
+            raise HTTPException(status_code=404, detail=f"no such user {user_node_id}")
+
+        return CommitUploadResponse()
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
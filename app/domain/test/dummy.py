@@ -136,3 +136,94 @@ MERGE (user1)-[:is_roommate {edge_id: randomUUID(), memo: '', group: ''}]->(user
 
 RETURN "Success" AS message
 """
+
+
+# 합성 그래프 적재. 모든 쿼리는 한 배치($rows)를 한 트랜잭션으로 넣는다.
+CREATE_SYNTHETIC_USERS_QUERY = """
+UNWIND $rows AS row
+CREATE (pd:PrivateData {
+  email: row.email,
+  password: $password,
+  username: row.username,
+  link_info: "",
+  verification_info: "",
+  link_count: 0,
+  verification_count: 0,
+  grant: "verified",
+  node_id: randomUUID()
+})
+CREATE (u:User {
+  username: row.username,
+  nickname: row.nickname,
+  tags: [],
+  my_memo: "",
+  groups: [''],
+  node_id: row.node_id
+})
+CREATE (pd)-[:is_info]->(u)
+RETURN count(u) AS created
+"""
+
+
+CREATE_SYNTHETIC_ROOMMATES_QUERY = """
+UNWIND $rows AS row
+MATCH (a:User {node_id: row[0]})
+MATCH (b:User {node_id: row[1]})
+CREATE (a)-[:is_roommate {edge_id: randomUUID(), memo: '', group: ''}]->(b)
+CREATE (b)-[:is_roommate {edge_id: randomUUID(), memo: '', group: ''}]->(a)
+RETURN count(*) AS created
+"""
+
+
+CREATE_SYNTHETIC_STICKERS_QUERY = """
+UNWIND $rows AS row
+MATCH (u:User {node_id: row.user_node_id})
+CREATE (s:Sticker {
+  content: row.content,
+  image_url: [],
+  created_at: row.created_at,
+  deleted_at: '',
+  fanout_pending: false,
+  node_id: randomUUID()
+})
+CREATE (s)-[:creator_of_sticker {edge_id: randomUUID()}]->(u)
+RETURN count(s) AS created
+"""
+
+
+CREATE_SYNTHETIC_POSTS_QUERY = """
+UNWIND $rows AS row
+MATCH (u:User {node_id: row.user_node_id})
+CREATE (p:Post {
+  content: row.content,
+  image_url: [],
+  is_public: row.is_public,
+  title: row.title,
+  tags: [],
+  created_at: row.created_at,
+  node_id: randomUUID()
+})
+CREATE (p)-[:is_post {edge_id: randomUUID()}]->(u)
+RETURN count(p) AS created
+"""
+
+
+CREATE_SYNTHETIC_CASTS_QUERY = """
+UNWIND $rows AS row
+MATCH (me:User {node_id: row.user_node_id})
+CREATE (cast_node:Cast {
+  node_id: randomUUID(),
+  message: row.message,
+  reply_visible: true,
+  created_at: row.created_at,
+  duration: row.duration,
+  expires_at: datetime(row.created_at) + duration({minutes: row.duration}),
+  deleted_at: ''
+})
+CREATE (me)<-[:creator_of_cast {edge_id: randomUUID()}]-(cast_node)
+WITH cast_node, row
+UNWIND row.receivers AS receiver_node_id
+MATCH (receiver:User {node_id: receiver_node_id})
+CREATE (receiver)<-[:receiver_of_cast {open: true, new: true, edge_id: randomUUID()}]-(cast_node)
+RETURN count(DISTINCT cast_node) AS created
+"""
@@ -0,0 +1,3 @@
+from .synthetic_graph_request import SyntheticGraphRequest
+
+__all__ = ["SyntheticGraphRequest"]
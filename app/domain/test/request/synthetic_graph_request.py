@@ -0,0 +1,19 @@
+from typing import Literal
+from pydantic import BaseModel, Field
+
+
+class SyntheticGraphRequest(BaseModel):
+    model: Literal["barabasi_albert", "small_world"] = "barabasi_albert"
+    users: int = Field(1000, ge=2, le=2_000_000)
+    # barabasi_albert: 새 사용자가 붙는 기존 사용자 수
+    m: int = Field(5, ge=1)
+    # small_world: 처음 연결하는 이웃 수와 다시 잇는 확률
+    k: int = Field(10, ge=2)
+    p: float = Field(0.1, ge=0.0, le=1.0)
+    # 사용자당 평균 개수
+    stickers_per_user: float = Field(0.0, ge=0.0)
+    posts_per_user: float = Field(0.0, ge=0.0)
+    casts_per_user: float = Field(0.0, ge=0.0)
+    cast_receivers: int = Field(5, ge=1)
+    batch_size: int = Field(10000, ge=1, le=100000)
+    seed: int = 0
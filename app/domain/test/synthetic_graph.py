@@ -0,0 +1,331 @@
+# backend/domain/test/synthetic_graph.py
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List, Optional
+from app.utils import Logger
+from app.utils.dummy_user import DUMMY_PASSWORD_HASH
+from app.config.connection import open_session
+from .dummy import (
+    CREATE_SYNTHETIC_USERS_QUERY,
+    CREATE_SYNTHETIC_ROOMMATES_QUERY,
+    CREATE_SYNTHETIC_STICKERS_QUERY,
+    CREATE_SYNTHETIC_POSTS_QUERY,
+    CREATE_SYNTHETIC_CASTS_QUERY,
+)
+
+# numpy 는 부하 테스트용 그래프를 만들 때만 필요해서 서버 의존성에 넣지 않는다
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = Logger(__file__)
+
+MODELS = ("barabasi_albert", "small_world")
+DEFAULT_BATCH_SIZE = 10000
+STICKER_LIFETIME_HOURS = 24
+POST_SPREAD_DAYS = 30
+CAST_DURATION_MINUTES = 60 * 24
+
+# progress(단계, 넣은 수, 전체 수)
+Progress = Callable[[str, int, int], None]
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("numpy is required for synthetic graphs: pip install numpy")
+
+
+def _normalize(edges):
+    # 자기 자신으로 가는 edge 와 중복을 지우고 (작은 번호, 큰 번호) 로 정렬한다
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = np.sort(edges, axis=1)
+    return np.unique(edges, axis=0)
+
+
+def barabasi_albert_edges(users: int, m: int, rng):
+    # 새 사용자가 기존 사용자 m 명에게 차수에 비례한 확률로 붙는다.
+    # 지금까지 만든 사용자 수의 1% 씩 묶어서 붙이므로, 같은 묶음 안에서 생긴 차수 증가는 서로 보지 못하는 근사다.
+    _require_numpy()
+    if users <= m:
+        raise ValueError("users must be larger than m")
+
+    # 처음 m+1 명은 서로 모두 연결한다
+    first, second = np.triu_indices(m + 1, k=1)
+    edges = [np.column_stack((first, second)).astype(np.int32)]
+
+    # edge 의 양 끝을 모두 넣어 둔 배열. 여기서 균등하게 뽑으면 차수에 비례해서 뽑힌다
+    pool = np.empty(2 * (len(first) + (users - m - 1) * m), dtype=np.int32)
+    pool[: 2 * len(first)] = np.concatenate((first, second))
+    filled = 2 * len(first)
+
+    start = m + 1
+    while start < users:
+        chunk = min(users - start, max(1, start // 100))
+        sources = np.repeat(np.arange(start, start + chunk, dtype=np.int32), m)
+        targets = pool[rng.integers(0, filled, size=chunk * m)]
+        edges.append(np.column_stack((sources, targets)))
+        pool[filled : filled + chunk * m] = sources
+        pool[filled + chunk * m : filled + 2 * chunk * m] = targets
+        filled += 2 * chunk * m
+        start += chunk
+
+    # 같은 사용자를 두 번 뽑은 경우가 합쳐져서 일부 사용자는 m 명보다 적게 연결된다
+    return _normalize(np.concatenate(edges))
+
+
+def small_world_edges(users: int, k: int, p: float, rng):
+    # Watts-Strogatz: 원 위에서 양옆 k/2 명과 연결한 뒤 각 edge 의 한쪽 끝을 확률 p 로 아무 사용자에게 옮긴다
+    _require_numpy()
+    half = k // 2
+    if half < 1 or users <= k:
+        raise ValueError("k must be at least 2 and smaller than users")
+
+    sources = np.repeat(np.arange(users, dtype=np.int32), half)
+    targets = (sources + np.tile(np.arange(1, half + 1, dtype=np.int32), users)) % users
+    rewired = rng.random(len(targets)) < p
+    targets[rewired] = rng.integers(0, users, size=int(rewired.sum()))
+    return _normalize(np.column_stack((sources, targets)))
+
+
+def generate_edges(model: str, users: int, rng, m: int = 5, k: int = 10, p: float = 0.1):
+    if model == "barabasi_albert":
+        return barabasi_albert_edges(users, m, rng)
+    if model == "small_world":
+        return small_world_edges(users, k, p, rng)
+    raise ValueError(f"unknown model {model}, expected one of {MODELS}")
+
+
+def _batches(total: int, batch_size: int) -> Iterator[range]:
+    for start in range(0, total, batch_size):
+        yield range(start, min(start + batch_size, total))
+
+
+def _timestamps(now: datetime, spread_seconds: int, count: int, rng) -> List[str]:
+    offsets = rng.integers(0, spread_seconds, size=count)
+    return [
+        (now - timedelta(seconds=int(offset))).replace(microsecond=0).isoformat()
+        for offset in offsets
+    ]
+
+
+class SyntheticGraph:
+    # 생성 결과. 사용자는 0..users-1 번호로, edge 는 (작은 번호, 큰 번호) 쌍의 (E, 2) 배열로 들고 있고
+    # 적재할 때 배치 단위로 node_id 와 행 dict 를 만든다.
+
+    def __init__(
+        self,
+        model: str,
+        users: int,
+        edges,
+        seed: int,
+        stickers_per_user: float = 0.0,
+        posts_per_user: float = 0.0,
+        casts_per_user: float = 0.0,
+        cast_receivers: int = 5,
+    ):
+        _require_numpy()
+        self.model = model
+        self.users = users
+        self.edges = edges
+        self.seed = seed
+        self.run_id = uuid.uuid4().hex[:8]
+        self.node_ids = [str(uuid.uuid4()) for _ in range(users)]
+
+        rng = np.random.default_rng(seed + 1)
+        # 사용자별 개수는 평균이 rate 인 포아송 분포를 따른다
+        self.sticker_owners = np.repeat(
+            np.arange(users, dtype=np.int32), rng.poisson(stickers_per_user, users)
+        )
+        self.post_owners = np.repeat(
+            np.arange(users, dtype=np.int32), rng.poisson(posts_per_user, users)
+        )
+        self.cast_owners = np.repeat(
+            np.arange(users, dtype=np.int32), rng.poisson(casts_per_user, users)
+        )
+        self.cast_receivers = cast_receivers
+        self._rng = rng
+        self._adjacency = None
+
+    def stats(self) -> dict:
+        degrees = np.bincount(self.edges.ravel(), minlength=self.users)
+        return {
+            "model": self.model,
+            "users": self.users,
+            "roommate_pairs": int(len(self.edges)),
+            "mean_degree": float(degrees.mean()) if self.users else 0.0,
+            "max_degree": int(degrees.max()) if self.users else 0,
+            "stickers": int(len(self.sticker_owners)),
+            "posts": int(len(self.post_owners)),
+            "casts": int(len(self.cast_owners)),
+        }
+
+    def neighbors(self, user: int):
+        # 양방향 edge 를 정렬해 둔 CSR 로 roommate 를 찾는다
+        if self._adjacency is None:
+            both = np.concatenate((self.edges, self.edges[:, ::-1]))
+            both = both[np.argsort(both[:, 0], kind="stable")]
+            offsets = np.searchsorted(both[:, 0], np.arange(self.users + 1))
+            self._adjacency = (offsets, both[:, 1])
+        offsets, targets = self._adjacency
+        return targets[offsets[user] : offsets[user + 1]]
+
+    def write_edge_list(self, path: str):
+        # 다른 도구에서 쓸 수 있게 node_id 쌍을 한 줄에 하나씩 쓴다
+        with open(path, "w") as file:
+            for first, second in self.edges:
+                file.write(f"{self.node_ids[first]},{self.node_ids[second]}\n")
+
+    # 배치 행
+
+    def user_rows(self, batch: range) -> List[dict]:
+        return [
+            {
+                "node_id": self.node_ids[index],
+                "email": f"synthetic{index}.{self.run_id}@gooroom.com",
+                "username": f"test_synthetic{index}_{self.run_id}",
+                "nickname": f"nickname{index}",
+            }
+            for index in batch
+        ]
+
+    def roommate_rows(self, batch: range) -> List[list]:
+        return [
+            [self.node_ids[first], self.node_ids[second]]
+            for first, second in self.edges[batch.start : batch.stop].tolist()
+        ]
+
+    def sticker_rows(self, batch: range, now: datetime) -> List[dict]:
+        # 만료 작업에 바로 지워지지 않게 최근 24시간 안에 만든 것으로 한다
+        owners = self.sticker_owners[batch.start : batch.stop].tolist()
+        created_at = _timestamps(now, STICKER_LIFETIME_HOURS * 3600, len(owners), self._rng)
+        return [
+            {
+                "user_node_id": self.node_ids[owner],
+                "content": f"synthetic sticker {batch.start + offset}",
+                "created_at": created_at[offset],
+            }
+            for offset, owner in enumerate(owners)
+        ]
+
+    def post_rows(self, batch: range, now: datetime) -> List[dict]:
+        owners = self.post_owners[batch.start : batch.stop].tolist()
+        created_at = _timestamps(now, POST_SPREAD_DAYS * 86400, len(owners), self._rng)
+        is_public = (self._rng.random(len(owners)) < 0.8).tolist()
+        return [
+            {
+                "user_node_id": self.node_ids[owner],
+                "title": f"synthetic post {batch.start + offset}",
+                "content": "synthetic post content",
+                "is_public": is_public[offset],
+                "created_at": created_at[offset],
+            }
+            for offset, owner in enumerate(owners)
+        ]
+
+    def cast_rows(self, batch: range, now: datetime) -> List[dict]:
+        # 받는 사람은 보낸 사람의 roommate 중 최대 cast_receivers 명
+        owners = self.cast_owners[batch.start : batch.stop].tolist()
+        created_at = _timestamps(now, CAST_DURATION_MINUTES * 60, len(owners), self._rng)
+        rows = []
+        for offset, owner in enumerate(owners):
+            neighbors = self.neighbors(owner)
+            if len(neighbors) > self.cast_receivers:
+                neighbors = self._rng.choice(neighbors, self.cast_receivers, replace=False)
+            rows.append(
+                {
+                    "user_node_id": self.node_ids[owner],
+                    "message": f"synthetic cast {batch.start + offset}",
+                    "created_at": created_at[offset],
+                    "duration": CAST_DURATION_MINUTES,
+                    "receivers": [self.node_ids[neighbor] for neighbor in neighbors.tolist()],
+                }
+            )
+        return rows
+
+
+def generate_graph(
+    model: str,
+    users: int,
+    seed: int = 0,
+    m: int = 5,
+    k: int = 10,
+    p: float = 0.1,
+    stickers_per_user: float = 0.0,
+    posts_per_user: float = 0.0,
+    casts_per_user: float = 0.0,
+    cast_receivers: int = 5,
+) -> SyntheticGraph:
+    _require_numpy()
+    rng = np.random.default_rng(seed)
+    edges = generate_edges(model, users, rng, m=m, k=k, p=p)
+    return SyntheticGraph(
+        model,
+        users,
+        edges,
+        seed,
+        stickers_per_user=stickers_per_user,
+        posts_per_user=posts_per_user,
+        casts_per_user=casts_per_user,
+        cast_receivers=cast_receivers,
+    )
+
+
+def _log_progress(stage: str, done: int, total: int):
+    logger.info(f"synthetic graph {stage}: {done}/{total}")
+
+
+async def load_graph(
+    graph: SyntheticGraph,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Progress] = None,
+) -> dict:
+    # 단계마다 batch_size 행씩 UNWIND 한 쿼리를 auto-commit 트랜잭션 하나로 보낸다.
+    # 사용자 -> roommate -> 콘텐츠 순서라서 뒤 단계의 MATCH 는 앞 단계에서 만든 node_id 제약 인덱스를 탄다.
+    progress = progress or _log_progress
+    now = datetime.now(timezone.utc)
+    stages = [
+        ("users", CREATE_SYNTHETIC_USERS_QUERY, graph.users, graph.user_rows),
+        (
+            "roommates",
+            CREATE_SYNTHETIC_ROOMMATES_QUERY,
+            len(graph.edges),
+            graph.roommate_rows,
+        ),
+        (
+            "stickers",
+            CREATE_SYNTHETIC_STICKERS_QUERY,
+            len(graph.sticker_owners),
+            lambda batch: graph.sticker_rows(batch, now),
+        ),
+        (
+            "posts",
+            CREATE_SYNTHETIC_POSTS_QUERY,
+            len(graph.post_owners),
+            lambda batch: graph.post_rows(batch, now),
+        ),
+        (
+            "casts",
+            CREATE_SYNTHETIC_CASTS_QUERY,
+            len(graph.cast_owners),
+            lambda batch: graph.cast_rows(batch, now),
+        ),
+    ]
+
+    durations = {}
+    async with open_session() as session:
+        for stage, query, total, rows_of in stages:
+            started_at = time.perf_counter()
+            done = 0
+            for batch in _batches(total, batch_size):
+                params = {"rows": rows_of(batch)}
+                if stage == "users":
+                    params["password"] = DUMMY_PASSWORD_HASH
+                result = await session.run(query, params)
+                await result.consume()
+                done = batch.stop
+                progress(stage, done, total)
+            durations[stage] = round(time.perf_counter() - started_at, 3)
+
+    return {"run_id": graph.run_id, **graph.stats(), "seconds": durations}
@@ -1,3 +1,4 @@
+import asyncio
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
 from domain.auth.request.signup_request import SignUpRequest
@@ -5,6 +6,8 @@ from domain.service.content.content import delete_old_casts
 from app.utils import Logger
 from app.config.connection import get_session
 from app.utils.dummy_user import create_dummy_user
+from .synthetic_graph import generate_graph, load_graph
+from .request import SyntheticGraphRequest
 from .dummy import (
     CREATE_SEVERAL_DUMMY,
     CREATE_FOURTEEN_DUMMY_NODES_QUERY,
@@ -15,18 +18,18 @@ from .dummy import (
 router = APIRouter()
 logger = Logger(__file__)
 
+# run_id -> 적재 상태. 백그라운드 작업이 끝날 때까지 task 도 같이 들고 있는다
+synthetic_graph_runs = {}
+
 
 @router.get("/nodes")
 async def read_nodes(session=Depends(get_session)):
-    try:
-        logger.info("get nodes - test")
-        result = session.run("MATCH (n) RETURN n")
-        nodes = []
-        for record in result:
-            nodes.append(record["n"])
-        return {"nodes": nodes}
-    finally:
-        session.close()
+    logger.info("get nodes - test")
+    result = await session.run("MATCH (n) RETURN n")
+    nodes = []
+    async for record in result:
+        nodes.append(record["n"])
+    return {"nodes": nodes}
 
 
 @router.post("/create-fourteen-dummy-nodes")
@@ -39,16 +42,16 @@ async def create_fourteen_dummy_nodes(
         dummy_users = create_dummy_user(14)
 
         query = CREATE_FOURTEEN_DUMMY_NODES_QUERY
-        result = session.run(
+        result = await session.run(
             query, {"users": [user.model_dump() for user in dummy_users]}
         )
 
-        if "data already exists" in [d["value.message"] for d in result.data()]:
+        if "data already exists" in [d["value.message"] for d in await result.data()]:
             raise HTTPException(status_code=400, detail="Data already exists")
 
         query = CREATE_FOURTEEN_DUMMY_RELATIONS_QUERY
-        result = session.run(query)
-        record = result.single()
+        result = await session.run(query)
+        record = await result.single()
 
         if record is None:
             raise HTTPException(status_code=400, detail="Failed to create dummy data")
@@ -57,8 +60,6 @@ async def create_fourteen_dummy_nodes(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.post("/create-several-dummy")
@@ -72,7 +73,7 @@ async def create_several_dummy(
         dummy_users = create_dummy_user(number_of_nodes)
 
         query = CREATE_SEVERAL_DUMMY
-        result = session.run(
+        result = await session.run(
             query,
             {
                 "users": [user.model_dump() for user in dummy_users],
@@ -80,7 +81,7 @@ async def create_several_dummy(
             },
         )
 
-        record = result.single()
+        record = await result.single()
 
         if record is None:
             raise HTTPException(status_code=400, detail="Failed to create dummy data")
@@ -89,28 +90,75 @@ async def create_several_dummy(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
+
+
+@router.post("/create-synthetic-graph")
+async def create_synthetic_graph(request: SyntheticGraphRequest):
+    logger.info("create-synthetic-graph")
+
+    try:
+        # 생성은 CPU 작업이라 스레드에서 하고, 적재는 오래 걸리므로 백그라운드로 돌린 뒤 run_id 를 바로 돌려준다
+        graph = await asyncio.to_thread(
+            generate_graph,
+            request.model,
+            request.users,
+            seed=request.seed,
+            m=request.m,
+            k=request.k,
+            p=request.p,
+            stickers_per_user=request.stickers_per_user,
+            posts_per_user=request.posts_per_user,
+            casts_per_user=request.casts_per_user,
+            cast_receivers=request.cast_receivers,
+        )
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    run = {"status": "loading", "progress": {}, **graph.stats()}
+
+    def progress(stage: str, done: int, total: int):
+        run["progress"][stage] = f"{done}/{total}"
+
+    async def load():
+        try:
+            run.update(await load_graph(graph, request.batch_size, progress))
+            run["status"] = "done"
+        except Exception as e:
+            logger.error(f"synthetic graph load failed: {e}", exc_info=True)
+            run["status"] = "failed"
+            run["error"] = str(e)
+        finally:
+            run.pop("task", None)
+
+    synthetic_graph_runs[graph.run_id] = run
+    run["task"] = asyncio.create_task(load())
+    return {"run_id": graph.run_id, **graph.stats()}
+
+
+@router.get("/synthetic-graph/{run_id}")
+async def get_synthetic_graph(run_id: str):
+    run = synthetic_graph_runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"no such run {run_id}")
+    return {key: value for key, value in run.items() if key != "task"}
 
 
 @router.delete("/dummy_delete")
 async def dummy_delete(session=Depends(get_session)):
     try:
         logger.info("dummy-delete")
-        result = session.run(DELETE_DUMMY_DATA_QUERY)
-        record = result.single()
+        result = await session.run(DELETE_DUMMY_DATA_QUERY)
+        record = await result.single()
 
         return record[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        session.close()
 
 
 @router.delete("/delete_old_casts")
 async def delete_old_casts_api():
     try:
-        delete_old_casts()
+        await delete_old_casts()
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
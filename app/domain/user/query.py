@@ -0,0 +1,61 @@
+MY_INFO_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+RETURN properties(u) as user
+"""
+
+
+MY_INFO_CHANGE_QUERY = """
+MATCH (u:User {node_id: $user_node_id})
+SET u += $update_data
+RETURN u
+"""
+
+
+# user_search 는 스키마 마이그레이션 v4 에서 만드는 full-text 인덱스.
+# 인덱스가 점수 순으로 돌려주는 결과를 (score, node_id) 키셋으로 잘라서 페이지를 만든다.
+SEARCH_GET_MEMBERS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+CALL db.index.fulltext.queryNodes('user_search', $search_query) YIELD node AS n, score
+WHERE n.node_id <> me.node_id
+AND NOT EXISTS((me)-[:block]-(n))
+AND (
+    $cursor_score IS NULL
+    OR score < $cursor_score
+    OR (score = $cursor_score AND n.node_id > $cursor_node_id)
+)
+WITH me, n, score
+ORDER BY score DESC, n.node_id
+LIMIT $limit
+RETURN
+n.nickname AS nickname,
+n.username AS username,
+n.profile_image_url AS profile_image_url,
+EXISTS((me)-[:is_roommate]->(n)) AS is_roommate,
+EXISTS((me)-[:knock]->(n)) AS sent_knock,
+n.node_id AS node_id,
+score
+"""
+
+
+# 전문 검색은 단어 접두어만 찾으므로 단어 중간이나 한글 일부로 검색하면 아무것도 나오지 않는다.
+# 그때만 예전처럼 CONTAINS 로 찾는다. 사용자 전체를 훑으므로 전문 검색 결과가 없을 때만 쓴다.
+# score 는 0 으로 고정하고 node_id 순으로 페이지를 나눈다
+SEARCH_GET_MEMBERS_CONTAINS_QUERY = """
+MATCH (me:User {node_id: $user_node_id})
+MATCH (n:User)
+WHERE n.node_id <> me.node_id
+AND (toLower(n.nickname) CONTAINS $keyword OR toLower(n.username) CONTAINS $keyword)
+AND NOT EXISTS((me)-[:block]-(n))
+AND ($cursor_node_id IS NULL OR n.node_id > $cursor_node_id)
+WITH me, n
+ORDER BY n.node_id
+LIMIT $limit
+RETURN
+n.nickname AS nickname,
+n.username AS username,
+n.profile_image_url AS profile_image_url,
+EXISTS((me)-[:is_roommate]->(n)) AS is_roommate,
+EXISTS((me)-[:knock]->(n)) AS sent_knock,
+n.node_id AS node_id,
+0.0 AS score
+"""
@@ -1,5 +1,9 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field
 
 
 class SearchGetMembersRequest(BaseModel):
     query: str = ""
+    # limit 을 주지 않으면 예전처럼 목록만 돌려준다
+    limit: Optional[int] = Field(None, ge=1, description="page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
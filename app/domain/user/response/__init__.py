@@ -1,3 +1,4 @@
 from .my_info_change_response import MyInfoChangeResponse
 from .my_groups_change_response import MyGroupsChangeResponse
 from .my_tags_change_response import MyTagsChangeResponse
+from .search_get_members_response import SearchGetMembersResponse, SearchMember
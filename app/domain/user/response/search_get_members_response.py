@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SearchMember(BaseModel):
+    nickname: Optional[str] = None
+    username: Optional[str] = None
+    profile_image_url: Optional[str] = None
+    is_roommate: bool
+    sent_knock: bool
+    node_id: str
+
+
+class SearchGetMembersResponse(BaseModel):
+    members: List[SearchMember]
+    next_cursor: Optional[str] = None
@@ -1,6 +1,7 @@
 # backend/domain/user/user.py
 import json
 import mimetypes
+import os
 from typing import List
 from urllib.parse import quote
 from fastapi import (
@@ -10,12 +11,14 @@ from fastapi import (
     HTTPException,
     APIRouter,
     Depends,
-    Request,
     UploadFile,
 )
-from app.utils import verify_access_token, Logger
+from app.utils import current_user, Logger
 from app.utils.s3_client import s3_client
-from app.config.connection import S3_BUCKET_NAME, S3_REGION, get_session
+from app.utils.metrics import record_s3_call
+from app.utils.pagination import decode_cursor, page_limit, split_page
+from app.config.connection import S3_BUCKET_NAME, S3_REGION
+from app.repository import GraphRepository, get_repository
 
 from .request import (
     MyInfoChangeWithoutTagsRequest,
@@ -23,37 +26,32 @@ from .request import (
     MyGroupsChangeRequest,
     SearchGetMembersRequest,
 )
+from .response import SearchGetMembersResponse, SearchMember
 
 logger = Logger(__file__)
 router = APIRouter()
-ACCESS_TOKEN = "access_token"
+
+USER_SEARCH_PAGE_SIZE = int(os.getenv("USER_SEARCH_PAGE_SIZE", 20))
+USER_SEARCH_MAX_PAGE_SIZE = int(os.getenv("USER_SEARCH_MAX_PAGE_SIZE", 100))
+# limit 없이 호출하는 예전 클라이언트에게 돌려주는 최대 개수
+USER_SEARCH_LEGACY_LIMIT = int(os.getenv("USER_SEARCH_LEGACY_LIMIT", 1000))
+# CONTAINS 로 찾은 결과의 score. 전문 검색 점수는 항상 0 보다 크므로 cursor 로 어느 쪽 페이지인지 구분한다
+CONTAINS_SCORE = 0.0
 
 
 @router.get("/my/info")
 async def my_info(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("my_info")
-    token = request.cookies.get(ACCESS_TOKEN)
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        RETURN properties(u) as user
-        """
-        result = session.run(query)
-        record = result.single()
-
-        if not record:
+        user_data = await repository.get_user(user_node_id)
+
+        if not user_data:
             raise HTTPException(status_code=400, detail="User not found")
         else:
-            user_data = record["user"]
             return user_data
 
     except HTTPException as e:
@@ -65,7 +63,6 @@ async def my_info(
 
 @router.put("/my/info/change")
 async def my_info_change(
-    request: Request,
     # user_info: MyInfoChangeRequest,
     my_memo: str = Form("", description="Memo for the user"),
     nickname: str = Form(..., description="User's nickname"),
@@ -73,15 +70,10 @@ async def my_info_change(
     tags: List[str] = Form([""], description="User's tags"),
     profile_image: UploadFile = File("", description="profile imgurl"),
     remove_profile_image: bool = Form(False, description="Remove profile image"),
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("my_info_change")
-    token = request.cookies.get(ACCESS_TOKEN)
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
     try:
         update_data = {
             "my_memo": my_memo,
@@ -94,7 +86,9 @@ async def my_info_change(
             s3_key = f"{user_node_id}/profile_image"
             try:
                 s3_client.delete_object(Bucket=S3_BUCKET_NAME, Key=s3_key)
+                record_s3_call("delete", ok=True)
             except Exception as e:
+                record_s3_call("delete", ok=False)
                 logger.error(f"Error deleting S3 object: {e}")
                 raise HTTPException(
                     status_code=500, detail="Failed to delete profile image"
@@ -115,7 +109,9 @@ async def my_info_change(
                     s3_key,
                     ExtraArgs=extra_args,
                 )
+                record_s3_call("upload", ok=True, size=profile_image.size)
             except s3_client.exceptions.ClientError as e:
+                record_s3_call("upload", ok=False)
                 logger.error(f"Failed to upload {profile_image.file} to S3: {str(e)}")
                 raise HTTPException(
                     status_code=500,
@@ -125,18 +121,11 @@ async def my_info_change(
                 f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{quote(s3_key)}"
             )
 
-        query = """
-        MATCH (u:User {node_id: $user_node_id})
-        SET u += $update_data
-        RETURN u
-        """
-        result = session.run(query, user_node_id=user_node_id, update_data=update_data)
-        record = result.single()
+        updated_user = await repository.update_user(user_node_id, update_data)
 
-        if not record:
+        if not updated_user:
             raise ValueError("User not found")
         else:
-            updated_user = record["u"]
             return updated_user
     except HTTPException as e:
         raise e
@@ -147,37 +136,28 @@ async def my_info_change(
 
 @router.put("/my/info/change-without-tags")
 async def my_info_change_without_tags(
-    request: Request,
     user_info: MyInfoChangeWithoutTagsRequest,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("my_info_change_without_tags")
-    token = request.cookies.get(ACCESS_TOKEN)
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        SET u.my_memo = '{user_info.my_memo}',
-            u.nickname = '{user_info.nickname}',
-            u.username = '{user_info.username}'
-            u.profile_image_url = '{user_info.profile_image_url}'
-        RETURN u
-        """
-        result = session.run(query)
-
-        record = result.single()
-
-        if not record:
+        updated_user = await repository.update_user(
+            user_node_id,
+            {
+                "my_memo": user_info.my_memo,
+                "nickname": user_info.nickname,
+                "username": user_info.username,
+                "profile_image_url": user_info.profile_image_url,
+            },
+        )
+
+        if not updated_user:
             raise HTTPException(
                 status_code=400, detail="User not found or failed to update"
             )
         else:
-            updated_user = record["u"]
             return updated_user
 
     except HTTPException as e:
@@ -189,34 +169,22 @@ async def my_info_change_without_tags(
 
 @router.put("/my/tags/change")
 async def my_tags_change(
-    request: Request,
     user_tags_info: MyTagsChangeRequest,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("my_tags_change")
-    token = request.cookies.get("access_token")
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        SET u.tags = {user_tags_info.tags}
-        RETURN u
-        """
-        result = session.run(query)
-
-        record = result.single()
+        updated_user = await repository.update_user(
+            user_node_id, {"tags": user_tags_info.tags}
+        )
 
-        if not record:
+        if not updated_user:
             raise HTTPException(
                 status_code=400, detail="User not found or failed to update"
             )
         else:
-            updated_user = record["u"]
             return updated_user
 
     except HTTPException as e:
@@ -228,35 +196,22 @@ async def my_tags_change(
 
 @router.put("/my/groups/change")
 async def my_groups_change(
-    request: Request,
     user_groups_info: MyGroupsChangeRequest,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("my_tags_change")
-    token = request.cookies.get("access_token")
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     try:
-        query = f"""
-        MATCH (u:User {{node_id: '{user_node_id}'}})
-        SET u.groups = {user_groups_info.groups}
-        RETURN u
-        """
-        print(query)
-        result = session.run(query)
-
-        record = result.single()
+        updated_user = await repository.update_user(
+            user_node_id, {"groups": user_groups_info.groups}
+        )
 
-        if not record:
+        if not updated_user:
             raise HTTPException(
                 status_code=400, detail="User not found or failed to update"
             )
         else:
-            updated_user = record["u"]
             return updated_user
 
     except HTTPException as e:
@@ -268,50 +223,57 @@ async def my_groups_change(
 
 @router.post("/search/get-members")
 async def search_get_memgers(
-    request: Request,
-    session=Depends(get_session),
+    repository: GraphRepository = Depends(get_repository),
     search: SearchGetMembersRequest = Body(...),
+    user_node_id: str = Depends(current_user),
 ):
     logger.info("get_members")
-    token = request.cookies.get(ACCESS_TOKEN)
-
-    if not token:
-        raise HTTPException(status_code=401, detail="Access token is missing")
-
-    user_node_id = verify_access_token(token)["user_node_id"]
 
     if not user_node_id:
         raise HTTPException(status_code=401, detail="Invalid access token")
 
+    paginated = search.limit is not None or search.cursor is not None
+    if not search.query.split():
+        return SearchGetMembersResponse(members=[]) if paginated else []
+
+    if paginated:
+        limit = page_limit(search.limit, USER_SEARCH_PAGE_SIZE, USER_SEARCH_MAX_PAGE_SIZE)
+    else:
+        limit = USER_SEARCH_LEGACY_LIMIT
+    cursor = decode_cursor(search.cursor, 2)
+
     try:
-        query = f"""
-        MATCH (me:User {{node_id: '{user_node_id}'}})
-        OPTIONAL MATCH (n:User)
-        WHERE (
-            toLower(n.nickname) CONTAINS '{search.query}' 
-            OR toLower(n.username) CONTAINS '{search.query}'
+        # 다음 페이지가 있는지 알기 위해 하나 더 가져온다
+        fetch_limit = limit + 1 if paginated else limit
+        contains_page = cursor is not None and cursor[0] == CONTAINS_SCORE
+        records = []
+        if not contains_page:
+            records = await repository.search_users(
+                user_node_id, search.query, cursor, fetch_limit
+            )
+
+        # 전문 검색이 첫 페이지부터 비어 있으면 단어 중간/한글 일부 검색일 수 있으므로 CONTAINS 로 다시 찾는다
+        if contains_page or (not records and cursor is None):
+            records = await repository.search_users_contains(
+                user_node_id,
+                search.query.strip().lower(),
+                cursor[1] if cursor else None,
+                fetch_limit,
+            )
+
+        if not paginated:
+            for record in records:
+                del record["score"]
+            return records
+
+        records, next_cursor = split_page(
+            records, limit, lambda record: (record["score"], record["node_id"])
+        )
+
+        return SearchGetMembersResponse(
+            members=[SearchMember(**record) for record in records],
+            next_cursor=next_cursor,
         )
-        AND n.node_id <> me.node_id
-        AND NOT EXISTS((me)<-[:block]->(n))
-        WITH me, n
-        OPTIONAL MATCH (me)-[r:is_roommate]->(n)
-        OPTIONAL MATCH (me)-[k:knock]->(n)
-        RETURN 
-        n.nickname AS nickname,
-        n.username AS username,
-        n.profile_image_url AS profile_image_url,
-        r IS NOT NULL AS is_roommate,
-        k IS NOT NULL AS sent_knock,
-        n.node_id AS node_id
-        ORDER BY n.username        
-        """
-        result = session.run(query)
-        record = result.data()
-
-        if not record:
-            raise HTTPException(status_code=400, detail="error with query")
-        else:
-            return record
 
     except HTTPException as e:
         raise e
@@ -1,33 +1,122 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from app.domain.api import router as domain_api_router
-from app.utils import Logger
+from app.utils import Logger, bcrypt_pool_stats, hub
+from app.utils.cache import feed_cache
+from app.utils.current_user import token_cache_stats
+from prometheus_client import Gauge
+from app.utils.metrics import (
+    MetricsMiddleware,
+    index_query_names,
+    register_collector,
+    render_metrics,
+    timed_job,
+)
+from app.utils.roommate_index import roommate_index, ROOMMATE_INDEX_ENABLED
+from app.config.connection import GRAPH_BACKEND, close_driver
+from app.config.schema import run_migrations
+from app.config.leader import scheduler_leader_election
+from app.utils.s3_delete_queue import s3_delete_queue
+from app.utils.mail_outbox import mail_outbox
+from app.domain.service.content.fanout import sticker_fanout, fanout_stats
+from app.domain.service.friend.friend import reload_roommate_index
 from app.domain.service.content.content import delete_old_stickers
-from app.domain.service.content.content import delete_old_casts
+from app.domain.service.content.content import delete_old_casts, cast_expiry_stats
+from app.domain.service.upload.upload import delete_abandoned_uploads
 
 scheduler = AsyncIOScheduler()
 logger = Logger("main.py")
 load_dotenv()
+ROOMMATE_INDEX_RELOAD_MINUTES = int(os.getenv("ROOMMATE_INDEX_RELOAD_MINUTES", 5))
+# 리더 프로세스에서만 도는 작업. roommate index 는 켜져 있으면 그 프로세스가 다시 읽는다
+UPLOAD_SWEEP_MINUTES = int(os.getenv("UPLOAD_SWEEP_MINUTES", 30))
+LEADER_JOB_IDS = ("delete_old_stickers", "delete_old_casts", "delete_abandoned_uploads")
+
+# 모듈마다 따로 모으던 통계를 /metrics 에서 gauge 로 같이 내보낸다
+register_collector("cast_expiry", lambda: cast_expiry_stats)
+register_collector("sticker_fanout", lambda: fanout_stats)
+register_collector("token_cache", lambda: token_cache_stats)
+register_collector("feed_cache", lambda: feed_cache.stats)
+register_collector("roommate_index", roommate_index.stats)
+register_collector("bcrypt_pool", bcrypt_pool_stats)
+# 라우터와 쿼리 모듈을 모두 import 했으므로 쿼리 이름표를 여기서 한 번 만든다
+index_query_names()
+s3_delete_queue_pending = Gauge(
+    "s3_delete_queue_pending", "Keys waiting in the S3 delete queue"
+)
+s3_delete_queue_dead_letter = Gauge(
+    "s3_delete_queue_dead_letter", "Keys that exhausted S3 delete retries"
+)
+mail_outbox_messages = Gauge(
+    "mail_outbox_messages", "Messages in the mail outbox", ("status",)
+)
+
+
+def resume_leader_jobs():
+    for job_id in LEADER_JOB_IDS:
+        scheduler.resume_job(job_id)
+
+
+def pause_leader_jobs():
+    for job_id in LEADER_JOB_IDS:
+        scheduler.pause_job(job_id)
+
+
+def _start_scheduler():
+    scheduler.start()
+    # logger.info("스케줄러가 실행되었습니다.")
+    # 느린 실행이 다음 실행과 겹치지 않게 한 번에 하나만 돌리고, 밀린 실행은 한 번으로 합친다
+    job_defaults = {"max_instances": 1, "coalesce": True, "misfire_grace_time": 30}
+    # 리더 작업은 멈춘 상태(next_run_time=None)로 등록하고 리더가 되면 다시 시작한다
+    scheduler.add_job(func=timed_job("delete_old_stickers", delete_old_stickers), trigger="cron", hour=0, minute=0, id="delete_old_stickers", replace_existing=True, next_run_time=None, **job_defaults)
+    scheduler.add_job(func=timed_job("delete_old_casts", delete_old_casts), trigger="interval", minutes=1,id="delete_old_casts",replace_existing=True, next_run_time=None, **job_defaults)
+    scheduler.add_job(func=timed_job("delete_abandoned_uploads", delete_abandoned_uploads), trigger="interval", minutes=UPLOAD_SWEEP_MINUTES, id="delete_abandoned_uploads", replace_existing=True, next_run_time=None, **job_defaults)
+    if ROOMMATE_INDEX_ENABLED:
+        scheduler.add_job(func=timed_job("reload_roommate_index", reload_roommate_index), trigger="interval", minutes=ROOMMATE_INDEX_RELOAD_MINUTES, id="reload_roommate_index", replace_existing=True, **job_defaults)
+    scheduler_leader_election.on_elected(resume_leader_jobs)
+    scheduler_leader_election.on_demoted(pause_leader_jobs)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("서버 실행")
-    scheduler.start()
-    # logger.info("스케줄러가 실행되었습니다.")
-    scheduler.add_job(func=delete_old_stickers, trigger="cron", hour=0, minute=0)
-    scheduler.add_job(func=delete_old_casts, trigger="interval", minutes=1,id="delete_old_casts",replace_existing=True)
+    # memory 백엔드는 Neo4j 없이 뜬다. 스키마, roommate index, fan-out, 리더 선출과 스케줄러 작업은 Neo4j 를 쓰므로 건너뛴다
+    uses_neo4j = GRAPH_BACKEND != "memory"
+    workers = [s3_delete_queue, mail_outbox]
+    # 다른 워커에서 일어난 쓰기로 이 워커의 long-polling 대기자를 깨운다
+    hub.open_channel()
+    if uses_neo4j:
+        schema_version = await run_migrations()
+        logger.info(f"스키마 버전 v{schema_version}")
+        if ROOMMATE_INDEX_ENABLED:
+            try:
+                await reload_roommate_index()
+            except Exception as e:
+                # 인덱스 없이도 Cypher 로 동작한다
+                logger.error(f"roommate index load failed: {e}")
+        # 재시작 전에 끝나지 않은 fan-out 도 첫 실행에서 같이 처리된다
+        workers += [sticker_fanout, scheduler_leader_election]
+        _start_scheduler()
+    tasks = [asyncio.create_task(worker.run()) for worker in workers]
     yield
     # scheduler.shutdown()
     logger.info("스케줄러가 종료되었습니다. 안녕~")
+    for worker in workers:
+        worker.stop()
+    await asyncio.gather(*tasks)
+    hub.close_channel()
+    await close_driver()
     logger.info("서버 종료")
 
 
-app = FastAPI(lifespan=lifespan)
+# response_model 이 없는 핸들러의 dict/list 응답은 orjson 으로 직렬화한다
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 FRONT_URL = os.getenv("FRONT_URL")
 origins = [
     FRONT_URL,"http://localhost:8000"
@@ -41,6 +130,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 마지막에 추가한 미들웨어가 가장 바깥에서 돌아서 CORS 처리 시간까지 잰다
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(domain_api_router, prefix="/domain")
 
@@ -48,3 +139,20 @@ app.include_router(domain_api_router, prefix="/domain")
 @app.get("/")
 async def root():
     return {"message": "Welcome to my FastAPI application"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    try:
+        queue_stats = await s3_delete_queue.stats()
+        s3_delete_queue_pending.set(queue_stats["pending"])
+        s3_delete_queue_dead_letter.set(queue_stats["dead_letter"])
+    except Exception as e:
+        logger.warning(f"S3 delete queue stats unavailable: {e}")
+    try:
+        for status, count in (await mail_outbox.stats()).items():
+            mail_outbox_messages.labels(status).set(count)
+    except Exception as e:
+        logger.warning(f"mail outbox stats unavailable: {e}")
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
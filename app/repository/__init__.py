@@ -0,0 +1,37 @@
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Request
+from app.config.connection import GRAPH_BACKEND, open_session, _request_user
+from .base import GraphRepository, Cursor
+from .memory_repository import InMemoryGraphRepository
+
+memory_repository = InMemoryGraphRepository()
+
+
+@asynccontextmanager
+async def open_repository(user_node_id: Optional[str] = None):
+    # 요청 의존성 밖(long-polling 재조회 등)에서 쓰는 저장소. Neo4j 백엔드는 세션을 열고 닫는다
+    if GRAPH_BACKEND == "memory":
+        yield memory_repository
+        return
+    # Neo4j 백엔드는 도메인 query 모듈을 가져오므로, 도메인 라우터가 이 패키지를 가져오는 시점에는 import 하지 않는다
+    from .neo4j_repository import Neo4jGraphRepository
+
+    async with open_session(user_node_id) as session:
+        yield Neo4jGraphRepository(session)
+
+
+async def get_repository(request: Request):
+    # 요청마다 저장소를 연다. memory 백엔드는 세션을 열지 않는다
+    async with open_repository(_request_user(request)) as repository:
+        yield repository
+
+
+__all__ = [
+    "GraphRepository",
+    "Cursor",
+    "InMemoryGraphRepository",
+    "get_repository",
+    "open_repository",
+    "memory_repository",
+]
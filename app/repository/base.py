@@ -0,0 +1,399 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Union
+
+# 목록 조회 cursor. 마지막으로 돌려준 항목의 (created_at, node_id 또는 edge_id)
+Cursor = Optional[Tuple[str, str]]
+
+
+class GraphRepository(ABC):
+    # 라우터가 그래프에 하는 읽기/쓰기를 백엔드와 상관없이 표현한 인터페이스.
+    # 노드는 properties dict 로, 나머지는 dict/list/str 같은 순수 파이썬 값으로 돌려준다.
+    # 메시지 문자열은 Cypher 쿼리가 돌려주던 것과 같아서 핸들러의 분기와 응답이 백엔드와 상관없이 같다.
+    # 목록 조회에서 limit 이 None 이면 예전처럼 전체를 돌려주고, 아니면 cursor 다음부터 최신순으로 limit 개를 돌려준다.
+
+    # accounts
+
+    @abstractmethod
+    async def record_verification_code(self, email: str, verification_info: str) -> Optional[str]:
+        # 보낼 수 있으면 메시지, 없는 이메일이거나 횟수를 넘겼으면 None
+        ...
+
+    @abstractmethod
+    async def verify_code(self, email: str, verify_code: str, now: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def signup(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+    ) -> bool:
+        # 이미 가입한 이메일이면 False
+        ...
+
+    @abstractmethod
+    async def get_private_data(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def dummy_create(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+        profile_image_url: str,
+    ):
+        ...
+
+    @abstractmethod
+    async def get_credentials(self, email: str) -> Optional[dict]:
+        # {password, grant, user_node_id}
+        ...
+
+    @abstractmethod
+    async def reset_password(self, email: str, password: str) -> Optional[str]:
+        # 바꾼 계정의 이메일. 없거나 인증하지 않은 계정이면 None
+        ...
+
+    @abstractmethod
+    async def get_password(self, user_node_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def change_password(self, user_node_id: str, password: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def delete_account(self, user_node_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def is_admin(self, user_node_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete_user(self, user_node_id: str) -> int:
+        # 지운 사용자 수
+        ...
+
+    # users
+
+    @abstractmethod
+    async def get_user(self, user_node_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def set_profile_image(self, user_node_id: str, profile_image_url: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def update_user(self, user_node_id: str, properties: dict) -> Optional[dict]:
+        # properties 를 덮어쓰고 바뀐 사용자를 돌려준다. 값이 None 인 속성은 지운다. 사용자가 없으면 None
+        ...
+
+    @abstractmethod
+    async def search_users(
+        self, user_node_id: str, query: str, cursor: Optional[Tuple[float, str]], limit: int
+    ) -> List[dict]:
+        # 단어마다 접두어로 찾고 정확히 일치하면 점수를 더 준다. (score, node_id) 순서로 cursor 다음부터 limit 개
+        # [{nickname, username, profile_image_url, is_roommate, sent_knock, node_id, score}]
+        ...
+
+    @abstractmethod
+    async def search_users_contains(
+        self, user_node_id: str, keyword: str, cursor_node_id: Optional[str], limit: int
+    ) -> List[dict]:
+        # 닉네임/이름에 keyword 가 들어간 사용자를 node_id 순으로. score 는 0.0 으로 고정
+        ...
+
+    # uploads
+
+    @abstractmethod
+    async def create_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str], created_at: str
+    ):
+        # presign 으로 발급한 키를 commit 될 때까지 남겨 둔다
+        ...
+
+    @abstractmethod
+    async def claim_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str]
+    ) -> List[str]:
+        # user_node_id 에게 발급한 키만 지우고 돌려준다. 발급하지 않았거나 이미 가져간 키는 빠진다
+        ...
+
+    @abstractmethod
+    async def delete_pending_uploads(self, s3_keys: List[str]):
+        ...
+
+    @abstractmethod
+    async def list_abandoned_uploads(self, created_before: str, limit: int) -> List[str]:
+        # created_before 전에 발급하고 아직 commit 되지 않은 키
+        ...
+
+    # roommates
+
+    @abstractmethod
+    async def feed_audience(self, user_node_ids: List[str]) -> List[str]:
+        # is_roommate 2홉 이내 사용자
+        ...
+
+    @abstractmethod
+    async def get_members(self, user_node_id: str) -> List[dict]:
+        # GET_MEMBERS_QUERY 결과 행. 새 roommate 표시도 같이 지운다
+        ...
+
+    @abstractmethod
+    async def get_member(self, user_node_id: str, friend_node_id: str) -> dict:
+        # {message, friend, roommate_edge, stickers, posts}
+        ...
+
+    @abstractmethod
+    async def get_member_properties(
+        self, user_node_id: str, pure_neighbor_ids: List[str]
+    ) -> Optional[dict]:
+        # roommate_index 로 고른 사용자들의 속성. {me, roommates: [{roommate_edge, roommate}], pure_neighbors}
+        ...
+
+    @abstractmethod
+    async def clear_new_roommate_flags(self, user_node_id: str):
+        ...
+
+    @abstractmethod
+    async def delete_roommate(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        # 양방향 is_roommate 를 지운다. roommate 가 아니면 None
+        ...
+
+    @abstractmethod
+    async def get_memo(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        # roommate 가 아니면 None
+        ...
+
+    @abstractmethod
+    async def modify_memo(self, user_node_id: str, friend_node_id: str, memo: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def get_groups(self, user_node_id: str) -> List[dict]:
+        # 내 그룹마다 [{name, count}]
+        ...
+
+    @abstractmethod
+    async def modify_group(self, user_node_id: str, friend_node_id: str, group: str) -> bool:
+        ...
+
+    # knocks
+
+    @abstractmethod
+    async def send_knock(
+        self,
+        from_user_node_id: str,
+        to_user_node_id: str,
+        knock_edge_id: str,
+        group: str,
+        created_at: str,
+    ) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def list_knocks(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> List[dict]:
+        # [{knock_edge_id, nickname, created_at}]
+        ...
+
+    @abstractmethod
+    async def reject_knock(self, user_node_id: str, knock_edge_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def accept_knock(
+        self, user_node_id: str, knock_edge_id: str, group: str
+    ) -> Optional[dict]:
+        # {new_roommate, new_neighbors}
+        ...
+
+    @abstractmethod
+    async def create_knock_link(self, user_node_id: str, link_info: str) -> bool:
+        # link_info 는 "링크 코드 : 만료 시각" 형식이다. 만들 수 있는 횟수를 넘겼으면 False
+        ...
+
+    @abstractmethod
+    async def accept_knock_by_link(
+        self, user_node_id: str, knock_id: str, now: str
+    ) -> Optional[dict]:
+        # {message, link_creator}. 링크가 없거나 만료됐거나 이미 roommate/block 관계면 None
+        ...
+
+    # stickers
+
+    @abstractmethod
+    async def create_sticker(
+        self, user_node_id: str, content: str, image_url: List[str], created_at: str
+    ) -> Optional[str]:
+        # 만든 스티커의 node_id. 사용자가 없으면 None
+        ...
+
+    @abstractmethod
+    async def read_sticker(self, user_node_id: str, sticker_node_id: str) -> bool:
+        # 받은 엣지가 없으면 만들어서 읽음으로 표시한다. 사용자나 스티커가 없으면 False
+        ...
+
+    @abstractmethod
+    async def delete_sticker(
+        self, user_node_id: str, sticker_node_id: str, deleted_at: str
+    ) -> Tuple[str, List[str]]:
+        # (메시지, 지운 스티커의 image_url)
+        ...
+
+    @abstractmethod
+    async def list_stickers(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        ...
+
+    @abstractmethod
+    async def list_my_stickers(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        ...
+
+    # posts
+
+    @abstractmethod
+    async def create_post(
+        self,
+        user_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tags: List[str],
+        created_at: str,
+    ) -> bool:
+        ...
+
+    @abstractmethod
+    async def modify_post(
+        self,
+        user_node_id: str,
+        post_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tag: List[str],
+    ) -> Union[str, dict]:
+        # 바꾼 게시글 properties. 바꾸지 못했으면 이유 문자열
+        ...
+
+    @abstractmethod
+    async def delete_post(self, user_node_id: str, post_node_id: str) -> Tuple[str, List[str]]:
+        # (메시지, 지운 게시글의 image_url)
+        ...
+
+    @abstractmethod
+    async def list_posts(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        ...
+
+    @abstractmethod
+    async def list_my_posts(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        ...
+
+    # feeds
+
+    @abstractmethod
+    async def get_contents(self, user_node_id: str) -> Optional[dict]:
+        # {casts, stickered_roommates, stickered_neighbors}. 새로 받은 cast 표시도 같이 지운다
+        ...
+
+    @abstractmethod
+    async def get_new_contents(self, user_node_id: str) -> Optional[dict]:
+        # {new_roommates, casts_received, stickers_from}. 돌려준 항목의 new 표시는 지운다
+        ...
+
+    @abstractmethod
+    async def get_alerts(self, user_node_id: str) -> Optional[dict]:
+        # {new_roommates}. 새 roommate 표시는 지우고, 새로 받은 cast 가 없으면 None
+        ...
+
+    @abstractmethod
+    async def list_neighbors_with_stickers(
+        self, user_node_id: str, roommate_node_id: str
+    ) -> List[dict]:
+        # [{neighbor, stickers}]. roommate 가 아니면 빈 목록
+        ...
+
+    @abstractmethod
+    async def list_neighbor_stickers(
+        self, user_node_id: str, neighbor_node_ids: List[str]
+    ) -> List[dict]:
+        # roommate_index 가 고른 neighbor 들의 [{neighbor, stickers}]
+        ...
+
+    # casts
+
+    @abstractmethod
+    async def create_cast(
+        self,
+        user_node_id: str,
+        message: str,
+        duration: int,
+        friends: List[str],
+        created_at: str,
+    ) -> Optional[List[str]]:
+        # 실제로 받은 사용자 목록. 받은 사람이 없으면 None
+        ...
+
+    @abstractmethod
+    async def reply_cast(self, user_node_id: str, cast_node_id: str, message: str) -> bool:
+        ...
+
+    # block / mute
+
+    @abstractmethod
+    async def block(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def list_blocked(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        # [(block_edge_id, 사용자 properties)]
+        ...
+
+    @abstractmethod
+    async def unblock(self, user_node_id: str, block_edge_id: str) -> Optional[str]:
+        # 지운 block 의 상대 node_id
+        ...
+
+    @abstractmethod
+    async def mute(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def list_muted(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        ...
+
+    @abstractmethod
+    async def unmute(self, user_node_id: str, mute_edge_id: str) -> Optional[str]:
+        ...
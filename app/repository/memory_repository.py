@@ -0,0 +1,1178 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple, Union
+from .base import GraphRepository, Cursor
+
+
+def _page(items: Iterable[dict], key: str, limit: Optional[int], cursor: Cursor) -> List[dict]:
+    # 페이지 쿼리와 같은 순서: (created_at, key) 내림차순, cursor 보다 뒤에 있는 것부터 limit 개
+    items = sorted(items, key=lambda item: (item["created_at"], item[key]), reverse=True)
+    if limit is None:
+        return items
+    if cursor is not None:
+        items = [item for item in items if (item["created_at"], item[key]) < tuple(cursor)]
+    return items[:limit]
+
+
+class _Edges:
+    # edge_id -> edge(from/to 와 properties) 와 함께 (from, to), from, to 별 색인을 들고 있어서
+    # 관계 확인과 한 사용자의 엣지 목록이 전체 엣지 수와 상관없이 끝난다.
+    # block 처럼 같은 (from, to) 엣지가 여러 개일 수 있어서 색인 값은 edge_id 의 set 이다.
+
+    def __init__(self):
+        self._edges = {}
+        self._by_pair = {}
+        self._outgoing = {}
+        self._incoming = {}
+
+    def add(self, edge_id: str, edge: dict):
+        self._edges[edge_id] = edge
+        self._by_pair.setdefault((edge["from"], edge["to"]), set()).add(edge_id)
+        self._outgoing.setdefault(edge["from"], set()).add(edge_id)
+        self._incoming.setdefault(edge["to"], set()).add(edge_id)
+
+    def get(self, edge_id: str) -> Optional[dict]:
+        return self._edges.get(edge_id)
+
+    def pop(self, edge_id: str) -> Optional[dict]:
+        edge = self._edges.pop(edge_id, None)
+        if edge is None:
+            return None
+        for index, key in (
+            (self._by_pair, (edge["from"], edge["to"])),
+            (self._outgoing, edge["from"]),
+            (self._incoming, edge["to"]),
+        ):
+            edge_ids = index.get(key)
+            if edge_ids is not None:
+                edge_ids.discard(edge_id)
+                if not edge_ids:
+                    del index[key]
+        return edge
+
+    def find(self, from_node_id: str, to_node_id: str) -> Optional[str]:
+        return next(iter(self._by_pair.get((from_node_id, to_node_id), ())), None)
+
+    def between(self, node_id: str, other_node_id: str) -> List[str]:
+        # 방향과 상관없이 두 사용자 사이의 엣지
+        return list(self._by_pair.get((node_id, other_node_id), ())) + list(
+            self._by_pair.get((other_node_id, node_id), ())
+        )
+
+    def outgoing(self, node_id: str) -> List[str]:
+        return list(self._outgoing.get(node_id, ()))
+
+    def incoming(self, node_id: str) -> List[str]:
+        return list(self._incoming.get(node_id, ()))
+
+    def remove_node(self, node_id: str):
+        for edge_id in self.outgoing(node_id) + self.incoming(node_id):
+            self.pop(edge_id)
+
+    def values(self):
+        return self._edges.values()
+
+
+class InMemoryGraphRepository(GraphRepository):
+    # 프로세스 메모리의 dict 와 인접 set, 엣지 색인으로 그래프를 흉내 내는 백엔드. Neo4j 없이 벤치마크와 테스트를 돌릴 때 쓴다.
+    # 각 메서드는 같은 이름의 Cypher 쿼리와 같은 조건, 같은 메시지를 돌려준다.
+    # 요청 하나가 await 없이 끝나므로 이벤트 루프 하나에서는 따로 잠그지 않아도 된다.
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.users = {}
+        # email -> PrivateData properties. user_node_id 로 is_info 엣지를 대신한다
+        self.private_data = {}
+        self._email_of = {}
+        # (from, to) -> is_roommate edge properties. 항상 양방향으로 만들어진다
+        self.roommates = {}
+        self._roommates_of = {}
+        self.knocks = _Edges()
+        self.blocks = _Edges()
+        self.mutes = _Edges()
+        self.stickers = {}
+        self._stickers_of = {}
+        self._sticker_creator = {}
+        # (받은 사용자, sticker node_id) -> receiver_of_sticker edge properties
+        self.sticker_receivers = {}
+        self.posts = {}
+        self._posts_of = {}
+        self._post_creator = {}
+        self.casts = {}
+        self.cast_receivers = {}
+        # 아직 new 표시가 남아 있는 (받은 사용자, cast node_id)
+        self._new_casts = set()
+        self.cast_replies = []
+        # S3 key -> {user_node_id, created_at}
+        self.pending_uploads = {}
+
+    # 시드 데이터
+
+    def add_user(self, node_id: str = None, **properties) -> str:
+        node_id = node_id or str(uuid.uuid4())
+        user = {"node_id": node_id, "nickname": "", "username": "", "groups": [], **properties}
+        self.users[node_id] = user
+        self._roommates_of.setdefault(node_id, set())
+        self._stickers_of.setdefault(node_id, [])
+        self._posts_of.setdefault(node_id, [])
+        return node_id
+
+    def add_roommate(self, node_id: str, other_node_id: str, group: str = ""):
+        for from_node_id, to_node_id in ((node_id, other_node_id), (other_node_id, node_id)):
+            self.roommates[(from_node_id, to_node_id)] = {
+                "memo": "",
+                "edge_id": str(uuid.uuid4()),
+                "group": group,
+            }
+            self._roommates_of[from_node_id].add(to_node_id)
+
+    def add_sticker(self, user_node_id: str, created_at: str, **properties) -> str:
+        node_id = properties.pop("node_id", None) or str(uuid.uuid4())
+        self.stickers[node_id] = {
+            "node_id": node_id,
+            "content": "",
+            "image_url": [],
+            "created_at": created_at,
+            "deleted_at": "",
+            **properties,
+        }
+        self._stickers_of[user_node_id].append(node_id)
+        self._sticker_creator[node_id] = user_node_id
+        return node_id
+
+    def add_post(self, user_node_id: str, created_at: str, **properties) -> str:
+        node_id = properties.pop("node_id", None) or str(uuid.uuid4())
+        self.posts[node_id] = {
+            "node_id": node_id,
+            "content": "",
+            "image_url": [],
+            "is_public": True,
+            "title": "",
+            "tags": [],
+            "created_at": created_at,
+            **properties,
+        }
+        self._posts_of[user_node_id].append(node_id)
+        self._post_creator[node_id] = user_node_id
+        return node_id
+
+    def roommates_of(self, node_id: str) -> List[str]:
+        return sorted(self._roommates_of.get(node_id, ()))
+
+    def roommate_edges(self) -> List[Tuple[str, str]]:
+        return list(self.roommates)
+
+    def block_edges(self) -> List[Tuple[str, str]]:
+        return [(edge["from"], edge["to"]) for edge in self.blocks.values()]
+
+    def mute_edges(self) -> List[Tuple[str, str]]:
+        return [(edge["from"], edge["to"]) for edge in self.mutes.values()]
+
+    # 관계 조회
+
+    def _blocked(self, from_node_id: str, to_node_id: str) -> bool:
+        return self.blocks.find(from_node_id, to_node_id) is not None
+
+    def _blocked_either(self, node_id: str, other_node_id: str) -> bool:
+        return self._blocked(node_id, other_node_id) or self._blocked(other_node_id, node_id)
+
+    def _muted(self, from_node_id: str, to_node_id: str) -> bool:
+        return self.mutes.find(from_node_id, to_node_id) is not None
+
+    def _remove_roommate(self, node_id: str, other_node_id: str):
+        for from_node_id, to_node_id in ((node_id, other_node_id), (other_node_id, node_id)):
+            self.roommates.pop((from_node_id, to_node_id), None)
+            self._roommates_of.get(from_node_id, set()).discard(to_node_id)
+
+    def _unread_stickers(self, user_node_id: str, creator_node_id: str) -> List[str]:
+        # creator 의 살아 있는 스티커 중 user 가 읽지 않은 것
+        return [
+            node_id
+            for node_id in self._stickers_of.get(creator_node_id, ())
+            if node_id in self.stickers
+            and self.stickers[node_id]["deleted_at"] == ""
+            and not self.sticker_receivers.get((user_node_id, node_id), {}).get("read")
+        ]
+
+    def _visible(self, user_node_id: str, other_node_id: str) -> bool:
+        # 피드에 보이는 상대: 어느 쪽으로도 block 이 없고 내가 mute 하지 않았다
+        return not self._blocked_either(user_node_id, other_node_id) and not self._muted(
+            user_node_id, other_node_id
+        )
+
+    def _neighbors_via(self, user_node_id: str, roommate_node_id: str) -> List[str]:
+        return [
+            neighbor
+            for neighbor in sorted(self._roommates_of.get(roommate_node_id, ()))
+            if neighbor != user_node_id
+        ]
+
+    def _add_private_data(self, email: str, user_node_id: str, **properties):
+        self.private_data[email] = {
+            "email": email,
+            "link_info": "",
+            "verification_info": "",
+            "link_count": 0,
+            "verification_count": 0,
+            "user_node_id": user_node_id,
+            **properties,
+        }
+        self._email_of[user_node_id] = email
+
+    def _remove_user(self, user_node_id: str):
+        # DETACH DELETE 처럼 사용자와 그 사용자에 닿는 엣지를 지운다. 스티커/게시글 노드는 남는다
+        for roommate in list(self._roommates_of.get(user_node_id, ())):
+            self._remove_roommate(user_node_id, roommate)
+        for edges in (self.knocks, self.blocks, self.mutes):
+            edges.remove_node(user_node_id)
+        for key in [key for key in self.sticker_receivers if key[0] == user_node_id]:
+            del self.sticker_receivers[key]
+        for receivers in self.cast_receivers.values():
+            receivers.discard(user_node_id)
+        self._roommates_of.pop(user_node_id, None)
+        del self.users[user_node_id]
+
+    # accounts
+
+    async def record_verification_code(self, email: str, verification_info: str) -> Optional[str]:
+        private_data = self.private_data.get(email)
+        if private_data is None or private_data["verification_count"] >= 5:
+            return None
+        private_data["verification_count"] += 1
+        private_data["verification_info"] = verification_info
+        return "verification code sent"
+
+    async def verify_code(self, email: str, verify_code: str, now: str) -> bool:
+        private_data = self.private_data.get(email)
+        if private_data is None or private_data["grant"] != "not-verified":
+            return False
+        # verification_info 는 "코드 : 만료 시각" 형식이다
+        verification_info = private_data["verification_info"]
+        if datetime.fromisoformat(verification_info[-19:]) <= datetime.fromisoformat(now):
+            return False
+        if verification_info[:6] != verify_code:
+            return False
+        private_data["grant"] = "user"
+        return True
+
+    async def signup(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+    ) -> bool:
+        if email in self.private_data:
+            return False
+        self.add_user(
+            user_node_id,
+            username=username,
+            nickname=nickname,
+            tags=list(tags),
+            my_memo="",
+            groups=[""],
+        )
+        self._add_private_data(
+            email,
+            user_node_id,
+            password=password,
+            username=username,
+            grant="not-verified",
+            node_id=private_node_id,
+        )
+        return True
+
+    async def get_private_data(self, email: str) -> Optional[dict]:
+        private_data = self.private_data.get(email)
+        if private_data is None:
+            return None
+        return {key: value for key, value in private_data.items() if key != "user_node_id"}
+
+    async def dummy_create(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+        profile_image_url: str,
+    ):
+        self.add_user(
+            user_node_id, username=username, nickname=nickname, tags=list(tags), my_memo=""
+        )
+        self._add_private_data(
+            email,
+            user_node_id,
+            password=password,
+            username=username,
+            grant="user",
+            node_id=private_node_id,
+            profile_image_url=profile_image_url,
+        )
+
+    async def get_credentials(self, email: str) -> Optional[dict]:
+        private_data = self.private_data.get(email)
+        if private_data is None:
+            return None
+        return {
+            "password": private_data["password"],
+            "grant": private_data["grant"],
+            "user_node_id": private_data["user_node_id"],
+        }
+
+    async def reset_password(self, email: str, password: str) -> Optional[str]:
+        private_data = self.private_data.get(email)
+        if private_data is None or private_data["grant"] == "not-verified":
+            return None
+        private_data["password"] = password
+        return email
+
+    def _private_data_of(self, user_node_id: str) -> Optional[dict]:
+        email = self._email_of.get(user_node_id)
+        return self.private_data.get(email) if email is not None else None
+
+    async def get_password(self, user_node_id: str) -> Optional[str]:
+        private_data = self._private_data_of(user_node_id)
+        return private_data["password"] if private_data else None
+
+    async def change_password(self, user_node_id: str, password: str) -> Optional[str]:
+        private_data = self._private_data_of(user_node_id)
+        if private_data is None:
+            return None
+        private_data["password"] = password
+        return "Password changed successfully"
+
+    async def delete_account(self, user_node_id: str) -> Optional[str]:
+        if self._private_data_of(user_node_id) is None or user_node_id not in self.users:
+            return None
+        del self.private_data[self._email_of.pop(user_node_id)]
+        self._remove_user(user_node_id)
+        return "User deleted successfully"
+
+    async def is_admin(self, user_node_id: str) -> bool:
+        private_data = self._private_data_of(user_node_id)
+        return private_data is not None and private_data["grant"] == "admin"
+
+    async def delete_user(self, user_node_id: str) -> int:
+        if user_node_id not in self.users:
+            return 0
+        email = self._email_of.pop(user_node_id, None)
+        if email is not None:
+            del self.private_data[email]
+        self._remove_user(user_node_id)
+        return 1
+
+    # users
+
+    async def get_user(self, user_node_id: str) -> Optional[dict]:
+        user = self.users.get(user_node_id)
+        return dict(user) if user else None
+
+    async def set_profile_image(self, user_node_id: str, profile_image_url: str) -> bool:
+        user = self.users.get(user_node_id)
+        if user is None:
+            return False
+        user["profile_image_url"] = profile_image_url
+        return True
+
+    async def update_user(self, user_node_id: str, properties: dict) -> Optional[dict]:
+        user = self.users.get(user_node_id)
+        if user is None:
+            return None
+        # SET u += $update_data 처럼 값이 None 인 속성은 지운다
+        for key, value in properties.items():
+            if value is None:
+                user.pop(key, None)
+            else:
+                user[key] = value
+        return dict(user)
+
+    def _search_record(self, user_node_id: str, other_node_id: str, score: float) -> dict:
+        other = self.users[other_node_id]
+        return {
+            "nickname": other.get("nickname"),
+            "username": other.get("username"),
+            "profile_image_url": other.get("profile_image_url"),
+            "is_roommate": (user_node_id, other_node_id) in self.roommates,
+            "sent_knock": self.knocks.find(user_node_id, other_node_id) is not None,
+            "node_id": other_node_id,
+            "score": score,
+        }
+
+    async def search_users(
+        self, user_node_id: str, query: str, cursor: Optional[Tuple[float, str]], limit: int
+    ) -> List[dict]:
+        if user_node_id not in self.users:
+            return []
+        terms = query.lower().split()
+        records = []
+        for node_id, user in self.users.items():
+            if node_id == user_node_id or self._blocked_either(user_node_id, node_id):
+                continue
+            words = f"{user.get('nickname') or ''} {user.get('username') or ''}".lower().split()
+            # 전문 검색처럼 모든 단어가 맞아야 하고, 정확히 일치하는 단어는 접두어 일치보다 점수가 높다
+            score = 0.0
+            for term in terms:
+                if term in words:
+                    score += 2.0
+                elif any(word.startswith(term) for word in words):
+                    score += 1.0
+                else:
+                    break
+            else:
+                if terms and (
+                    cursor is None
+                    or score < cursor[0]
+                    or (score == cursor[0] and node_id > cursor[1])
+                ):
+                    records.append(self._search_record(user_node_id, node_id, score))
+        records.sort(key=lambda record: (-record["score"], record["node_id"]))
+        return records[:limit]
+
+    async def search_users_contains(
+        self, user_node_id: str, keyword: str, cursor_node_id: Optional[str], limit: int
+    ) -> List[dict]:
+        if user_node_id not in self.users:
+            return []
+        node_ids = sorted(
+            node_id
+            for node_id, user in self.users.items()
+            if node_id != user_node_id
+            and (
+                keyword in (user.get("nickname") or "").lower()
+                or keyword in (user.get("username") or "").lower()
+            )
+            and not self._blocked_either(user_node_id, node_id)
+            and (cursor_node_id is None or node_id > cursor_node_id)
+        )
+        return [
+            self._search_record(user_node_id, node_id, 0.0) for node_id in node_ids[:limit]
+        ]
+
+    # uploads
+
+    async def create_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str], created_at: str
+    ):
+        for s3_key in s3_keys:
+            self.pending_uploads[s3_key] = {
+                "user_node_id": user_node_id,
+                "created_at": created_at,
+            }
+
+    async def claim_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str]
+    ) -> List[str]:
+        claimed = []
+        for s3_key in dict.fromkeys(s3_keys):
+            upload = self.pending_uploads.get(s3_key)
+            if upload and upload["user_node_id"] == user_node_id:
+                del self.pending_uploads[s3_key]
+                claimed.append(s3_key)
+        return claimed
+
+    async def delete_pending_uploads(self, s3_keys: List[str]):
+        for s3_key in s3_keys:
+            self.pending_uploads.pop(s3_key, None)
+
+    async def list_abandoned_uploads(self, created_before: str, limit: int) -> List[str]:
+        return [
+            s3_key
+            for s3_key, upload in self.pending_uploads.items()
+            if upload["created_at"] < created_before
+        ][:limit]
+
+    # roommates
+
+    async def feed_audience(self, user_node_ids: List[str]) -> List[str]:
+        audience = set()
+        for user_node_id in user_node_ids:
+            if user_node_id not in self.users:
+                continue
+            for roommate in self._roommates_of[user_node_id]:
+                audience.add(roommate)
+                audience.update(self._roommates_of[roommate])
+        return list(audience)
+
+    async def get_members(self, user_node_id: str) -> List[dict]:
+        if user_node_id not in self.users:
+            return []
+        roommates = self.roommates_of(user_node_id)
+        roommates_with_neighbors = []
+        pure_neighbors = {}
+        for roommate in roommates:
+            edge = self.roommates[(user_node_id, roommate)]
+            edge.pop("new", None)
+            neighbors = self._neighbors_via(user_node_id, roommate)
+            roommates_with_neighbors.append(
+                {
+                    "roommate_edge": dict(edge),
+                    "roommate": dict(self.users[roommate]),
+                    "neighbors": neighbors,
+                }
+            )
+            for neighbor in neighbors:
+                if neighbor not in roommates and not self._blocked_either(
+                    user_node_id, neighbor
+                ):
+                    pure_neighbors[neighbor] = dict(self.users[neighbor])
+        # OPTIONAL MATCH 가 비면 쿼리는 null 로 채운 행 하나를 돌려준다
+        if not roommates_with_neighbors:
+            roommates_with_neighbors = [
+                {"neighbors": [], "roommate_edge": None, "roommate": None}
+            ]
+        return [
+            {
+                "me": dict(self.users[user_node_id]),
+                "pure_neighbors": list(pure_neighbors.values()),
+                "roommatesWithNeighbors": roommates_with_neighbors,
+            }
+        ]
+
+    async def get_member(self, user_node_id: str, friend_node_id: str) -> dict:
+        friend = self.users.get(friend_node_id)
+        if friend is None:
+            message = "no such node " + friend_node_id
+        elif self._blocked_either(user_node_id, friend_node_id):
+            message = "block exists"
+        else:
+            message = "welcome my friend"
+        return {
+            "message": message,
+            "friend": dict(friend) if friend else None,
+            "roommate_edge": dict(self.roommates.get((user_node_id, friend_node_id), {})),
+            "stickers": self._live_stickers(friend_node_id) if friend else [],
+            "posts": (
+                [dict(self.posts[node_id]) for node_id in self._posts_of[friend_node_id]]
+                if friend
+                else []
+            ),
+        }
+
+    async def get_member_properties(
+        self, user_node_id: str, pure_neighbor_ids: List[str]
+    ) -> Optional[dict]:
+        if user_node_id not in self.users:
+            return None
+        roommates = [
+            {
+                "roommate_edge": dict(self.roommates[(user_node_id, roommate)]),
+                "roommate": dict(self.users[roommate]),
+            }
+            for roommate in self.roommates_of(user_node_id)
+        ] or [{"roommate_edge": None, "roommate": None}]
+        return {
+            "me": dict(self.users[user_node_id]),
+            "roommates": roommates,
+            "pure_neighbors": [
+                dict(self.users[node_id])
+                for node_id in pure_neighbor_ids
+                if node_id in self.users
+            ],
+        }
+
+    async def clear_new_roommate_flags(self, user_node_id: str):
+        for roommate in self._roommates_of.get(user_node_id, ()):
+            self.roommates[(user_node_id, roommate)].pop("new", None)
+
+    async def delete_roommate(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        if (user_node_id, friend_node_id) not in self.roommates:
+            return None
+        self._remove_roommate(user_node_id, friend_node_id)
+        return "Edge deleted"
+
+    async def get_memo(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        edge = self.roommates.get((user_node_id, friend_node_id))
+        return edge["memo"] if edge is not None else None
+
+    async def modify_memo(self, user_node_id: str, friend_node_id: str, memo: str) -> bool:
+        edge = self.roommates.get((user_node_id, friend_node_id))
+        if edge is None:
+            return False
+        edge["memo"] = memo
+        return True
+
+    async def get_groups(self, user_node_id: str) -> List[dict]:
+        user = self.users.get(user_node_id)
+        if user is None:
+            return []
+        groups = [
+            self.roommates[(user_node_id, roommate)]["group"]
+            for roommate in self._roommates_of[user_node_id]
+        ]
+        return [{"name": name, "count": groups.count(name)} for name in user.get("groups") or []]
+
+    async def modify_group(self, user_node_id: str, friend_node_id: str, group: str) -> bool:
+        edge = self.roommates.get((user_node_id, friend_node_id))
+        if edge is None:
+            return False
+        edge["group"] = group
+        return True
+
+    # knocks
+
+    async def send_knock(
+        self,
+        from_user_node_id: str,
+        to_user_node_id: str,
+        knock_edge_id: str,
+        group: str,
+        created_at: str,
+    ) -> Optional[str]:
+        if from_user_node_id not in self.users or to_user_node_id not in self.users:
+            return None
+        if from_user_node_id == to_user_node_id:
+            return "cannot send to myself"
+        if self.knocks.find(from_user_node_id, to_user_node_id):
+            return "knock already sent"
+        if self._blocked(from_user_node_id, to_user_node_id):
+            return "User does not exist"
+        if (to_user_node_id, from_user_node_id) in self.roommates:
+            return "already roommate"
+        self.knocks.add(
+            knock_edge_id,
+            {
+                "from": from_user_node_id,
+                "to": to_user_node_id,
+                "group": group,
+                "created_at": created_at,
+            },
+        )
+        return "send knock successfully"
+
+    async def list_knocks(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> List[dict]:
+        knocks = []
+        for edge_id in self.knocks.incoming(user_node_id):
+            edge = self.knocks.get(edge_id)
+            knocks.append(
+                {
+                    "knock_edge_id": edge_id,
+                    "nickname": self.users[edge["from"]]["nickname"],
+                    "created_at": edge["created_at"],
+                }
+            )
+        return _page(knocks, "knock_edge_id", limit, cursor)
+
+    async def reject_knock(self, user_node_id: str, knock_edge_id: str) -> Optional[str]:
+        edge = self.knocks.get(knock_edge_id)
+        if not edge or edge["to"] != user_node_id:
+            return None
+        self.knocks.pop(knock_edge_id)
+        return "knock deleted successfully"
+
+    async def accept_knock(
+        self, user_node_id: str, knock_edge_id: str, group: str
+    ) -> Optional[dict]:
+        edge = self.knocks.get(knock_edge_id)
+        if not edge or edge["to"] != user_node_id:
+            return None
+        from_user_node_id = edge["from"]
+        if (user_node_id, from_user_node_id) in self.roommates or (
+            from_user_node_id,
+            user_node_id,
+        ) in self.roommates:
+            return None
+
+        self.roommates[(from_user_node_id, user_node_id)] = {
+            "memo": "",
+            "edge_id": str(uuid.uuid4()),
+            "group": edge["group"],
+        }
+        self.roommates[(user_node_id, from_user_node_id)] = {
+            "memo": "",
+            "edge_id": str(uuid.uuid4()),
+            "group": group,
+            "new": True,
+        }
+        self._roommates_of[from_user_node_id].add(user_node_id)
+        self._roommates_of[user_node_id].add(from_user_node_id)
+
+        from_user = self.users[from_user_node_id]
+        if edge["group"] not in from_user["groups"]:
+            from_user["groups"] = from_user["groups"] + [edge["group"]]
+        for edge_id in self.knocks.between(from_user_node_id, user_node_id):
+            self.knocks.pop(edge_id)
+
+        new_neighbors = [
+            dict(self.users[neighbor])
+            for neighbor in self._roommates_of[from_user_node_id]
+            if neighbor != user_node_id and not self._blocked_either(from_user_node_id, neighbor)
+        ]
+        return {"new_roommate": dict(from_user), "new_neighbors": new_neighbors}
+
+    async def create_knock_link(self, user_node_id: str, link_info: str) -> bool:
+        private_data = self._private_data_of(user_node_id)
+        if private_data is None or private_data["link_count"] >= 5:
+            return False
+        private_data["link_count"] += 1
+        private_data["link_info"] = link_info
+        return True
+
+    async def accept_knock_by_link(
+        self, user_node_id: str, knock_id: str, now: str
+    ) -> Optional[dict]:
+        # link_info 는 "링크 코드(36자) : 만료 시각" 형식이다
+        link_creator = next(
+            (
+                private_data["user_node_id"]
+                for private_data in self.private_data.values()
+                if private_data["link_info"][:36] == knock_id
+                and datetime.fromisoformat(private_data["link_info"][-19:])
+                > datetime.fromisoformat(now)
+            ),
+            None,
+        )
+        if (
+            link_creator is None
+            or user_node_id not in self.users
+            or (link_creator, user_node_id) in self.roommates
+            or (user_node_id, link_creator) in self.roommates
+            or self._blocked_either(link_creator, user_node_id)
+        ):
+            return None
+        self.roommates[(link_creator, user_node_id)] = {
+            "memo": "",
+            "edge_id": str(uuid.uuid4()),
+            "group": "",
+        }
+        self.roommates[(user_node_id, link_creator)] = {
+            "memo": "",
+            "edge_id": str(uuid.uuid4()),
+            "group": "",
+            "new": True,
+        }
+        self._roommates_of[link_creator].add(user_node_id)
+        self._roommates_of[user_node_id].add(link_creator)
+        return {"message": "Knock accepted successfully", "link_creator": link_creator}
+
+    # stickers
+
+    def _live_stickers(self, user_node_id: str) -> List[dict]:
+        return [
+            dict(self.stickers[node_id])
+            for node_id in self._stickers_of[user_node_id]
+            if node_id in self.stickers and self.stickers[node_id]["deleted_at"] == ""
+        ]
+
+    async def create_sticker(
+        self, user_node_id: str, content: str, image_url: List[str], created_at: str
+    ) -> Optional[str]:
+        if user_node_id not in self.users:
+            return None
+        node_id = self.add_sticker(
+            user_node_id, created_at, content=content, image_url=list(image_url)
+        )
+        # fan-out 워커가 만드는 것과 같은 받은 엣지를 바로 만든다. roommate 에게만 new 표시를 붙인다
+        roommates = self._roommates_of[user_node_id]
+        for roommate in roommates:
+            self.sticker_receivers[(roommate, node_id)] = {"read": False, "new": True}
+            for neighbor in self._roommates_of[roommate]:
+                if neighbor != user_node_id and neighbor not in roommates:
+                    self.sticker_receivers.setdefault(
+                        (neighbor, node_id), {"read": False}
+                    )
+        return node_id
+
+    async def read_sticker(self, user_node_id: str, sticker_node_id: str) -> bool:
+        if user_node_id not in self.users or sticker_node_id not in self.stickers:
+            return False
+        edge = self.sticker_receivers.setdefault((user_node_id, sticker_node_id), {})
+        edge["read"] = True
+        edge.pop("new", None)
+        return True
+
+    async def delete_sticker(
+        self, user_node_id: str, sticker_node_id: str, deleted_at: str
+    ) -> Tuple[str, List[str]]:
+        sticker = self.stickers.get(sticker_node_id)
+        if user_node_id not in self.users:
+            return "User does not exist", []
+        if sticker is None:
+            return "Sticker does not exist", []
+        if self._sticker_creator.get(sticker_node_id) != user_node_id:
+            return "Relationship does not exist", []
+        sticker["deleted_at"] = deleted_at
+        return "Sticker and relationship deleted", list(sticker["image_url"])
+
+    async def list_stickers(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        if user_node_id not in self.users:
+            message = "no such node " + user_node_id
+        elif friend_node_id not in self.users:
+            message = "no such node " + friend_node_id
+        elif self._blocked_either(user_node_id, friend_node_id):
+            message = "block exists"
+        elif self._muted(user_node_id, friend_node_id):
+            message = "mute exists"
+        else:
+            message = "get stickers"
+
+        if message != "get stickers":
+            # 예전 쿼리는 메시지와 상관없이 스티커를 모았지만 핸들러가 쓰지 않는다
+            return message, []
+        return message, _page(self._live_stickers(friend_node_id), "node_id", limit, cursor)
+
+    async def list_my_stickers(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        if user_node_id not in self.users:
+            return None
+        return _page(self._live_stickers(user_node_id), "node_id", limit, cursor)
+
+    # posts
+
+    async def create_post(
+        self,
+        user_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tags: List[str],
+        created_at: str,
+    ) -> bool:
+        if user_node_id not in self.users:
+            return False
+        self.add_post(
+            user_node_id,
+            created_at,
+            content=content,
+            image_url=list(image_url),
+            is_public=is_public,
+            title=title,
+            tags=list(tags),
+        )
+        return True
+
+    async def modify_post(
+        self,
+        user_node_id: str,
+        post_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tag: List[str],
+    ) -> Union[str, dict]:
+        post = self.posts.get(post_node_id)
+        if user_node_id not in self.users:
+            return "no such user"
+        if post is None:
+            return "no such post"
+        if self._post_creator.get(post_node_id) != user_node_id:
+            return "the user is not owner of the post"
+        # MODIFY_MY_POST_QUERY 처럼 태그는 tag 속성에 쓴다
+        post.update(
+            content=content,
+            image_url=list(image_url),
+            is_public=is_public,
+            title=title,
+            tag=list(tag),
+        )
+        return dict(post)
+
+    async def delete_post(self, user_node_id: str, post_node_id: str) -> Tuple[str, List[str]]:
+        post = self.posts.get(post_node_id)
+        if user_node_id not in self.users:
+            return "User does not exist", []
+        # 메시지는 DELETE_MY_POST_QUERY 와 같다
+        if post is None:
+            return "Sticker does not exist", []
+        if self._post_creator.get(post_node_id) != user_node_id:
+            return "Relationship does not exist", []
+        del self.posts[post_node_id]
+        self._posts_of[user_node_id].remove(post_node_id)
+        del self._post_creator[post_node_id]
+        return "Sticker and relationship deleted", list(post["image_url"])
+
+    async def list_posts(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        if user_node_id not in self.users:
+            message = "no such user " + user_node_id
+        elif friend_node_id not in self.users:
+            message = "no such friend " + friend_node_id
+        elif self._blocked(friend_node_id, user_node_id):
+            message = "is_blocked exists"
+        elif self._muted(user_node_id, friend_node_id):
+            message = "mute exists"
+        else:
+            message = "get posts"
+
+        if message != "get posts":
+            return message, []
+        posts = [
+            dict(self.posts[node_id])
+            for node_id in self._posts_of[friend_node_id]
+            if self.posts[node_id]["is_public"]
+        ]
+        return message, _page(posts, "node_id", limit, cursor)
+
+    async def list_my_posts(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        if user_node_id not in self.users:
+            return None
+        posts = [dict(self.posts[node_id]) for node_id in self._posts_of[user_node_id]]
+        return _page(posts, "node_id", limit, cursor)
+
+    # feeds
+
+    def _received_casts(self, user_node_id: str, new_only: bool) -> List[str]:
+        return [
+            node_id
+            for node_id, receivers in self.cast_receivers.items()
+            if user_node_id in receivers
+            and self.casts[node_id]["deleted_at"] == ""
+            and (not new_only or (user_node_id, node_id) in self._new_casts)
+            and self._visible(user_node_id, self.casts[node_id]["creator"])
+        ]
+
+    async def get_contents(self, user_node_id: str) -> Optional[dict]:
+        if user_node_id not in self.users:
+            return None
+        cast_node_ids = self._received_casts(user_node_id, new_only=False)
+        casts = [
+            {"cast": dict(self.casts[node_id]), "creator": self.casts[node_id]["creator"]}
+            for node_id in cast_node_ids
+        ] or [{"cast": None, "creator": None}]
+        self._new_casts.difference_update((user_node_id, node_id) for node_id in cast_node_ids)
+
+        roommates = self._roommates_of[user_node_id]
+        stickered_roommates = [
+            roommate
+            for roommate in sorted(roommates)
+            if self._visible(user_node_id, roommate)
+            and self._unread_stickers(user_node_id, roommate)
+        ]
+        stickered_neighbors = []
+        for roommate in sorted(roommates):
+            for neighbor in self._neighbors_via(user_node_id, roommate):
+                if (
+                    neighbor not in roommates
+                    and neighbor not in stickered_neighbors
+                    and self._visible(user_node_id, neighbor)
+                    and self._unread_stickers(user_node_id, neighbor)
+                ):
+                    stickered_neighbors.append(neighbor)
+        return {
+            "casts": casts,
+            "stickered_roommates": stickered_roommates,
+            "stickered_neighbors": stickered_neighbors,
+        }
+
+    async def get_new_contents(self, user_node_id: str) -> Optional[dict]:
+        if user_node_id not in self.users:
+            return None
+        # 쿼리처럼 먼저 읽고, 돌려준 항목의 new 표시는 마지막에 지운다
+        new_edges = []
+        new_roommates = []
+        for roommate in sorted(self._roommates_of[user_node_id]):
+            edge = self.roommates.get((roommate, user_node_id), {})
+            if not edge.get("new"):
+                continue
+            new_edges.append(edge)
+            new_roommates.append(
+                {
+                    "new_roommate": dict(self.users[roommate]),
+                    "neighbors": [
+                        dict(self.users[neighbor])
+                        for neighbor in self._neighbors_via(user_node_id, roommate)
+                        if not self._blocked(roommate, neighbor)
+                    ],
+                }
+            )
+
+        cast_node_ids = self._received_casts(user_node_id, new_only=True)
+
+        stickers_from = []
+        for (receiver, sticker_node_id), edge in self.sticker_receivers.items():
+            creator = self._sticker_creator.get(sticker_node_id)
+            if (
+                receiver != user_node_id
+                or not edge.get("new")
+                or sticker_node_id not in self.stickers
+                or self.stickers[sticker_node_id]["deleted_at"] != ""
+                or (user_node_id, creator) not in self.roommates
+                or not self._visible(user_node_id, creator)
+            ):
+                continue
+            new_edges.append(edge)
+            if creator not in stickers_from:
+                stickers_from.append(creator)
+
+        for edge in new_edges:
+            edge.pop("new", None)
+        self._new_casts.difference_update((user_node_id, node_id) for node_id in cast_node_ids)
+
+        return {
+            "new_roommates": new_roommates or [{"new_roommate": None, "neighbors": []}],
+            "casts_received": [
+                {
+                    "cast": dict(self.casts[node_id]),
+                    "cast_creator": self.casts[node_id]["creator"],
+                }
+                for node_id in cast_node_ids
+            ]
+            or [{"cast": None, "cast_creator": None}],
+            "stickers_from": stickers_from,
+        }
+
+    def _neighbor_with_stickers(self, user_node_id: str, neighbor: str) -> dict:
+        return {
+            "neighbor": dict(self.users[neighbor]),
+            "stickers": (
+                []
+                if self._muted(user_node_id, neighbor)
+                else self._unread_stickers(user_node_id, neighbor)
+            ),
+        }
+
+    async def get_alerts(self, user_node_id: str) -> Optional[dict]:
+        if user_node_id not in self.users:
+            return None
+        new_roommates = []
+        for roommate in sorted(self._roommates_of[user_node_id]):
+            if self.roommates[(roommate, user_node_id)].pop("new", None):
+                new_roommates.append(dict(self.users[roommate]))
+        # 쿼리처럼 new 표시는 지운 뒤에, 새 roommate 와 새로 받은 cast 가 둘 다 있어야 행이 나온다
+        if not new_roommates or not self._received_casts(user_node_id, new_only=True):
+            return None
+        return {"new_roommates": new_roommates}
+
+    async def list_neighbors_with_stickers(
+        self, user_node_id: str, roommate_node_id: str
+    ) -> List[dict]:
+        if (user_node_id, roommate_node_id) not in self.roommates:
+            return []
+        neighbors = [
+            self._neighbor_with_stickers(user_node_id, neighbor)
+            for neighbor in self._neighbors_via(user_node_id, roommate_node_id)
+            if not self._blocked_either(user_node_id, neighbor)
+        ]
+        return neighbors or [{"neighbor": None, "stickers": []}]
+
+    async def list_neighbor_stickers(
+        self, user_node_id: str, neighbor_node_ids: List[str]
+    ) -> List[dict]:
+        return [
+            self._neighbor_with_stickers(user_node_id, neighbor)
+            for neighbor in neighbor_node_ids
+            if neighbor in self.users
+        ]
+
+    # casts
+
+    async def create_cast(
+        self,
+        user_node_id: str,
+        message: str,
+        duration: int,
+        friends: List[str],
+        created_at: str,
+    ) -> Optional[List[str]]:
+        if user_node_id not in self.users:
+            return None
+        receivers = [
+            friend
+            for friend in friends
+            if friend in self.users
+            and not self._muted(friend, user_node_id)
+            and not self._blocked_either(friend, user_node_id)
+        ]
+        node_id = str(uuid.uuid4())
+        self.casts[node_id] = {
+            "node_id": node_id,
+            "message": message,
+            "reply_visible": True,
+            "created_at": created_at,
+            "duration": duration,
+            "expires_at": (
+                datetime.fromisoformat(created_at) + timedelta(minutes=duration)
+            ).isoformat(),
+            "deleted_at": "",
+            "creator": user_node_id,
+        }
+        self.cast_receivers[node_id] = set(receivers)
+        self._new_casts.update((receiver, node_id) for receiver in receivers)
+        # 쿼리는 UNWIND 뒤에 collect 하므로 받은 사람이 없으면 행이 나오지 않는다
+        return receivers or None
+
+    async def reply_cast(self, user_node_id: str, cast_node_id: str, message: str) -> bool:
+        if user_node_id not in self.cast_receivers.get(cast_node_id, ()):
+            return False
+        self.cast_replies.append(
+            {
+                "from": user_node_id,
+                "to": cast_node_id,
+                "message": message,
+                "edge_id": str(uuid.uuid4()),
+            }
+        )
+        return True
+
+    # block / mute
+
+    async def block(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        if user_node_id not in self.users or friend_node_id not in self.users:
+            return None
+        # BLOCK_FRIEND_QUERY 는 OPTIONAL MATCH 뒤의 WHERE 때문에 b 가 항상 null 이라 매번 새 block 을 만든다
+        self.blocks.add(str(uuid.uuid4()), {"from": user_node_id, "to": friend_node_id})
+        self._remove_roommate(user_node_id, friend_node_id)
+        for edge_id in self.mutes.between(user_node_id, friend_node_id):
+            self.mutes.pop(edge_id)
+        return "User blocked successfully"
+
+    def _list_edges(self, edges: _Edges, user_node_id: str) -> List[Tuple[str, dict]]:
+        return [
+            (edge_id, dict(self.users[edges.get(edge_id)["to"]]))
+            for edge_id in edges.outgoing(user_node_id)
+        ]
+
+    @staticmethod
+    def _pop_edge(edges: _Edges, user_node_id: str, edge_id: str) -> Optional[str]:
+        edge = edges.get(edge_id)
+        if not edge or edge["from"] != user_node_id:
+            return None
+        edges.pop(edge_id)
+        return edge["to"]
+
+    async def list_blocked(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        return self._list_edges(self.blocks, user_node_id)
+
+    async def unblock(self, user_node_id: str, block_edge_id: str) -> Optional[str]:
+        return self._pop_edge(self.blocks, user_node_id, block_edge_id)
+
+    async def mute(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        if user_node_id not in self.users or friend_node_id not in self.users:
+            return None
+        if user_node_id == friend_node_id:
+            return "cannot mute myself"
+        if self._muted(user_node_id, friend_node_id):
+            return "already muted"
+        self.mutes.add(str(uuid.uuid4()), {"from": user_node_id, "to": friend_node_id})
+        return "muted successfully"
+
+    async def list_muted(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        return self._list_edges(self.mutes, user_node_id)
+
+    async def unmute(self, user_node_id: str, mute_edge_id: str) -> Optional[str]:
+        return self._pop_edge(self.mutes, user_node_id, mute_edge_id)
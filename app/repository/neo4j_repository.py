@@ -0,0 +1,702 @@
+from typing import List, Optional, Tuple, Union
+from app.domain.user.query import (
+    MY_INFO_QUERY,
+    MY_INFO_CHANGE_QUERY,
+    SEARCH_GET_MEMBERS_QUERY,
+    SEARCH_GET_MEMBERS_CONTAINS_QUERY,
+)
+from app.domain.auth.query import (
+    SEND_VERIFICATION_CODE_QUERY,
+    VERIFY_CODE_QUERY,
+    SIGNUP_QUERY,
+    GET_PRIVATE_DATA_BY_EMAIL_QUERY,
+    DUMMY_CREATE_QUERY,
+    SIGNIN_QUERY,
+    PW_RESET_QUERY,
+    GET_PASSWORD_QUERY,
+    CHANGE_PASSWORD_QUERY,
+    SIGNOUT_QUERY,
+)
+from app.domain.admin.query import ADMIN_CHECK_QUERY, ADMIN_DELETE_USER_QUERY
+from app.domain.service.content.query import (
+    GET_FEED_AUDIENCE_QUERY,
+    GET_STICKERS_QUERY,
+    GET_STICKERS_PAGE_QUERY,
+    GET_MY_STICKERS_QUERY,
+    GET_MY_STICKERS_PAGE_QUERY,
+    GET_POSTS_QUERY,
+    GET_POSTS_PAGE_QUERY,
+    GET_MY_POSTS_QUERY,
+    GET_MY_POSTS_PAGE_QUERY,
+    CREATE_CAST_QUERY,
+    REPLY_CAST_QUERY,
+    CREATE_STICKER_QUERY,
+    DELETE_STICKER_QUERY,
+    CREATE_POST_QUERY,
+    DELETE_MY_POST_QUERY,
+    MODIFY_MY_POST_QUERY,
+    READ_STICKER_QUERY,
+    GET_CONTENTS_QUERY,
+    CLEAR_NEW_CAST_FLAGS_QUERY,
+    GET_NEW_CONTENTS_QUERY,
+    CLEAR_NEW_CONTENT_FLAGS_QUERY,
+    GET_NEIGHBORS_WITH_STICKERS_QUERY,
+    GET_NEIGHBOR_STICKERS_QUERY,
+)
+from app.domain.service.friend.query import (
+    SEND_KNOCK_QUERY,
+    GET_KNOCKS_QUERY,
+    GET_KNOCKS_PAGE_QUERY,
+    REJECT_KNOCK_QUERY,
+    ACCEPT_KNOCK_QUERY,
+    GET_MEMBERS_QUERY,
+    GET_MEMBER_QUERY,
+    GET_MEMBERS_PROPERTIES_QUERY,
+    CLEAR_NEW_ROOMMATE_FLAGS_QUERY,
+    CREATE_KNOCK_LINK_QUERY,
+    ACCEPT_KNOCK_BY_LINK_QUERY,
+    DELETE_MEMBER_QUERY,
+    GET_MEMO_QUERY,
+    MODIFY_MEMO_QUERY,
+    GET_GROUPS_NAME_AND_NUMBER_QUERY,
+    MODIFY_GROUP_QUERY,
+)
+from app.domain.service.alert.query import GET_ALERTS_QUERY
+from app.domain.service.friend.block.query import (
+    BLOCK_FRIEND_QUERY,
+    GET_BLOCKED_QUERY,
+    POP_BLOCKED_QUERY,
+)
+from app.domain.service.friend.mute.query import (
+    MUTE_FRIEND_QUERY,
+    GET_MUTED_QUERY,
+    POP_MUTED_QUERY,
+)
+from app.domain.service.upload.query import (
+    COMMIT_PROFILE_IMAGE_QUERY,
+    CREATE_PENDING_UPLOADS_QUERY,
+    CLAIM_PENDING_UPLOADS_QUERY,
+    DELETE_PENDING_UPLOADS_QUERY,
+    GET_ABANDONED_UPLOADS_QUERY,
+)
+from .base import GraphRepository, Cursor
+
+LUCENE_SPECIAL_CHARACTERS = set('\\+-!():^[]"{}~*?|&/')
+
+
+def _cursor_params(cursor: Cursor) -> dict:
+    created_at, node_id = cursor or (None, None)
+    return {"cursor_created_at": created_at, "cursor_node_id": node_id}
+
+
+def _fulltext_query(query: str) -> str:
+    # 사용자가 입력한 문자열을 Lucene 문법으로 해석하지 않도록 특수문자를 이스케이프하고,
+    # 단어마다 접두어 검색을 하되 단어가 정확히 일치하면 점수를 더 준다
+    terms = []
+    for term in query.lower().split():
+        escaped = "".join(
+            "\\" + char if char in LUCENE_SPECIAL_CHARACTERS else char for char in term
+        )
+        terms.append(f"({escaped}^2 OR {escaped}*)")
+    return " AND ".join(terms)
+
+
+class Neo4jGraphRepository(GraphRepository):
+    # 도메인 query 모듈의 Cypher 를 요청의 세션으로 실행하고 결과를 순수 파이썬 값으로 바꾼다
+
+    def __init__(self, session):
+        self.session = session
+
+    async def _single(self, query: str, **params):
+        result = await self.session.run(query, **params)
+        return await result.single()
+
+    async def record_verification_code(self, email: str, verification_info: str) -> Optional[str]:
+        record = await self._single(
+            SEND_VERIFICATION_CODE_QUERY, email=email, verification_info=verification_info
+        )
+        return record["message"] if record else None
+
+    async def verify_code(self, email: str, verify_code: str, now: str) -> bool:
+        record = await self._single(
+            VERIFY_CODE_QUERY, email=email, now=now, verify_code=verify_code
+        )
+        return record is not None
+
+    async def signup(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+    ) -> bool:
+        record = await self._single(
+            SIGNUP_QUERY,
+            email=email,
+            password=password,
+            username=username,
+            nickname=nickname,
+            tags=tags,
+            private_node_id=private_node_id,
+            user_node_id=user_node_id,
+        )
+        return record is not None
+
+    async def get_private_data(self, email: str) -> Optional[dict]:
+        record = await self._single(GET_PRIVATE_DATA_BY_EMAIL_QUERY, email=email)
+        return dict(record["p"]) if record else None
+
+    async def dummy_create(
+        self,
+        email: str,
+        password: str,
+        username: str,
+        nickname: str,
+        tags: List[str],
+        private_node_id: str,
+        user_node_id: str,
+        profile_image_url: str,
+    ):
+        await self._single(
+            DUMMY_CREATE_QUERY,
+            email=email,
+            password=password,
+            username=username,
+            nickname=nickname,
+            tags=tags,
+            private_node_id=private_node_id,
+            user_node_id=user_node_id,
+            profile_image_url=profile_image_url,
+        )
+
+    async def get_credentials(self, email: str) -> Optional[dict]:
+        record = await self._single(SIGNIN_QUERY, email=email)
+        return dict(record) if record else None
+
+    async def reset_password(self, email: str, password: str) -> Optional[str]:
+        record = await self._single(PW_RESET_QUERY, email=email, password=password)
+        return record["email"] if record else None
+
+    async def get_password(self, user_node_id: str) -> Optional[str]:
+        record = await self._single(GET_PASSWORD_QUERY, user_node_id=user_node_id)
+        return record["password"] if record else None
+
+    async def change_password(self, user_node_id: str, password: str) -> Optional[str]:
+        record = await self._single(
+            CHANGE_PASSWORD_QUERY, user_node_id=user_node_id, password=password
+        )
+        return record["message"] if record else None
+
+    async def delete_account(self, user_node_id: str) -> Optional[str]:
+        record = await self._single(SIGNOUT_QUERY, user_node_id=user_node_id)
+        return record["message"] if record else None
+
+    async def is_admin(self, user_node_id: str) -> bool:
+        record = await self._single(ADMIN_CHECK_QUERY, admin_node_id=user_node_id)
+        return record is not None
+
+    async def delete_user(self, user_node_id: str) -> int:
+        record = await self._single(ADMIN_DELETE_USER_QUERY, user_node_id=user_node_id)
+        return record["deleted_count"]
+
+    async def get_user(self, user_node_id: str) -> Optional[dict]:
+        record = await self._single(MY_INFO_QUERY, user_node_id=user_node_id)
+        return dict(record["user"]) if record else None
+
+    async def set_profile_image(self, user_node_id: str, profile_image_url: str) -> bool:
+        record = await self._single(
+            COMMIT_PROFILE_IMAGE_QUERY,
+            user_node_id=user_node_id,
+            profile_image_url=profile_image_url,
+        )
+        return record is not None
+
+    async def update_user(self, user_node_id: str, properties: dict) -> Optional[dict]:
+        record = await self._single(
+            MY_INFO_CHANGE_QUERY, user_node_id=user_node_id, update_data=properties
+        )
+        return dict(record["u"]) if record else None
+
+    async def search_users(
+        self, user_node_id: str, query: str, cursor: Optional[Tuple[float, str]], limit: int
+    ) -> List[dict]:
+        cursor_score, cursor_node_id = cursor or (None, None)
+        result = await self.session.run(
+            SEARCH_GET_MEMBERS_QUERY,
+            user_node_id=user_node_id,
+            search_query=_fulltext_query(query),
+            cursor_score=cursor_score,
+            cursor_node_id=cursor_node_id,
+            limit=limit,
+        )
+        return await result.data()
+
+    async def search_users_contains(
+        self, user_node_id: str, keyword: str, cursor_node_id: Optional[str], limit: int
+    ) -> List[dict]:
+        result = await self.session.run(
+            SEARCH_GET_MEMBERS_CONTAINS_QUERY,
+            user_node_id=user_node_id,
+            keyword=keyword,
+            cursor_node_id=cursor_node_id,
+            limit=limit,
+        )
+        return await result.data()
+
+    async def create_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str], created_at: str
+    ):
+        result = await self.session.run(
+            CREATE_PENDING_UPLOADS_QUERY,
+            keys=s3_keys,
+            user_node_id=user_node_id,
+            created_at=created_at,
+        )
+        await result.consume()
+
+    async def claim_pending_uploads(
+        self, user_node_id: str, s3_keys: List[str]
+    ) -> List[str]:
+        result = await self.session.run(
+            CLAIM_PENDING_UPLOADS_QUERY, keys=s3_keys, user_node_id=user_node_id
+        )
+        return [record["key"] for record in await result.data()]
+
+    async def delete_pending_uploads(self, s3_keys: List[str]):
+        result = await self.session.run(DELETE_PENDING_UPLOADS_QUERY, keys=s3_keys)
+        await result.consume()
+
+    async def list_abandoned_uploads(self, created_before: str, limit: int) -> List[str]:
+        result = await self.session.run(
+            GET_ABANDONED_UPLOADS_QUERY, created_before=created_before, batch_size=limit
+        )
+        return [record["key"] for record in await result.data()]
+
+    async def feed_audience(self, user_node_ids: List[str]) -> List[str]:
+        record = await self._single(GET_FEED_AUDIENCE_QUERY, user_node_ids=user_node_ids)
+        return record["audience"] if record else []
+
+    async def get_members(self, user_node_id: str) -> List[dict]:
+        result = await self.session.run(GET_MEMBERS_QUERY, user_node_id=user_node_id)
+        return await result.data()
+
+    async def get_member(self, user_node_id: str, friend_node_id: str) -> dict:
+        record = await self._single(
+            GET_MEMBER_QUERY, user_node_id=user_node_id, friend_node_id=friend_node_id
+        )
+        return {
+            "message": record["message"],
+            "friend": dict(record["friend"]) if record["friend"] else None,
+            "roommate_edge": dict(record["roommate_edge"]),
+            "stickers": [dict(sticker) for sticker in record["stickers"]],
+            "posts": [dict(post) for post in record["posts"]],
+        }
+
+    async def get_member_properties(
+        self, user_node_id: str, pure_neighbor_ids: List[str]
+    ) -> Optional[dict]:
+        record = await self._single(
+            GET_MEMBERS_PROPERTIES_QUERY,
+            user_node_id=user_node_id,
+            pure_neighbor_ids=pure_neighbor_ids,
+        )
+        return dict(record) if record else None
+
+    async def clear_new_roommate_flags(self, user_node_id: str):
+        result = await self.session.run(
+            CLEAR_NEW_ROOMMATE_FLAGS_QUERY, user_node_id=user_node_id
+        )
+        await result.consume()
+
+    async def delete_roommate(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        record = await self._single(
+            DELETE_MEMBER_QUERY, user_node_id=user_node_id, friend_node_id=friend_node_id
+        )
+        return record["message"] if record else None
+
+    async def get_memo(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        record = await self._single(
+            GET_MEMO_QUERY, user_node_id=user_node_id, friend_node_id=friend_node_id
+        )
+        return record["memo"] if record else None
+
+    async def modify_memo(self, user_node_id: str, friend_node_id: str, memo: str) -> bool:
+        record = await self._single(
+            MODIFY_MEMO_QUERY,
+            user_node_id=user_node_id,
+            friend_node_id=friend_node_id,
+            new_memo=memo,
+        )
+        return record is not None
+
+    async def get_groups(self, user_node_id: str) -> List[dict]:
+        result = await self.session.run(
+            GET_GROUPS_NAME_AND_NUMBER_QUERY, user_node_id=user_node_id
+        )
+        return await result.data()
+
+    async def modify_group(self, user_node_id: str, friend_node_id: str, group: str) -> bool:
+        record = await self._single(
+            MODIFY_GROUP_QUERY,
+            user_node_id=user_node_id,
+            friend_node_id=friend_node_id,
+            new_group=group,
+        )
+        return record is not None
+
+    async def send_knock(
+        self,
+        from_user_node_id: str,
+        to_user_node_id: str,
+        knock_edge_id: str,
+        group: str,
+        created_at: str,
+    ) -> Optional[str]:
+        record = await self._single(
+            SEND_KNOCK_QUERY,
+            from_user_node_id=from_user_node_id,
+            to_user_node_id=to_user_node_id,
+            knock_edge_id=knock_edge_id,
+            group=group,
+            created_at=created_at,
+        )
+        return record["message"] if record else None
+
+    async def list_knocks(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> List[dict]:
+        if limit is None:
+            result = await self.session.run(GET_KNOCKS_QUERY, user_node_id=user_node_id)
+        else:
+            created_at, edge_id = cursor or (None, None)
+            result = await self.session.run(
+                GET_KNOCKS_PAGE_QUERY,
+                user_node_id=user_node_id,
+                cursor_created_at=created_at,
+                cursor_edge_id=edge_id,
+                limit=limit,
+            )
+        return await result.data()
+
+    async def reject_knock(self, user_node_id: str, knock_edge_id: str) -> Optional[str]:
+        record = await self._single(
+            REJECT_KNOCK_QUERY, user_node_id=user_node_id, knock_id=knock_edge_id
+        )
+        return record["message"] if record else None
+
+    async def accept_knock(
+        self, user_node_id: str, knock_edge_id: str, group: str
+    ) -> Optional[dict]:
+        record = await self._single(
+            ACCEPT_KNOCK_QUERY,
+            user_node_id=user_node_id,
+            knock_id=knock_edge_id,
+            group=group,
+        )
+        if not record:
+            return None
+        return {
+            "new_roommate": dict(record["new_roommate"]),
+            "new_neighbors": [dict(neighbor) for neighbor in record["new_neighbors"]],
+        }
+
+    async def create_knock_link(self, user_node_id: str, link_info: str) -> bool:
+        record = await self._single(
+            CREATE_KNOCK_LINK_QUERY, user_node_id=user_node_id, link_info=link_info
+        )
+        return record is not None
+
+    async def accept_knock_by_link(
+        self, user_node_id: str, knock_id: str, now: str
+    ) -> Optional[dict]:
+        record = await self._single(
+            ACCEPT_KNOCK_BY_LINK_QUERY, user_node_id=user_node_id, knock_id=knock_id, now=now
+        )
+        return dict(record) if record else None
+
+    async def _list_contents(
+        self, query: str, page_query: str, key: str, limit, cursor, **params
+    ):
+        if limit is None:
+            record = await self._single(query, **params)
+        else:
+            record = await self._single(
+                page_query, limit=limit, **_cursor_params(cursor), **params
+            )
+        if not record:
+            return None, None
+        message = record["message"] if "message" in record.keys() else None
+        return message, [dict(node) for node in record[key]]
+
+    async def create_sticker(
+        self, user_node_id: str, content: str, image_url: List[str], created_at: str
+    ) -> Optional[str]:
+        record = await self._single(
+            CREATE_STICKER_QUERY,
+            user_node_id=user_node_id,
+            content=content,
+            image_url=image_url,
+            created_at=created_at,
+        )
+        return record["sticker_node_id"] if record else None
+
+    async def read_sticker(self, user_node_id: str, sticker_node_id: str) -> bool:
+        record = await self._single(
+            READ_STICKER_QUERY, user_node_id=user_node_id, sticker_node_id=sticker_node_id
+        )
+        return record is not None
+
+    async def delete_sticker(
+        self, user_node_id: str, sticker_node_id: str, deleted_at: str
+    ) -> Tuple[str, List[str]]:
+        record = await self._single(
+            DELETE_STICKER_QUERY,
+            user_node_id=user_node_id,
+            sticker_node_id=sticker_node_id,
+            deleted_at=deleted_at,
+        )
+        return record["message"], record["image_url"]
+
+    async def list_stickers(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        return await self._list_contents(
+            GET_STICKERS_QUERY,
+            GET_STICKERS_PAGE_QUERY,
+            "stickers",
+            limit,
+            cursor,
+            user_node_id=user_node_id,
+            friend_node_id=friend_node_id,
+        )
+
+    async def list_my_stickers(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        _, stickers = await self._list_contents(
+            GET_MY_STICKERS_QUERY,
+            GET_MY_STICKERS_PAGE_QUERY,
+            "stickers",
+            limit,
+            cursor,
+            user_node_id=user_node_id,
+        )
+        return stickers
+
+    async def create_post(
+        self,
+        user_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tags: List[str],
+        created_at: str,
+    ) -> bool:
+        record = await self._single(
+            CREATE_POST_QUERY,
+            user_node_id=user_node_id,
+            content=content,
+            image_url=image_url,
+            is_public=is_public,
+            title=title,
+            tags=tags,
+            created_at=created_at,
+        )
+        return record is not None
+
+    async def modify_post(
+        self,
+        user_node_id: str,
+        post_node_id: str,
+        content: str,
+        image_url: List[str],
+        is_public: bool,
+        title: str,
+        tag: List[str],
+    ) -> Union[str, dict]:
+        record = await self._single(
+            MODIFY_MY_POST_QUERY,
+            user_node_id=user_node_id,
+            post_node_id=post_node_id,
+            new_content=content,
+            new_image_url=image_url,
+            new_is_public=is_public,
+            new_title=title,
+            new_tag=tag,
+        )
+        # 쿼리는 실패하면 이유 문자열을, 성공하면 게시글 노드를 result 로 돌려준다
+        result = record["result"]
+        return result if isinstance(result, str) else dict(result)
+
+    async def delete_post(self, user_node_id: str, post_node_id: str) -> Tuple[str, List[str]]:
+        record = await self._single(
+            DELETE_MY_POST_QUERY, user_node_id=user_node_id, post_node_id=post_node_id
+        )
+        return record["message"], record["image_url"]
+
+    async def list_posts(
+        self,
+        user_node_id: str,
+        friend_node_id: str,
+        limit: Optional[int] = None,
+        cursor: Cursor = None,
+    ) -> Tuple[str, List[dict]]:
+        return await self._list_contents(
+            GET_POSTS_QUERY,
+            GET_POSTS_PAGE_QUERY,
+            "posts",
+            limit,
+            cursor,
+            user_node_id=user_node_id,
+            friend_node_id=friend_node_id,
+        )
+
+    async def list_my_posts(
+        self, user_node_id: str, limit: Optional[int] = None, cursor: Cursor = None
+    ) -> Optional[List[dict]]:
+        _, posts = await self._list_contents(
+            GET_MY_POSTS_QUERY,
+            GET_MY_POSTS_PAGE_QUERY,
+            "posts",
+            limit,
+            cursor,
+            user_node_id=user_node_id,
+        )
+        return posts
+
+    async def get_contents(self, user_node_id: str) -> Optional[dict]:
+        record = await self._single(GET_CONTENTS_QUERY, user_node_id=user_node_id)
+        if not record:
+            return None
+        # get-contents 쿼리는 읽기 전용으로 두고, 새로 받은 cast 표시는 있을 때만 따로 지운다
+        if record["new_cast_edge_ids"]:
+            result = await self.session.run(
+                CLEAR_NEW_CAST_FLAGS_QUERY,
+                user_node_id=user_node_id,
+                edge_ids=record["new_cast_edge_ids"],
+            )
+            await result.consume()
+        return {
+            "casts": record["casts"],
+            "stickered_roommates": record["stickered_roommates"],
+            "stickered_neighbors": record["stickered_neighbors"],
+        }
+
+    async def get_new_contents(self, user_node_id: str) -> Optional[dict]:
+        record = await self._single(GET_NEW_CONTENTS_QUERY, user_node_id=user_node_id)
+        if not record:
+            return None
+        # 돌려준 항목이 있을 때만 new 표시를 지운다. 비어 있는 long-polling 재조회는 쓰기 없이 끝난다
+        if (
+            record["new_roommate_node_ids"]
+            or record["new_cast_node_ids"]
+            or record["new_sticker_node_ids"]
+        ):
+            result = await self.session.run(
+                CLEAR_NEW_CONTENT_FLAGS_QUERY,
+                user_node_id=user_node_id,
+                roommate_node_ids=record["new_roommate_node_ids"],
+                cast_node_ids=record["new_cast_node_ids"],
+                sticker_node_ids=record["new_sticker_node_ids"],
+            )
+            await result.consume()
+        return {
+            "new_roommates": record["new_roommates"],
+            "casts_received": record["casts_received"],
+            "stickers_from": record["stickers_from"],
+        }
+
+    async def get_alerts(self, user_node_id: str) -> Optional[dict]:
+        record = await self._single(GET_ALERTS_QUERY, user_node_id=user_node_id)
+        if not record:
+            return None
+        return {"new_roommates": [dict(user) for user in record["new_roommates"]]}
+
+    async def list_neighbors_with_stickers(
+        self, user_node_id: str, roommate_node_id: str
+    ) -> List[dict]:
+        result = await self.session.run(
+            GET_NEIGHBORS_WITH_STICKERS_QUERY,
+            user_node_id=user_node_id,
+            roommate_node_id=roommate_node_id,
+        )
+        return await result.data()
+
+    async def list_neighbor_stickers(
+        self, user_node_id: str, neighbor_node_ids: List[str]
+    ) -> List[dict]:
+        result = await self.session.run(
+            GET_NEIGHBOR_STICKERS_QUERY,
+            user_node_id=user_node_id,
+            neighbor_node_ids=neighbor_node_ids,
+        )
+        return await result.data()
+
+    async def create_cast(
+        self,
+        user_node_id: str,
+        message: str,
+        duration: int,
+        friends: List[str],
+        created_at: str,
+    ) -> Optional[List[str]]:
+        record = await self._single(
+            CREATE_CAST_QUERY,
+            user_node_id=user_node_id,
+            message=message,
+            created_at=created_at,
+            duration=duration,
+            friends=friends,
+        )
+        return record["receivers"] if record else None
+
+    async def reply_cast(self, user_node_id: str, cast_node_id: str, message: str) -> bool:
+        record = await self._single(
+            REPLY_CAST_QUERY,
+            user_node_id=user_node_id,
+            cast_node_id=cast_node_id,
+            message=message,
+        )
+        return record is not None
+
+    async def block(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        record = await self._single(
+            BLOCK_FRIEND_QUERY, user_node_id=user_node_id, friend_node_id=friend_node_id
+        )
+        return record["message"] if record else None
+
+    async def list_blocked(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        result = await self.session.run(GET_BLOCKED_QUERY, user_node_id=user_node_id)
+        records = await result.data()
+        return [(record["b.edge_id"], record["blocked_user"]) for record in records]
+
+    async def unblock(self, user_node_id: str, block_edge_id: str) -> Optional[str]:
+        record = await self._single(
+            POP_BLOCKED_QUERY, user_node_id=user_node_id, block_edge_id=block_edge_id
+        )
+        return record["to_user_node_id"] if record else None
+
+    async def mute(self, user_node_id: str, friend_node_id: str) -> Optional[str]:
+        record = await self._single(
+            MUTE_FRIEND_QUERY, user_node_id=user_node_id, friend_node_id=friend_node_id
+        )
+        return record["message"] if record else None
+
+    async def list_muted(self, user_node_id: str) -> List[Tuple[str, dict]]:
+        result = await self.session.run(GET_MUTED_QUERY, user_node_id=user_node_id)
+        records = await result.data()
+        return [(record["m.edge_id"], record["muted_user"]) for record in records]
+
+    async def unmute(self, user_node_id: str, mute_edge_id: str) -> Optional[str]:
+        record = await self._single(
+            POP_MUTED_QUERY, user_node_id=user_node_id, mute_edge_id=mute_edge_id
+        )
+        return record["to_user_node_id"] if record else None
@@ -1,4 +1,10 @@
-from .bcrypt import verify_password, hash_password
+from .bcrypt import (
+    verify_password,
+    hash_password,
+    verify_password_async,
+    hash_password_async,
+    bcrypt_pool_stats,
+)
 from .jwt_utils import (
     create_access_token,
     verify_access_token,
@@ -7,11 +13,16 @@ from .jwt_utils import (
 )
 from .logger import Logger
 from .send_email import send_email
-from .event_dispatcher import dispatcher
+from .event_dispatcher import dispatcher, hub
+from .cache import feed_cache
+from .current_user import current_user
 
 __all__ = [
     "verify_password",
     "hash_password",
+    "verify_password_async",
+    "hash_password_async",
+    "bcrypt_pool_stats",
     "create_access_token",
     "verify_access_token",
     "verify_refresh_token",
@@ -19,4 +30,7 @@ __all__ = [
     "Logger",
     "send_email",
     "dispatcher",
+    "hub",
+    "feed_cache",
+    "current_user",
 ]
@@ -1,4 +1,18 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
+from fastapi import HTTPException
+
+# bcrypt 는 해싱 중에 GIL 을 놓기 때문에 스레드 풀만으로도 이벤트 루프를 막지 않고 병렬 처리된다.
+# 풀 크기 + 대기열 한도를 넘는 요청은 429 로 바로 돌려보낸다.
+BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", os.cpu_count() or 2))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", BCRYPT_POOL_SIZE * 8))
+
+_executor = ThreadPoolExecutor(
+    max_workers=BCRYPT_POOL_SIZE, thread_name_prefix="bcrypt"
+)
+_stats = {"in_flight": 0, "max_in_flight": 0, "completed": 0, "rejected": 0}
 
 
 def hash_password(password: str) -> str:
@@ -11,3 +25,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
         plain_password.encode("utf-8"), hashed_password.encode("utf-8")
     )
+
+
+def bcrypt_pool_stats() -> dict:
+    return {
+        "pool_size": BCRYPT_POOL_SIZE,
+        "max_queue": BCRYPT_MAX_QUEUE,
+        "queue_depth": max(0, _stats["in_flight"] - BCRYPT_POOL_SIZE),
+        **_stats,
+    }
+
+
+async def _run_in_pool(func, *args):
+    # 카운터는 이벤트 루프 스레드에서만 바뀌므로 별도 락이 필요 없다
+    if _stats["in_flight"] >= BCRYPT_POOL_SIZE + BCRYPT_MAX_QUEUE:
+        _stats["rejected"] += 1
+        raise HTTPException(
+            status_code=429,
+            detail="too many requests, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+    _stats["in_flight"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
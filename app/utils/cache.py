@@ -0,0 +1,244 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+from .logger import Logger
+
+logger = Logger(__file__)
+
+
+class CacheBackend(ABC):
+    # 저장소 인터페이스. 여러 워커가 같이 쓰는 저장소(Redis 등)를 붙이려면 이 네 메서드를 구현하면 된다.
+    # 값은 JSON 으로 직렬화 가능한 dict/list 나 이미 직렬화한 JSON bytes 만 넣는다.
+    # set() 의 started_at 은 값을 만들기 시작한 시각(time.time())이다. 공유 저장소는 그 뒤에 무효화된 키를 저장하지 않아야 한다.
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float, started_at: float):
+        ...
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+
+class InMemoryLRUBackend(CacheBackend):
+    # 프로세스 안에서만 유효한 LRU. 다른 워커에서 일어난 무효화는 TTL 이 지나야 반영된다.
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float, started_at: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def delete_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    # 같은 호스트의 워커들이 같이 쓰는 캐시. 한 워커에서 지운 키는 다른 워커에서도 바로 사라진다.
+    # 지운 키는 invalidated_at 만 남겨 두고, 그보다 먼저 만들기 시작한 값은 set() 에서 버린다.
+    # 조회 경로에서 쓰므로 스레드마다 연결을 하나씩 열어 두고 다시 쓴다.
+    _PRUNE_EVERY = 1000
+    # 이보다 오래 걸린 조회는 없다고 보고 오래된 무효화 기록을 지운다
+    _INVALIDATION_RETENTION = 3600
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        self._sets = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value,
+                    expires_at REAL NOT NULL,
+                    invalidated_at REAL NOT NULL DEFAULT 0
+                );
+                CREATE TABLE IF NOT EXISTS cleared (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    cleared_at REAL NOT NULL
+                );
+                INSERT OR IGNORE INTO cleared (id, cleared_at) VALUES (0, 0);
+                """
+            )
+            self._local.connection = connection
+        return connection
+
+    def _get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ? AND value IS NOT NULL",
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        value = row[0]
+        # bytes 는 그대로, dict/list 는 JSON 문자열로 저장되어 있다
+        return value if isinstance(value, bytes) else json.loads(value)
+
+    def _set(self, key: str, value: Any, ttl: float, started_at: float):
+        stored = value if isinstance(value, bytes) else json.dumps(value)
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT INTO entries (key, value, expires_at) "
+                "SELECT ?, ?, ? FROM cleared WHERE cleared_at < ? "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+                "WHERE entries.invalidated_at < ?",
+                (key, stored, now + ttl, started_at, started_at),
+            )
+            self._sets += 1
+            if self._sets % self._PRUNE_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM entries WHERE expires_at <= ? AND invalidated_at < ?",
+                    (now, now - self._INVALIDATION_RETENTION),
+                )
+
+    def _delete_many(self, keys: Iterable[str]):
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO entries (key, value, expires_at, invalidated_at) VALUES (?, NULL, 0, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = NULL, expires_at = 0, "
+                "invalidated_at = excluded.invalidated_at",
+                [(key, now) for key in keys],
+            )
+
+    def _clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE cleared SET cleared_at = ?", (time.time(),))
+            connection.execute("DELETE FROM entries")
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float, started_at: float):
+        await asyncio.to_thread(self._set, key, value, ttl, started_at)
+
+    async def delete_many(self, keys: Iterable[str]):
+        await asyncio.to_thread(self._delete_many, list(keys))
+
+    async def clear(self):
+        await asyncio.to_thread(self._clear)
+
+
+class TTLCache:
+    # 조회가 진행되는 동안 무효화가 일어나면 그 조회 결과는 저장하지 않는다.
+    # begin() 으로 받은 토큰보다 나중에 무효화된 키는 set() 에서 버린다.
+    _MAX_TRACKED_INVALIDATIONS = 100_000
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "stale_sets": 0}
+        self._epoch = 0
+        self._floor = 0
+        self._invalidated_at = {}
+
+    def begin(self) -> Tuple[int, float]:
+        # 이 프로세스의 무효화 순번과, 공유 저장소가 비교할 시작 시각
+        return self._epoch, time.time()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Any, token: Tuple[int, float]):
+        epoch, started_at = token
+        if epoch < self._floor or self._invalidated_at.get(key, -1) > epoch:
+            self.stats["stale_sets"] += 1
+            return
+        await self.backend.set(key, value, self.ttl, started_at)
+
+    async def invalidate(self, keys: Iterable[str]):
+        keys = list(keys)
+        self._epoch += 1
+        if len(self._invalidated_at) + len(keys) > self._MAX_TRACKED_INVALIDATIONS:
+            # 기록이 너무 많아지면 비우고, 그 전에 시작한 조회는 모두 저장하지 않는다
+            self._invalidated_at.clear()
+            self._floor = self._epoch
+        for key in keys:
+            self._invalidated_at[key] = self._epoch
+        self.stats["invalidations"] += len(keys)
+        await self.backend.delete_many(keys)
+
+    async def clear(self):
+        self._epoch += 1
+        self._invalidated_at.clear()
+        self._floor = self._epoch
+        await self.backend.clear()
+
+
+# /content/get-contents 응답 캐시. 키는 user_node_id, 값은 GetContentsResponse 를 직렬화한 JSON bytes
+# FEED_CACHE_BACKEND
+#   memory: 워커마다 따로 갖는 LRU. 다른 워커에서 일어난 쓰기는 최대 FEED_CACHE_TTL 초 뒤에 보인다. 워커가 하나일 때 쓴다.
+#   sqlite: FEED_CACHE_PATH 파일을 같은 호스트의 워커가 같이 쓴다. 무효화가 모든 워커에 바로 반영된다.
+# 호스트가 여러 대면 memory/sqlite 모두 호스트 사이에서는 TTL 만큼 늦다.
+FEED_CACHE_BACKEND = os.getenv("FEED_CACHE_BACKEND", "memory")
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", 60))
+FEED_CACHE_MAX_SIZE = int(os.getenv("FEED_CACHE_MAX_SIZE", 10000))
+FEED_CACHE_PATH = os.getenv("FEED_CACHE_PATH", "feed_cache.sqlite3")
+
+
+def _feed_cache_backend() -> CacheBackend:
+    if FEED_CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(FEED_CACHE_PATH)
+    # uvicorn --workers 는 WEB_CONCURRENCY 로도 설정된다
+    if int(os.getenv("WEB_CONCURRENCY", 1)) > 1:
+        logger.warning(
+            f"FEED_CACHE_BACKEND=memory with several workers: "
+            f"other workers' writes show up after FEED_CACHE_TTL={FEED_CACHE_TTL}s"
+        )
+    return InMemoryLRUBackend(FEED_CACHE_MAX_SIZE)
+
+
+feed_cache = TTLCache("feed", _feed_cache_backend(), FEED_CACHE_TTL)
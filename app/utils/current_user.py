@@ -0,0 +1,49 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, Request
+from .jwt_utils import verify_access_token
+
+ACCESS_TOKEN = "access_token"
+
+# 한 번 검증한 access token 은 exp 까지 캐시해서 요청마다 JWT 를 다시 디코딩하지 않는다.
+# 토큰 원문 대신 sha256 을 키로 써서 메모리에 토큰이 그대로 남지 않게 한다.
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+
+_verified_tokens = OrderedDict()
+token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+def verify_access_token_cached(token: str) -> dict:
+    key = _token_key(token)
+    entry = _verified_tokens.get(key)
+    if entry is not None:
+        exp, payload = entry
+        if exp > time.time():
+            _verified_tokens.move_to_end(key)
+            token_cache_stats["hits"] += 1
+            return payload
+        del _verified_tokens[key]
+
+    token_cache_stats["misses"] += 1
+    payload = verify_access_token(token)
+    _verified_tokens[key] = (payload["exp"], payload)
+    while len(_verified_tokens) > TOKEN_CACHE_MAX_SIZE:
+        _verified_tokens.popitem(last=False)
+    return payload
+
+
+def evict_access_token(token: str):
+    _verified_tokens.pop(_token_key(token), None)
+
+
+async def current_user(request: Request) -> str:
+    token = request.cookies.get(ACCESS_TOKEN)
+    if not token:
+        raise HTTPException(status_code=401, detail="Access token is missing")
+    return verify_access_token_cached(token)["user_node_id"]
@@ -0,0 +1,29 @@
+import re
+from functools import lru_cache
+
+READ = "read"
+WRITE = "write"
+# 명시적 트랜잭션(execute_read/execute_write) 안에서 돌릴 수 없어서 auto-commit 으로 실행해야 하는 쿼리
+AUTO_COMMIT = "auto_commit"
+
+# apoc.do.* 는 안쪽 쿼리를 문자열로 받아서 쓰기를 하므로 같이 쓰기로 본다
+_WRITE_CLAUSE = re.compile(
+    r"\b(CREATE|MERGE|SET|DELETE|REMOVE|FOREACH)\b"
+    r"|\bapoc\.(do|create|merge|refactor|periodic|nodes\.delete)\.?",
+    re.IGNORECASE,
+)
+_AUTO_COMMIT = re.compile(
+    r"^\s*(EXPLAIN|PROFILE|SHOW|CREATE\s+(INDEX|CONSTRAINT|FULLTEXT|RANGE|TEXT|POINT|LOOKUP)"
+    r"|DROP\s+(INDEX|CONSTRAINT))|\bIN\s+TRANSACTIONS\b|\bUSING\s+PERIODIC\s+COMMIT\b",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=4096)
+def query_access_mode(query: str) -> str:
+    # 쿼리 상수는 몇 개 안 되므로 문자열별 결과를 캐시한다
+    if _AUTO_COMMIT.search(query):
+        return AUTO_COMMIT
+    if _WRITE_CLAUSE.search(query):
+        return WRITE
+    return READ
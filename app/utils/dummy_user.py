@@ -1,11 +1,14 @@
 from domain.auth.request.signup_request import SignUpRequest
 
+# 더미 사용자가 같이 쓰는 비밀번호 해시
+DUMMY_PASSWORD_HASH = "$2b$12$K4kuDTzku5n.xyXYd45lUODLIZH5FGHY7upzFAGie20nQkG8iTibS"
+
 
 def create_dummy_user(number_of_nodes: int):
     dummy_users = [
         SignUpRequest(
             email=f"test{i}@gooroom.com",
-            password="$2b$12$K4kuDTzku5n.xyXYd45lUODLIZH5FGHY7upzFAGie20nQkG8iTibS",
+            password=DUMMY_PASSWORD_HASH,
             tags=["string"],
             groups=["string"],
             nickname=f"nickname{i}",
@@ -1,7 +1,20 @@
+import asyncio
+import os
+from contextlib import contextmanager
+from .logger import Logger
+from .hub_channel import HubChannel, HUB_CHANNEL_DIR
+
+logger = Logger(__file__)
+# 다른 워커에서 일어난 쓰기는 hub channel 로 전달되므로 기본으로는 다시 조회하지 않는다(0).
+# 워커가 여러 호스트에 있어서 channel 이 닿지 않을 때만 켜는 fallback 이다. 켜면 대기자마다 이 간격으로 DB 를 다시 읽으므로 10초 이상으로 둔다
+LONG_POLLING_RECHECK_SECONDS = float(os.getenv("LONG_POLLING_RECHECK_SECONDS", 0))
+
+
 class EventDispatcher:
     NEW_ROOMMATE_CREATED = "new_roommate_created"
     NEW_STICKER_CREATED = "new_sticker_created"
     NEW_CAST_CREATED = "new_cast_created"
+    STICKER_FANOUT_REQUESTED = "sticker_fanout_requested"
 
     def __init__(self):
         self._listeners = {}
@@ -10,13 +23,88 @@ class EventDispatcher:
         if event_type not in self._listeners:
             self._listeners[event_type] = []
         self._listeners[event_type].append(listener)
-        print(f"{listener} subscribes {event_type}")
+        logger.debug("%s subscribes %s", listener, event_type)
 
     def dispatch(self, event_type: str, *args, **kwargs):
-        print("event type : ", event_type)
-        print(self._listeners)
+        logger.debug("dispatch %s", event_type)
         if event_type in self._listeners:
             for listener in self._listeners[event_type]:
                 listener(*args, **kwargs)
 
-dispatcher = EventDispatcher()
\ No newline at end of file
+
+class EventHub:
+    # user_node_id 별로 대기 중인 long-polling 요청을 깨워주는 pub/sub 허브.
+    # notify() 는 이 워커의 대기자를 깨우고, channel 이 열려 있으면 같은 호스트의 다른 워커에도 보낸다.
+    # LONG_POLLING_RECHECK_SECONDS 를 켜면 poll() 이 그 간격으로도 다시 조회한다.
+
+    def __init__(self):
+        self._waiters = {}
+        self._channel = HubChannel(HUB_CHANNEL_DIR)
+
+    def open_channel(self):
+        # lifespan 에서 부른다. HUB_CHANNEL_DIR 가 비어 있으면 이 워커 안에서만 깨운다
+        if HUB_CHANNEL_DIR:
+            self._channel.open(self._wake)
+
+    def close_channel(self):
+        self._channel.close()
+
+    @contextmanager
+    def listen(self, user_node_id: str):
+        # 조회 전에 등록해야 조회와 대기 사이에 들어온 이벤트를 놓치지 않는다
+        event = asyncio.Event()
+        self._waiters.setdefault(user_node_id, set()).add(event)
+        try:
+            yield event
+        finally:
+            waiters = self._waiters.get(user_node_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[user_node_id]
+
+    async def poll(self, user_node_id: str, fetch, is_empty, timeout: float):
+        # 비어 있지 않은 응답이 나오거나 timeout 이 될 때까지 조회한다.
+        # 이벤트가 오면 바로 다시 조회하고, timeout 때도 한 번 더 조회해서 돌려준다
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        with self.listen(user_node_id) as new_event:
+            while True:
+                # 조회 전에 지워야 조회하는 동안 들어온 이벤트를 놓치지 않는다
+                new_event.clear()
+                response = await fetch(user_node_id)
+                remaining = deadline - loop.time()
+                if not is_empty(response) or remaining <= 0:
+                    return response
+                if LONG_POLLING_RECHECK_SECONDS > 0:
+                    remaining = min(remaining, LONG_POLLING_RECHECK_SECONDS)
+                try:
+                    await asyncio.wait_for(new_event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    def notify(self, user_node_ids):
+        user_node_ids = list(user_node_ids)
+        self._wake(user_node_ids)
+        self._channel.publish(user_node_ids)
+
+    def _wake(self, user_node_ids):
+        for user_node_id in user_node_ids:
+            for event in self._waiters.get(user_node_id, ()):
+                event.set()
+
+    def waiter_count(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+
+dispatcher = EventDispatcher()
+hub = EventHub()
+
+# 모든 이벤트는 dispatch(event_type, [깨울 user_node_id, ...]) 형태로 발행한다.
+# STICKER_FANOUT_REQUESTED 만 [sticker_node_id, ...] 를 넘기고 fan-out 워커가 구독한다.
+for event_type in (
+    EventDispatcher.NEW_ROOMMATE_CREATED,
+    EventDispatcher.NEW_STICKER_CREATED,
+    EventDispatcher.NEW_CAST_CREATED,
+):
+    dispatcher.subscribe(event_type, hub.notify)
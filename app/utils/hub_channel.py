@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from pathlib import Path
+from typing import Callable, List, Optional
+from .logger import Logger
+
+logger = Logger(__file__)
+
+# 같은 호스트의 워커끼리 long-polling 깨우기를 UNIX datagram 소켓으로 주고받는다.
+# 워커마다 HUB_CHANNEL_DIR 안에 소켓 파일을 하나 만들고, 깨울 user_node_id 목록을 다른 워커의 소켓으로 보낸다.
+# 받은 워커는 DB 를 다시 조회하지 않고 자기 대기자만 깨운다. 죽은 워커의 소켓 파일은 보낼 때 지운다.
+HUB_CHANNEL_DIR = os.getenv("HUB_CHANNEL_DIR", "hub_channel")
+# datagram 하나에 담는 user_node_id 수. UUID 1000 개가 약 40KB 라서 기본 소켓 버퍼 안에 들어간다
+HUB_CHANNEL_BATCH_SIZE = 1000
+_RECEIVE_BUFFER_BYTES = 256 * 1024
+
+
+class HubChannel:
+    def __init__(self, directory: str):
+        self._directory = Path(directory)
+        self._path: Optional[Path] = None
+        self._socket: Optional[socket.socket] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._socket is not None
+
+    def open(self, on_message: Callable[[List[str]], None]):
+        # 이벤트 루프 안에서 부른다. 받은 목록은 on_message 로 넘긴다
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._path = self._directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.bind(str(self._path))
+        asyncio.get_running_loop().add_reader(
+            self._socket.fileno(), self._receive, on_message
+        )
+        logger.info(f"hub channel 열림 - {self._path}")
+
+    def _receive(self, on_message: Callable[[List[str]], None]):
+        while True:
+            try:
+                data = self._socket.recv(_RECEIVE_BUFFER_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                on_message(json.loads(data))
+            except Exception as e:
+                logger.error(f"hub channel message dropped: {e}")
+
+    def publish(self, user_node_ids: List[str]):
+        if self._socket is None or not user_node_ids:
+            return
+        messages = [
+            json.dumps(user_node_ids[index : index + HUB_CHANNEL_BATCH_SIZE]).encode()
+            for index in range(0, len(user_node_ids), HUB_CHANNEL_BATCH_SIZE)
+        ]
+        for peer in self._directory.glob("*.sock"):
+            if peer == self._path:
+                continue
+            try:
+                for message in messages:
+                    self._socket.sendto(message, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 소켓 파일만 남기고 죽은 워커
+                peer.unlink(missing_ok=True)
+            except BlockingIOError:
+                # 받는 워커가 밀려 있다. 그 워커의 대기자는 timeout 때 다시 조회한다
+                logger.warning(f"hub channel peer busy, wakeup dropped: {peer.name}")
+
+    def close(self):
+        if self._socket is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        self._path.unlink(missing_ok=True)
+        logger.info("hub channel 닫힘")
@@ -0,0 +1,23 @@
+from typing import Any
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+# 앱 기본 응답 클래스는 ORJSONResponse 다 (main.py).
+# 핸들러가 Response 를 직접 돌려주면 FastAPI 는 response_model 로 다시 검증하고 직렬화하는 단계를 건너뛴다.
+# 응답 모델은 from_data 에서 한 번 검증하며 만들었으므로, 여기서는 pydantic-core 가 모델을 바로 JSON bytes 로 쓰기만 한다.
+# (model_construct 는 파이썬에서 필드를 하나씩 채워서 pydantic-core 의 검증보다 느리다)
+# response_model 은 OpenAPI 문서를 위해 데코레이터에 그대로 둔다.
+
+
+class JSONBytesResponse(Response):
+    media_type = "application/json"
+
+
+def model_response(content: Any, status_code: int = 200) -> Response:
+    # content 는 응답 모델, 응답 모델 목록, 또는 그것들을 담은 dict/list
+    return JSONBytesResponse(content=to_json(content), status_code=status_code)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    # 이미 직렬화해서 캐시해 둔 응답
+    return JSONBytesResponse(content=body, status_code=status_code)
@@ -16,7 +16,7 @@ logger = Logger(__file__)
 
 
 def create_access_token(user_node_id: str) -> str:
-    logger.info("create access token(func)")
+    logger.debug("create access token(func)")
     to_encode = {
         "user_node_id": user_node_id,
         "exp": int((datetime.now() + timedelta(hours=1)).timestamp()),
@@ -26,7 +26,7 @@ def create_access_token(user_node_id: str) -> str:
 
 
 def create_refresh_token(user_node_id: str) -> str:
-    logger.info("create refresh token(func)")
+    logger.debug("create refresh token(func)")
     to_encode = {
         "user_node_id": user_node_id,
         "exp": int((datetime.now() + timedelta(days=30)).timestamp()),
@@ -36,7 +36,6 @@ def create_refresh_token(user_node_id: str) -> str:
 
 def verify_access_token(token: str) -> dict:
     try:
-        logger.info("verify access token(func)")
         payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
         if payload.get("exp") < int(datetime.now().timestamp()):
             raise HTTPException(status_code=401, detail="token has expired")
@@ -48,7 +47,6 @@ def verify_access_token(token: str) -> dict:
 
 def verify_refresh_token(token: str) -> dict:
     try:
-        logger.info("verify refresh token(func)")
         payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
         if payload.get("exp") < int(datetime.now().timestamp()):
             raise HTTPException(status_code=401, detail="token has expired")
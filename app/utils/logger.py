@@ -1,7 +1,37 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from dotenv import load_dotenv
 from colorama import Fore
 
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+# 로그를 찍는 코루틴은 큐에 레코드를 넣기만 하고, 포맷과 출력은 프로세스당 하나뿐인 QueueListener 스레드가 한다.
+# 이벤트 루프가 stderr 쓰기를 기다리지 않는다.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json: 한 줄에 JSON 하나 (수집기용), text: 색을 입힌 사람용 출력 (로컬 개발용)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# neo4j 드라이버가 DEBUG 로 남기는 쿼리 로그를 같이 내보낼지. 기본은 끈다
+LOG_QUERIES = os.getenv("LOG_QUERIES", "false").lower() == "true"
+# 로거별 WARNING 미만 로그 샘플링 비율. 예: "domain.service.alert.alert=0.1,domain.service.content.content=0.5"
+LOG_SAMPLE_RATES = {
+    name.strip(): float(rate)
+    for name, rate in (
+        item.split("=", 1) for item in os.getenv("LOG_SAMPLE_RATES", "").split(",") if "=" in item
+    )
+}
+
+ROOT_LOGGER_NAME = "gooroom"
+_APP_DIR = Path(__file__).resolve().parent.parent
+
 COLORS = [
     Fore.LIGHTRED_EX,
     Fore.LIGHTGREEN_EX,
@@ -14,40 +44,134 @@ COLORS = [
 ]
 
 
-class Logger:
-    def __init__(self, name):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.INFO)
-        self.pid = os.getpid()
-        color = COLORS[self.pid % len(COLORS)]
-        formatter = logging.Formatter(
-            f"{color}[%(asctime)s] {self.pid} {Fore.GREEN}%(levelname)s {Fore.WHITE}%(name)s {Fore.YELLOW}%(message)s"
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        details = getattr(record, "details", None)
+        if details is not None:
+            entry["details"] = details
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        color = COLORS[os.getpid() % len(COLORS)]
+        super().__init__(
+            f"{color}[%(asctime)s] %(process)d {Fore.GREEN}%(levelname)s {Fore.WHITE}%(name)s {Fore.YELLOW}%(message)s"
         )
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(formatter)
-        self.logger.addHandler(stream_handler)
 
-    def log(self, level, msg, details=None):
-        self.logger.setLevel(level)
-        if details:
-            self.logger.log(level, f"{msg} | Details: {details}")
-        else:
-            self.logger.log(level, msg)
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        details = getattr(record, "details", None)
+        if details is not None:
+            line = f"{line} | Details: {details}"
+        return line
+
+
+class _PreparedQueueHandler(QueueHandler):
+    # 기본 QueueHandler 는 큐에 넣기 전에 호출한 쪽에서 포맷까지 한다.
+    # 여기서는 메시지 인자와 예외만 문자열로 바꿔 두고 포맷은 리스너 스레드에 맡긴다.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def _setup():
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    # 종료 시 큐에 남은 로그를 마저 쓴다
+    atexit.register(_listener.stop)
+
+    queue_handler = _PreparedQueueHandler(log_queue)
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+    root.propagate = False
+
+    neo4j_logger = logging.getLogger("neo4j")
+    if LOG_QUERIES:
+        neo4j_logger.setLevel(logging.DEBUG)
+        neo4j_logger.addHandler(queue_handler)
+        neo4j_logger.propagate = False
+    else:
+        neo4j_logger.setLevel(logging.WARNING)
+
+
+def _short_name(name: str) -> str:
+    # __file__ 경로를 app 기준 모듈 경로로 바꾼다. app/domain/user/user.py -> domain.user.user
+    path = Path(name)
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(_APP_DIR)
+        except ValueError:
+            path = Path(path.name)
+    return ".".join(path.with_suffix("").parts)
+
+
+class Logger:
+    def __init__(self, name, sample_rate: float = None):
+        _setup()
+        short_name = _short_name(name)
+        # 핸들러는 루트 로거 하나에만 붙어 있고 모듈 로거는 레벨만 물려받는다
+        self.logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.{short_name}")
+        if sample_rate is None:
+            sample_rate = LOG_SAMPLE_RATES.get(short_name, 1.0)
+        self.sample_rate = sample_rate
+
+    def log(self, level, msg, *args, details=None, exc_info=False):
+        # 꺼진 레벨이나 샘플링에서 빠진 로그는 레코드를 만들기 전에 버린다
+        if not self.logger.isEnabledFor(level):
+            return
+        if (
+            level < logging.WARNING
+            and self.sample_rate < 1.0
+            and random.random() >= self.sample_rate
+        ):
+            return
+        extra = {"details": details} if details is not None else None
+        self.logger.log(level, msg, *args, extra=extra, exc_info=exc_info)
+
+    def info(self, msg, *args, details=None):
+        self.log(logging.INFO, msg, *args, details=details)
 
-    def info(self, msg, details=None):
-        self.log(logging.INFO, msg, details)
+    def debug(self, msg, *args, details=None):
+        self.log(logging.DEBUG, msg, *args, details=details)
 
-    def debug(self, msg, details=None):
-        self.log(logging.DEBUG, msg, details)
+    def warning(self, msg, *args, details=None):
+        self.log(logging.WARNING, msg, *args, details=details)
 
-    def warning(self, msg, details=None):
-        self.log(logging.WARNING, msg, details)
+    def error(self, msg, *args, details=None, exc_info=False):
+        self.log(logging.ERROR, msg, *args, details=details, exc_info=exc_info)
 
-    def error(self, msg, details=None):
-        self.log(logging.ERROR, msg, details)
+    def critical(self, msg, *args, details=None, exc_info=False):
+        self.log(logging.CRITICAL, msg, *args, details=details, exc_info=exc_info)
 
-    def critical(self, msg, details=None):
-        self.log(logging.CRITICAL, msg, details)
+    def is_enabled_for(self, level) -> bool:
+        return self.logger.isEnabledFor(level)
 
     def get_logger(self):
         return self.logger
@@ -0,0 +1,370 @@
+import asyncio
+import json
+import os
+import smtplib
+import sqlite3
+import ssl
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.utils.logger import Logger
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+logger = Logger(__file__)
+
+# 메일은 요청 경로에서 보내지 않고 로컬 SQLite outbox 에 넣은 뒤 백그라운드 워커가 보낸다.
+# 워커는 로그인한 SMTP 연결 하나를 유지하면서 배치로 보내고, 일시적인 실패(4xx, 연결 끊김)는 지수 백오프로 재시도한다.
+# 영구적인 실패(5xx)나 재시도 한도를 넘은 메시지는 failed 로 남긴다.
+# outbox 에는 본문 대신 템플릿 이름과 비밀이 아닌 파라미터만 저장하고, 본문은 보낼 때마다 등록된 렌더러로 만든다.
+# 인증 코드는 렌더러가 DB 에서 읽고 임시 비밀번호는 nonce 와 서버 키로 다시 만들어서, 비밀 값이 SQLite 파일에 남지 않는다.
+# 보낸 뒤에 해야 하는 쓰기(임시 비밀번호 저장)는 on_sent 훅에서 한다. 훅이 실패하면 같은 메일을 다시 보내고 훅도 다시 부른다.
+# 로컬에서는 `python -m aiosmtpd -n -l localhost:1025` 를 띄우고 SMTP_HOST=localhost, SMTP_PORT=1025, SMTP_STARTTLS=false 로 쓴다.
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes")
+SMTP_USER = os.getenv("smtp_user")
+SMTP_PASSWORD = os.getenv("smtp_password")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+# 서버가 먼저 끊기 전에 놀고 있는 연결을 닫는다
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+
+MAIL_OUTBOX_PATH = os.getenv("MAIL_OUTBOX_PATH", "mail_outbox.sqlite3")
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 20))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 6))
+MAIL_BACKOFF_BASE = float(os.getenv("MAIL_BACKOFF_BASE", 2))
+MAIL_BACKOFF_MAX = float(os.getenv("MAIL_BACKOFF_MAX", 600))
+MAIL_POLL_INTERVAL = float(os.getenv("MAIL_POLL_INTERVAL", 5))
+# 보낸 메시지의 상태 기록을 남겨 두는 시간
+MAIL_RETENTION_SECONDS = float(os.getenv("MAIL_RETENTION_SECONDS", 7 * 24 * 3600))
+
+
+class PermanentMailError(Exception):
+    pass
+
+
+# (수신자, 파라미터) -> (제목, 본문). 다시 보내도 소용없는 경우 PermanentMailError 를 던진다
+MailRenderer = Callable[[str, dict], Awaitable[Tuple[str, str]]]
+# (수신자, 파라미터). SMTP 서버가 메일을 받은 뒤에 부른다
+MailSentHook = Callable[[str, dict], Awaitable[None]]
+
+
+class MailOutbox:
+    def __init__(self, path: str):
+        self._path = path
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._initialized = False
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_used_at = 0.0
+        self._renderers: Dict[str, MailRenderer] = {}
+        self._sent_hooks: Dict[str, MailSentHook] = {}
+
+    def register_template(
+        self, template: str, render: MailRenderer, on_sent: Optional[MailSentHook] = None
+    ):
+        # on_sent 가 있는 템플릿은 재시도할 때 같은 본문을 만들어야 한다
+        self._renderers[template] = render
+        if on_sent is not None:
+            self._sent_hooks[template] = on_sent
+
+    @contextmanager
+    def _connect(self):
+        # `with connection:` 은 커밋만 하고 닫지 않으므로 쓰고 나면 여기서 닫는다
+        connection = sqlite3.connect(self._path, timeout=30)
+        try:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        recipient TEXT NOT NULL,
+                        template TEXT NOT NULL,
+                        params TEXT,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        last_error TEXT,
+                        created_at REAL NOT NULL,
+                        sent_at REAL
+                    );
+                    CREATE INDEX IF NOT EXISTS outbox_status_next_attempt_at
+                        ON outbox (status, next_attempt_at);
+                    """
+                )
+                self._initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    # SMTP 연결
+
+    def _open_smtp(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            server.ehlo()
+            if SMTP_STARTTLS:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+            # 로컬 디버그 서버처럼 인증이 없는 서버에는 로그인하지 않는다
+            if SMTP_USER and SMTP_PASSWORD:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        logger.info(f"SMTP 연결 - {SMTP_HOST}:{SMTP_PORT}")
+        return server
+
+    def _smtp_connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            idle = time.monotonic() - self._smtp_used_at
+            try:
+                # 오래 놀았던 연결은 서버가 끊었을 수 있으니 NOOP 으로 확인한다
+                if idle > SMTP_IDLE_TIMEOUT or self._smtp.noop()[0] != 250:
+                    self._close_smtp()
+            except (smtplib.SMTPException, OSError):
+                self._close_smtp()
+        if self._smtp is None:
+            self._smtp = self._open_smtp()
+        self._smtp_used_at = time.monotonic()
+        return self._smtp
+
+    def _close_smtp(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def _close_idle_smtp(self):
+        if self._smtp is not None and time.monotonic() - self._smtp_used_at > SMTP_IDLE_TIMEOUT:
+            self._close_smtp()
+
+    def _deliver(self, recipient: str, subject: str, body: str):
+        message = EmailMessage()
+        message["From"] = SMTP_USER
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+
+        server = self._smtp_connection()
+        try:
+            server.send_message(message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise PermanentMailError(str(e.recipients))
+        except smtplib.SMTPResponseException as e:
+            # 4xx 는 다시 시도하고 5xx 는 다시 보내도 같은 결과다
+            if 500 <= e.smtp_code < 600:
+                raise PermanentMailError(f"{e.smtp_code} {e.smtp_error!r}")
+            raise
+        finally:
+            self._smtp_used_at = time.monotonic()
+
+    # outbox
+
+    def _enqueue(self, recipient: str, template: str, params: str) -> int:
+        now = time.time()
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO outbox (recipient, template, params, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (recipient, template, params, now, now),
+            )
+            return cursor.lastrowid
+
+    def _claim_due(self, limit: int) -> List[tuple]:
+        # 같은 파일을 쓰는 다른 워커가 같은 메일을 또 보내지 않게, 가져온 메시지의 다음 시도 시각을 미뤄서 잡아 둔다.
+        # 워커가 보내는 도중에 죽으면 이 시간이 지난 뒤 다시 보내진다.
+        now = time.time()
+        with self._connect() as connection:
+            # 읽기와 미루기 사이에 다른 워커가 끼어들지 않게 처음부터 쓰기 잠금을 잡는다
+            connection.isolation_level = None
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    "SELECT id, recipient, template, params, attempts FROM outbox "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                connection.executemany(
+                    "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                    [(now + SMTP_TIMEOUT * (len(rows) + 1), row[0]) for row in rows],
+                )
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return rows
+
+    def _record_sent(self, message_id: int):
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE outbox SET status = 'sent', params = NULL, sent_at = ?, "
+                "attempts = attempts + 1, last_error = NULL WHERE id = ?",
+                (time.time(), message_id),
+            )
+
+    def _record_failure(self, message_id: int, attempts: int, error: str, permanent: bool):
+        attempts += 1
+        with self._connect() as connection:
+            if permanent or attempts >= MAIL_MAX_ATTEMPTS:
+                connection.execute(
+                    "UPDATE outbox SET status = 'failed', params = NULL, attempts = ?, "
+                    "last_error = ? WHERE id = ?",
+                    (attempts, error, message_id),
+                )
+                logger.error(f"메일 발송 실패 - 재시도하지 않음: {message_id} {error}")
+                return
+
+            delay = min(MAIL_BACKOFF_BASE**attempts, MAIL_BACKOFF_MAX)
+            connection.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? "
+                "WHERE id = ?",
+                (attempts, time.time() + delay, error, message_id),
+            )
+
+    async def _render(self, template: str, recipient: str, params: Optional[str]) -> Tuple[str, str]:
+        render = self._renderers.get(template)
+        if render is None:
+            raise PermanentMailError(f"unknown mail template: {template}")
+        return await render(recipient, json.loads(params or "{}"))
+
+    async def _send_batch(self, limit: int) -> int:
+        rows = await asyncio.to_thread(self._claim_due, limit)
+        for index, (message_id, recipient, template, params, attempts) in enumerate(rows):
+            try:
+                subject, body = await self._render(template, recipient, params)
+            except PermanentMailError as e:
+                await asyncio.to_thread(
+                    self._record_failure, message_id, attempts, str(e), True
+                )
+                continue
+            except Exception as e:
+                # DB 를 읽지 못한 경우 등. 이 메시지만 나중에 다시 시도한다
+                logger.warning(f"메일 본문 생성 실패 - 재시도 예정: {message_id} {e}")
+                await asyncio.to_thread(
+                    self._record_failure, message_id, attempts, str(e), False
+                )
+                continue
+
+            try:
+                await asyncio.to_thread(self._deliver, recipient, subject, body)
+            except PermanentMailError as e:
+                await asyncio.to_thread(
+                    self._record_failure, message_id, attempts, str(e), True
+                )
+                continue
+            except Exception as e:
+                # 연결이나 로그인 문제면 남은 메시지도 실패할 것이므로 배치를 멈추고 다음 주기에 다시 시도한다
+                logger.warning(f"메일 발송 실패 - 재시도 예정: {e}")
+                for message_id, _, _, _, attempts in rows[index:]:
+                    await asyncio.to_thread(
+                        self._record_failure, message_id, attempts, str(e), False
+                    )
+                await asyncio.to_thread(self._close_smtp)
+                return len(rows)
+
+            on_sent = self._sent_hooks.get(template)
+            if on_sent is not None:
+                try:
+                    await on_sent(recipient, json.loads(params or "{}"))
+                except Exception as e:
+                    logger.warning(f"메일 발송 후 처리 실패: {message_id} {e}")
+                    await asyncio.to_thread(
+                        self._record_failure,
+                        message_id,
+                        attempts,
+                        str(e),
+                        isinstance(e, PermanentMailError),
+                    )
+                    continue
+            await asyncio.to_thread(self._record_sent, message_id)
+            logger.info(f"메일 발송 - {message_id}")
+        return len(rows)
+
+    def _prune(self):
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM outbox WHERE status != 'pending' AND created_at < ?",
+                (time.time() - MAIL_RETENTION_SECONDS,),
+            )
+
+    def _status(self, message_id: int) -> Optional[dict]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT status, attempts, last_error, created_at, sent_at FROM outbox "
+                "WHERE id = ?",
+                (message_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, attempts, last_error, created_at, sent_at = row
+        return {
+            "id": message_id,
+            "status": status,
+            "attempts": attempts,
+            "last_error": last_error,
+            "created_at": created_at,
+            "sent_at": sent_at,
+        }
+
+    def _stats(self) -> dict:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT status, count(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        stats = {"pending": 0, "sent": 0, "failed": 0}
+        stats.update(dict(rows))
+        return stats
+
+    async def enqueue(self, recipient: str, template: str, params: Optional[dict] = None) -> int:
+        # params 는 그대로 SQLite 에 저장되므로 비밀 값을 넣지 않는다
+        if template not in self._renderers:
+            raise ValueError(f"unknown mail template: {template}")
+        message_id = await asyncio.to_thread(
+            self._enqueue, recipient, template, json.dumps(params or {})
+        )
+        self._wakeup.set()
+        return message_id
+
+    async def status(self, message_id: int) -> Optional[dict]:
+        return await asyncio.to_thread(self._status, message_id)
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+    async def run(self):
+        logger.info("메일 outbox 워커 시작")
+        await asyncio.to_thread(self._prune)
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                processed = await self._send_batch(MAIL_BATCH_SIZE)
+            except Exception as e:
+                logger.error(f"메일 outbox 처리 실패: {e}")
+                processed = 0
+
+            if processed >= MAIL_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=MAIL_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._close_idle_smtp)
+        await asyncio.to_thread(self._close_smtp)
+        logger.info("메일 outbox 워커 종료")
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+
+mail_outbox = MailOutbox(MAIL_OUTBOX_PATH)
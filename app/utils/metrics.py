@@ -0,0 +1,315 @@
+import sys
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+from app.utils.slow_query import slow_query_log
+
+# prometheus_client 의 기본 레지스트리에 올리는 프로세스 단위 지표.
+# 워커가 여러 개면 워커마다 따로 집계되므로 수집기에서 인스턴스별로 긁어서 합친다.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _StatsCollector:
+    # 긁을 때마다 다른 모듈의 통계 dict 를 읽어서 숫자 값마다 {prefix}_{key} gauge 로 내보낸다
+
+    def __init__(self, prefix: str, collect: Callable[[], Dict[str, float]]):
+        self._prefix = prefix
+        self._collect = collect
+
+    def collect(self):
+        try:
+            values = self._collect()
+        except Exception:
+            return
+        for key, value in values.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if not isinstance(value, (int, float)):
+                continue
+            name = f"{self._prefix}_{key}"
+            yield GaugeMetricFamily(name, name, value=value)
+
+
+def register_collector(prefix: str, collect: Callable[[], Dict[str, float]]):
+    REGISTRY.register(_StatsCollector(prefix, collect))
+
+
+def render_metrics():
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# HTTP
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route"),
+    buckets=DEFAULT_BUCKETS,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ("method",)
+)
+
+
+class MetricsMiddleware:
+    # BaseHTTPMiddleware 는 응답 본문을 한 번 더 감싸서 느리므로 ASGI 미들웨어로 직접 잰다.
+    # route 라벨은 매칭된 경로 템플릿(/domain/friend/knock/accept_by_link/{knock_id})을 써서 라벨 수가 늘지 않게 한다.
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # 라우터가 매칭한 route 를 scope 에 넣어 준다
+            route = scope.get("route")
+            route_path = getattr(route, "path_format", None) or getattr(route, "path", None)
+            route_path = route_path or "unmatched"
+            http_request_duration.labels(method, route_path).observe(
+                time.perf_counter() - started_at
+            )
+            http_requests.labels(method, route_path, status).inc()
+
+
+# Cypher
+
+query_duration = Histogram(
+    "neo4j_query_duration_seconds",
+    "Cypher query latency from run() until the result is consumed",
+    ("query",),
+    buckets=DEFAULT_BUCKETS,
+)
+query_rows = Counter("neo4j_query_rows_total", "Rows returned by query", ("query",))
+query_errors = Counter("neo4j_query_errors_total", "Failed queries", ("query",))
+slow_queries = Counter(
+    "neo4j_slow_queries_total", "Queries slower than SLOW_QUERY_THRESHOLD_MS", ("query",)
+)
+
+# 쿼리 문자열 -> *_QUERY 상수 이름. 시작할 때 index_query_names() 로 한 번 채운다
+_query_names: Dict[str, str] = {}
+
+
+def index_query_names():
+    # 라우터를 모두 import 한 뒤 main 에서 한 번 부른다. 쿼리 상수는 *_QUERY 이름으로 모듈에 정의되어 있다
+    for module in list(sys.modules.values()):
+        module_name = getattr(module, "__name__", "")
+        if not module_name.startswith("app."):
+            continue
+        for name, value in list(vars(module).items()):
+            if isinstance(value, str) and name.isupper() and "QUERY" in name:
+                _query_names.setdefault(value, name)
+
+
+def query_name(query) -> str:
+    # 상수가 아닌 쿼리는 한 이름으로 묶는다
+    return _query_names.get(getattr(query, "text", query), "other")
+
+
+class InstrumentedResult:
+    # 결과를 다 읽거나 consume 할 때까지의 시간과 행 수를 기록한다
+
+    def __init__(self, result, name: str, started_at: float, query: str, parameters: dict):
+        self._result = result
+        self._name = name
+        self._started_at = started_at
+        self._query = query
+        self._parameters = parameters
+        self._rows = 0
+        self._recorded = False
+
+    def _record(self, error: bool = False):
+        if self._recorded:
+            return
+        self._recorded = True
+        elapsed = time.perf_counter() - self._started_at
+        query_duration.labels(self._name).observe(elapsed)
+        query_rows.labels(self._name).inc(self._rows)
+        if error:
+            query_errors.labels(self._name).inc()
+        elif slow_query_log.observe(
+            self._name, self._query, self._parameters, elapsed, self._rows
+        ):
+            slow_queries.labels(self._name).inc()
+
+    async def _call(self, method: str, *args, **kwargs):
+        try:
+            value = await getattr(self._result, method)(*args, **kwargs)
+        except Exception:
+            self._record(error=True)
+            raise
+        return value
+
+    async def single(self, *args, **kwargs):
+        record = await self._call("single", *args, **kwargs)
+        self._rows += record is not None
+        self._record()
+        return record
+
+    async def data(self, *args, **kwargs):
+        records = await self._call("data", *args, **kwargs)
+        self._rows += len(records)
+        self._record()
+        return records
+
+    async def values(self, *args, **kwargs):
+        records = await self._call("values", *args, **kwargs)
+        self._rows += len(records)
+        self._record()
+        return records
+
+    async def consume(self):
+        summary = await self._call("consume")
+        self._record()
+        return summary
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            async for record in self._result:
+                self._rows += 1
+                yield record
+        except Exception:
+            self._record(error=True)
+            raise
+        self._record()
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+
+class InstrumentedSession:
+    # AsyncSession.run 만 감싸고 나머지는 그대로 넘긴다
+
+    def __init__(self, session):
+        self._session = session
+
+    async def run(self, query, parameters=None, **kwargs):
+        name = query_name(query)
+        started_at = time.perf_counter()
+        try:
+            result = await self._session.run(query, parameters, **kwargs)
+        except Exception:
+            query_duration.labels(name).observe(time.perf_counter() - started_at)
+            query_errors.labels(name).inc()
+            raise
+        return InstrumentedResult(
+            result,
+            name,
+            started_at,
+            getattr(query, "text", query),
+            dict(parameters or {}, **kwargs),
+        )
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return await self._session.__aexit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+# S3
+
+s3_calls = Counter(
+    "s3_calls_total", "S3 API calls", ("operation", "outcome")
+)
+s3_objects = Counter("s3_objects_total", "S3 objects touched", ("operation",))
+s3_bytes = Counter("s3_bytes_total", "Bytes sent to S3", ("operation",))
+
+
+def record_s3_call(operation: str, ok: bool, objects: int = 1, size: Optional[int] = None):
+    s3_calls.labels(operation, "ok" if ok else "error").inc()
+    if ok:
+        s3_objects.labels(operation).inc(objects)
+        if size:
+            s3_bytes.labels(operation).inc(size)
+
+
+# 스케줄러 작업
+
+job_runs = Counter("scheduler_job_runs_total", "Scheduler job runs", ("job", "outcome"))
+job_last_duration = Gauge(
+    "scheduler_job_last_duration_seconds", "Duration of the last run", ("job",)
+)
+job_duration = Histogram(
+    "scheduler_job_duration_seconds",
+    "Scheduler job durations",
+    ("job",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0),
+)
+
+
+def timed_job(name: str, func):
+    # APScheduler 에 넘기는 코루틴 함수를 감싸서 실행 시간과 결과를 기록한다
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            job_last_duration.labels(name).set(elapsed)
+            job_duration.labels(name).observe(elapsed)
+            job_runs.labels(name, outcome).inc()
+
+    return wrapper
+
+
+# 스케줄러 리더 선출
+
+scheduler_leader = Gauge(
+    "scheduler_leader", "1 while this process runs the leader-only jobs", ("backend",)
+)
+scheduler_lease_renewals = Counter(
+    "scheduler_lease_renewals_total", "Scheduler lease acquire/renew attempts", ("outcome",)
+)
+scheduler_leader_transitions = Counter(
+    "scheduler_leader_transitions_total", "Leader elections and demotions", ("transition",)
+)
+
+
+# long-polling
+
+long_poll_waiters = Gauge(
+    "long_poll_waiters", "Open long-polling requests", ("endpoint",)
+)
@@ -0,0 +1,44 @@
+import base64
+import json
+import os
+from typing import Callable, List, Optional, Tuple
+from fastapi import HTTPException
+
+# 목록 API 의 cursor 는 마지막으로 돌려준 행의 정렬 키를 JSON 으로 묶어 base64 로 감싼 값이다.
+# 클라이언트는 내용을 해석하지 말고 next_cursor 를 그대로 다시 보내야 한다.
+DEFAULT_PAGE_SIZE = int(os.getenv("PAGE_SIZE", 20))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 100))
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return values
+
+
+def page_limit(
+    limit: Optional[int], default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE
+) -> int:
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def split_page(rows: List, limit: int, cursor_of: Callable) -> Tuple[List, Optional[str]]:
+    # 쿼리는 limit + 1 개를 가져온다. 넘친 행이 있으면 다음 페이지가 있다는 뜻이다
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*cursor_of(rows[-1]))
@@ -0,0 +1,229 @@
+import os
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+# 인덱스는 프로세스마다 따로 들고 있어서 다른 워커에서 일어난 변경은 reload 전까지 보이지 않는다.
+# 그래서 쓰기를 하는 프로세스가 하나뿐일 때만 켠다. 워커가 여러 개면 기본값이 꺼짐이고, 조회는 Cypher 로 한다.
+# 호스트가 여러 대인 배포에서는 WEB_CONCURRENCY 로 알 수 없으므로 ROOMMATE_INDEX_ENABLED=false 로 꺼야 한다.
+ROOMMATE_INDEX_ENABLED = os.getenv(
+    "ROOMMATE_INDEX_ENABLED",
+    "true" if int(os.getenv("WEB_CONCURRENCY", 1)) <= 1 else "false",
+).lower() in ("1", "true", "yes")
+
+
+class RoommateIndex:
+    # is_roommate / block / mute 관계를 프로세스 메모리에 들고 있는 인접 리스트.
+    # node_id 를 정수로 바꾸고 roommate 목록은 정렬된 array 로 저장해서 1~2홉 탐색을 Cypher 없이 한다.
+    # 노드 속성은 들고 있지 않으므로 화면에 필요한 속성은 찾은 node_id 로 DB 에서 가져온다.
+    # 다른 워커에서 일어난 변경은 주기적인 reload 로 반영된다. 그래서 ROOMMATE_INDEX_ENABLED 일 때만 읽어 들인다.
+
+    def __init__(self):
+        self.loaded = False
+        # begin_reload() 부터 load() 까지 들어온 변경. load() 가 새 인덱스에 다시 적용한다
+        self._journal = None
+        self._reset()
+
+    def _reset(self):
+        self._ids = {}
+        self._node_ids = []
+        self._roommates = []
+        self._blocks = {}
+        self._mutes = {}
+
+    def _id(self, node_id: str) -> int:
+        index = self._ids.get(node_id)
+        if index is None:
+            index = len(self._node_ids)
+            self._ids[node_id] = index
+            self._node_ids.append(node_id)
+            self._roommates.append(array("I"))
+        return index
+
+    @staticmethod
+    def _insert(values: array, value: int):
+        position = bisect_left(values, value)
+        if position == len(values) or values[position] != value:
+            values.insert(position, value)
+
+    @staticmethod
+    def _remove(values: array, value: int):
+        position = bisect_left(values, value)
+        if position < len(values) and values[position] == value:
+            del values[position]
+
+    def begin_reload(self):
+        # DB 에서 간선을 읽기 전에 부른다. 읽는 동안 이 워커에서 생긴 변경을 잃지 않게 기록해 둔다
+        self._journal = []
+
+    def cancel_reload(self):
+        self._journal = None
+
+    def _record(self, method: str, *args):
+        if self._journal is not None:
+            self._journal.append((method, args))
+
+    def load(
+        self,
+        roommate_edges: Iterable[Tuple[str, str]],
+        block_edges: Iterable[Tuple[str, str]],
+        mute_edges: Iterable[Tuple[str, str]],
+    ):
+        # 새 인덱스를 옆에서 만든 뒤 한 번에 바꿔 끼워서 조회 중인 요청이 반쯤 만든 상태를 보지 않게 한다
+        fresh = RoommateIndex()
+        adjacency = []
+        for from_node_id, to_node_id in roommate_edges:
+            from_id, to_id = fresh._id(from_node_id), fresh._id(to_node_id)
+            while len(adjacency) < len(fresh._node_ids):
+                adjacency.append([])
+            adjacency[from_id].append(to_id)
+        for from_id, to_ids in enumerate(adjacency):
+            fresh._roommates[from_id] = array("I", sorted(set(to_ids)))
+        for from_node_id, to_node_id in block_edges:
+            fresh._blocks.setdefault(fresh._id(from_node_id), set()).add(
+                fresh._id(to_node_id)
+            )
+        for from_node_id, to_node_id in mute_edges:
+            fresh._mutes.setdefault(fresh._id(from_node_id), set()).add(
+                fresh._id(to_node_id)
+            )
+        # 읽는 동안 생긴 변경은 읽은 결과에 이미 들어 있을 수도 있지만, 같은 변경을 다시 적용해도 결과는 같다
+        for method, args in self._journal or ():
+            getattr(fresh, method)(*args)
+        self._journal = None
+
+        (
+            self._ids,
+            self._node_ids,
+            self._roommates,
+            self._blocks,
+            self._mutes,
+        ) = (fresh._ids, fresh._node_ids, fresh._roommates, fresh._blocks, fresh._mutes)
+        self.loaded = True
+
+    # 변경: 그래프 쓰기가 끝난 뒤에 호출한다. is_roommate 는 항상 양방향으로 만들어지고 지워진다.
+
+    def add_roommate(self, node_id: str, other_node_id: str):
+        self._record("add_roommate", node_id, other_node_id)
+        a, b = self._id(node_id), self._id(other_node_id)
+        self._insert(self._roommates[a], b)
+        self._insert(self._roommates[b], a)
+
+    def remove_roommate(self, node_id: str, other_node_id: str):
+        self._record("remove_roommate", node_id, other_node_id)
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is None or b is None:
+            return
+        self._remove(self._roommates[a], b)
+        self._remove(self._roommates[b], a)
+
+    def add_block(self, node_id: str, other_node_id: str):
+        # block 쿼리는 roommate 와 양쪽 mute 도 같이 지운다
+        self._record("add_block", node_id, other_node_id)
+        a, b = self._id(node_id), self._id(other_node_id)
+        self._blocks.setdefault(a, set()).add(b)
+        self.remove_roommate(node_id, other_node_id)
+        self._mutes.get(a, set()).discard(b)
+        self._mutes.get(b, set()).discard(a)
+
+    def remove_block(self, node_id: str, other_node_id: str):
+        self._record("remove_block", node_id, other_node_id)
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is not None and b is not None:
+            self._blocks.get(a, set()).discard(b)
+
+    def add_mute(self, node_id: str, other_node_id: str):
+        self._record("add_mute", node_id, other_node_id)
+        self._mutes.setdefault(self._id(node_id), set()).add(self._id(other_node_id))
+
+    def remove_mute(self, node_id: str, other_node_id: str):
+        self._record("remove_mute", node_id, other_node_id)
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is not None and b is not None:
+            self._mutes.get(a, set()).discard(b)
+
+    def remove_user(self, node_id: str):
+        self._record("remove_user", node_id)
+        a = self._ids.get(node_id)
+        if a is None:
+            return
+        for b in list(self._roommates[a]):
+            self._remove(self._roommates[b], a)
+        self._roommates[a] = array("I")
+        self._blocks.pop(a, None)
+        self._mutes.pop(a, None)
+        for targets in list(self._blocks.values()) + list(self._mutes.values()):
+            targets.discard(a)
+
+    # 조회
+
+    def _blocked_either(self, a: int, b: int) -> bool:
+        return b in self._blocks.get(a, ()) or a in self._blocks.get(b, ())
+
+    def is_roommate(self, node_id: str, other_node_id: str) -> bool:
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is None or b is None:
+            return False
+        values = self._roommates[a]
+        position = bisect_left(values, b)
+        return position < len(values) and values[position] == b
+
+    def is_blocked(self, node_id: str, other_node_id: str) -> bool:
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is None or b is None:
+            return False
+        return self._blocked_either(a, b)
+
+    def is_muted(self, node_id: str, other_node_id: str) -> bool:
+        a, b = self._ids.get(node_id), self._ids.get(other_node_id)
+        if a is None or b is None:
+            return False
+        return b in self._mutes.get(a, ())
+
+    def roommates(self, node_id: str) -> List[str]:
+        a = self._ids.get(node_id)
+        if a is None:
+            return []
+        return [self._node_ids[b] for b in self._roommates[a]]
+
+    def neighbors_via(
+        self, node_id: str, roommate_node_id: str, exclude_blocked: bool = False
+    ) -> List[str]:
+        # roommate 의 roommate 중 나를 뺀 목록
+        a, r = self._ids.get(node_id), self._ids.get(roommate_node_id)
+        if r is None:
+            return []
+        return [
+            self._node_ids[n]
+            for n in self._roommates[r]
+            if n != a and not (exclude_blocked and a is not None and self._blocked_either(a, n))
+        ]
+
+    def pure_neighbors(self, node_id: str) -> List[str]:
+        # 2홉 이웃 중 나, 내 roommate, 나와 block 관계인 사용자를 뺀 목록
+        a = self._ids.get(node_id)
+        if a is None:
+            return []
+        roommates = self._roommates[a]
+        direct = set(roommates)
+        seen = set()
+        result = []
+        for r in roommates:
+            for n in self._roommates[r]:
+                if n == a or n in direct or n in seen or self._blocked_either(a, n):
+                    continue
+                seen.add(n)
+                result.append(self._node_ids[n])
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "users": len(self._node_ids),
+            "roommate_edges": sum(len(values) for values in self._roommates),
+            "blocks": sum(len(values) for values in self._blocks.values()),
+            "mutes": sum(len(values) for values in self._mutes.values()),
+        }
+
+
+roommate_index = RoommateIndex()
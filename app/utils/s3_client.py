@@ -1,10 +1,14 @@
 import boto3
+from urllib.parse import unquote
 from app.config.connection import (
     S3_REGION,
     S3_ACCESS_KEY,
     S3_SECRET_KEY,
 )
 
+# delete_objects 한 번에 보낼 수 있는 최대 키 개수
+S3_DELETE_BATCH_SIZE = 1000
+
 # S3 클라이언트 생성
 s3_client = boto3.client(
     "s3",
@@ -12,3 +16,9 @@ s3_client = boto3.client(
     aws_secret_access_key=S3_SECRET_KEY,
     region_name=S3_REGION,
 )
+
+
+def s3_key_from_url(image_url: str) -> str:
+    # https://{bucket}.s3.{region}.amazonaws.com/{quoted key}
+    return unquote("/".join(image_url.split("/")[3:]))
+
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import List
+from app.utils.logger import Logger
+from app.utils.metrics import record_s3_call
+from app.utils.s3_client import s3_client, S3_DELETE_BATCH_SIZE
+from app.config.connection import S3_BUCKET_NAME
+
+logger = Logger(__file__)
+
+# S3 객체 삭제는 요청 경로에서 하지 않고 로컬 SQLite 큐에 넣은 뒤 백그라운드 워커가 delete_objects 로 묶어서 지운다.
+# 실패한 키는 지수 백오프로 재시도하고, 재시도 한도를 넘으면 dead letter 테이블로 옮긴다.
+# 같은 파일을 여러 워커가 같이 써도 되지만 같은 키를 두 번 지울 수 있다. S3 삭제는 멱등이라 문제 없다.
+S3_DELETE_QUEUE_PATH = os.getenv("S3_DELETE_QUEUE_PATH", "s3_delete_queue.sqlite3")
+S3_DELETE_MAX_ATTEMPTS = int(os.getenv("S3_DELETE_MAX_ATTEMPTS", 8))
+S3_DELETE_BACKOFF_BASE = float(os.getenv("S3_DELETE_BACKOFF_BASE", 2))
+S3_DELETE_BACKOFF_MAX = float(os.getenv("S3_DELETE_BACKOFF_MAX", 3600))
+S3_DELETE_POLL_INTERVAL = float(os.getenv("S3_DELETE_POLL_INTERVAL", 5))
+
+
+class S3DeleteQueue:
+    def __init__(self, path: str):
+        self._path = path
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self):
+        # `with connection:` 은 커밋만 하고 닫지 않으므로 쓰고 나면 여기서 닫는다
+        connection = sqlite3.connect(self._path, timeout=30)
+        try:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS pending (
+                        key TEXT PRIMARY KEY,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        last_error TEXT
+                    );
+                    CREATE INDEX IF NOT EXISTS pending_next_attempt_at
+                        ON pending (next_attempt_at);
+                    CREATE TABLE IF NOT EXISTS dead_letter (
+                        key TEXT PRIMARY KEY,
+                        attempts INTEGER NOT NULL,
+                        last_error TEXT,
+                        failed_at REAL NOT NULL
+                    );
+                    """
+                )
+                self._initialized = True
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _enqueue(self, keys: List[str]):
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO pending (key, next_attempt_at) VALUES (?, ?)",
+                [(key, time.time()) for key in keys],
+            )
+
+    def _claim_due(self, limit: int) -> List[tuple]:
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT key, attempts FROM pending WHERE next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+
+    def _record_results(self, rows: List[tuple], errors: dict):
+        now = time.time()
+        with self._connect() as connection:
+            for key, attempts in rows:
+                if key not in errors:
+                    connection.execute("DELETE FROM pending WHERE key = ?", (key,))
+                    continue
+
+                attempts += 1
+                if attempts >= S3_DELETE_MAX_ATTEMPTS:
+                    connection.execute("DELETE FROM pending WHERE key = ?", (key,))
+                    connection.execute(
+                        "INSERT OR REPLACE INTO dead_letter (key, attempts, last_error, failed_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, attempts, errors[key], now),
+                    )
+                    logger.error(f"S3 삭제 재시도 한도 초과 - dead letter 로 이동: {key}")
+                    continue
+
+                delay = min(S3_DELETE_BACKOFF_BASE**attempts, S3_DELETE_BACKOFF_MAX)
+                connection.execute(
+                    "UPDATE pending SET attempts = ?, next_attempt_at = ?, last_error = ? "
+                    "WHERE key = ?",
+                    (attempts, now + delay, errors[key], key),
+                )
+
+    def _delete_batch(self, limit: int) -> int:
+        rows = self._claim_due(limit)
+        if not rows:
+            return 0
+
+        try:
+            response = s3_client.delete_objects(
+                Bucket=S3_BUCKET_NAME,
+                Delete={"Objects": [{"Key": key} for key, _ in rows], "Quiet": True},
+            )
+            errors = {
+                error["Key"]: f"{error.get('Code')}: {error.get('Message')}"
+                for error in response.get("Errors", [])
+            }
+            record_s3_call("delete", ok=True, objects=len(rows) - len(errors))
+        except Exception as e:
+            # 연결 실패나 시간 초과는 배치 전체를 다시 시도한다
+            logger.warning(f"S3 delete_objects 실패 - 재시도 예정: {e}")
+            record_s3_call("delete", ok=False)
+            errors = {key: str(e) for key, _ in rows}
+
+        self._record_results(rows, errors)
+        return len(rows)
+
+    def _stats(self) -> dict:
+        with self._connect() as connection:
+            pending = connection.execute("SELECT count(*) FROM pending").fetchone()[0]
+            dead_letter = connection.execute(
+                "SELECT count(*) FROM dead_letter"
+            ).fetchone()[0]
+        return {"pending": pending, "dead_letter": dead_letter}
+
+    def _dead_letters(self, limit: int) -> List[dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT key, attempts, last_error, failed_at FROM dead_letter "
+                "ORDER BY failed_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {"key": key, "attempts": attempts, "last_error": last_error, "failed_at": failed_at}
+            for key, attempts, last_error, failed_at in rows
+        ]
+
+    async def enqueue(self, keys: List[str]):
+        if not keys:
+            return
+        await asyncio.to_thread(self._enqueue, keys)
+        self._wakeup.set()
+
+    async def stats(self) -> dict:
+        return await asyncio.to_thread(self._stats)
+
+    async def dead_letters(self, limit: int = 100) -> List[dict]:
+        return await asyncio.to_thread(self._dead_letters, limit)
+
+    async def run(self):
+        logger.info("S3 삭제 큐 워커 시작")
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                processed = await asyncio.to_thread(
+                    self._delete_batch, S3_DELETE_BATCH_SIZE
+                )
+            except Exception as e:
+                logger.error(f"S3 삭제 큐 처리 실패: {e}")
+                processed = 0
+
+            # 꽉 찬 배치를 처리했으면 남은 키가 있을 수 있으니 바로 다음 배치로 간다
+            if processed >= S3_DELETE_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=S3_DELETE_POLL_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+        logger.info("S3 삭제 큐 워커 종료")
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+
+
+s3_delete_queue = S3DeleteQueue(S3_DELETE_QUEUE_PATH)
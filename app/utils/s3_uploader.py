@@ -0,0 +1,105 @@
+import asyncio
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
+from urllib.parse import quote
+from boto3.s3.transfer import TransferConfig
+from fastapi import HTTPException, UploadFile
+from app.config.connection import S3_BUCKET_NAME, S3_REGION
+from app.utils.logger import Logger
+from app.utils.metrics import record_s3_call
+from app.utils.s3_client import s3_client
+from app.utils.s3_delete_queue import s3_delete_queue
+
+logger = Logger(__file__)
+
+# boto3 클라이언트는 스레드 안전해서 풀 하나로 여러 요청의 업로드를 동시에 보낸다.
+# 파일 하나가 멀티파트로 쪼개질 때 쓰는 스레드 수도 제한해서 전체 스레드 수가 폭증하지 않게 한다.
+S3_UPLOAD_POOL_SIZE = int(os.getenv("S3_UPLOAD_POOL_SIZE", 16))
+S3_UPLOAD_PART_CONCURRENCY = int(os.getenv("S3_UPLOAD_PART_CONCURRENCY", 4))
+
+_executor = ThreadPoolExecutor(
+    max_workers=S3_UPLOAD_POOL_SIZE, thread_name_prefix="s3-upload"
+)
+_transfer_config = TransferConfig(max_concurrency=S3_UPLOAD_PART_CONCURRENCY)
+
+
+def s3_url_from_key(s3_key: str) -> str:
+    return f"https://{S3_BUCKET_NAME}.s3.{S3_REGION}.amazonaws.com/{quote(s3_key)}"
+
+
+def _upload_fileobj(image: UploadFile, s3_key: str):
+    # UploadFile.file 을 그대로 넘기면 boto3 가 청크 단위로 읽어서 보내므로 전체를 메모리에 올리지 않는다
+    mime_type, _ = mimetypes.guess_type(image.filename)
+    try:
+        s3_client.upload_fileobj(
+            image.file,
+            S3_BUCKET_NAME,
+            s3_key,
+            ExtraArgs={
+                "ContentType": mime_type or "application/octet-stream",
+                "ACL": "public-read",
+            },
+            Config=_transfer_config,
+        )
+    except Exception:
+        record_s3_call("upload", ok=False)
+        raise
+    record_s3_call("upload", ok=True, size=image.size)
+
+
+async def rollback_uploads(s3_keys: List[str]):
+    # 요청을 붙잡지 않도록 삭제 큐에 넘긴다
+    try:
+        await s3_delete_queue.enqueue(s3_keys)
+    except Exception as e:
+        logger.error(f"Failed to roll back S3 uploads {s3_keys}: {e}")
+
+
+async def upload_images(images: List[UploadFile], key_prefix: str) -> List[str]:
+    # 모든 이미지를 동시에 올리고 입력 순서대로 키를 돌려준다. 하나라도 실패하면 올라간 것도 지운다.
+    s3_keys = [
+        f"{key_prefix}/{index}_{image.filename}" for index, image in enumerate(images)
+    ]
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(
+            loop.run_in_executor(_executor, _upload_fileobj, image, s3_key)
+            for image, s3_key in zip(images, s3_keys)
+        ),
+        return_exceptions=True,
+    )
+
+    failed = [
+        (image, result)
+        for image, result in zip(images, results)
+        if isinstance(result, BaseException)
+    ]
+    if failed:
+        await rollback_uploads(
+            [
+                s3_key
+                for s3_key, result in zip(s3_keys, results)
+                if not isinstance(result, BaseException)
+            ]
+        )
+        image, error = failed[0]
+        logger.error(f"Failed to upload {image.filename} to S3: {str(error)}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to upload {image.filename} to S3"
+        ) from error
+
+    return s3_keys
+
+
+@asynccontextmanager
+async def uploaded_images(images: List[UploadFile], key_prefix: str):
+    # 블록 안에서 예외가 나면(Cypher 실패 등) 이미 올린 객체를 지워서 고아 객체가 남지 않게 한다
+    s3_keys = await upload_images(images, key_prefix)
+    try:
+        yield [s3_url_from_key(s3_key) for s3_key in s3_keys]
+    except BaseException:
+        await rollback_uploads(s3_keys)
+        raise
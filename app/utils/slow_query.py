@@ -0,0 +1,146 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.utils.cypher import AUTO_COMMIT, WRITE, query_access_mode
+from app.utils.logger import Logger
+
+logger = Logger(__file__)
+
+# 기준 시간보다 오래 걸린 Cypher 쿼리를 링 버퍼에 남기고, 샘플링해서 같은 쿼리를 PROFILE 로 한 번 더 실행한다.
+# 기본으로는 읽기 쿼리만 PROFILE 한다. READ 세션으로 돌려서 클러스터에서는 읽기 복제본으로 간다.
+# 쓰기 쿼리는 롤백하는 트랜잭션 안에서 돌려도 실제로 쓰기를 수행하고 잠금을 잡으므로 SLOW_QUERY_PROFILE_WRITES=true 일 때만 한다.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 500))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 0.1))
+SLOW_QUERY_PROFILE_WRITES = os.getenv("SLOW_QUERY_PROFILE_WRITES", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", 100))
+# 같은 쿼리는 이 시간 안에 다시 PROFILE 하지 않는다
+SLOW_QUERY_PROFILE_COOLDOWN = float(os.getenv("SLOW_QUERY_PROFILE_COOLDOWN", 300))
+
+
+def _operators(plan: dict, depth: int = 0) -> List[dict]:
+    args = plan.get("args") or {}
+    operators = [
+        {
+            # 'NodeIndexSeek@neo4j' 처럼 오는 이름에서 DB 이름을 뗀다
+            "operator": str(plan.get("operatorType", "")).split("@")[0],
+            "details": args.get("Details"),
+            "rows": plan.get("rows", 0),
+            "db_hits": plan.get("dbHits", 0),
+            "depth": depth,
+        }
+    ]
+    for child in plan.get("children") or []:
+        operators.extend(_operators(child, depth + 1))
+    return operators
+
+
+def summarize_profile(summary) -> dict:
+    plan = summary.profile or {}
+    operators = _operators(plan)
+    args = plan.get("args") or {}
+    return {
+        "db_hits": sum(operator["db_hits"] for operator in operators),
+        "rows": plan.get("rows", 0),
+        "planner": args.get("planner"),
+        "runtime": args.get("runtime"),
+        "available_after_ms": summary.result_available_after,
+        "consumed_after_ms": summary.result_consumed_after,
+        "operators": operators,
+    }
+
+
+class SlowQueryLog:
+    def __init__(self, size: int):
+        self._entries = deque(maxlen=size)
+        self._last_profiled = {}
+        # 실행 중인 PROFILE 태스크가 GC 되지 않게 참조를 들고 있는다
+        self._tasks = set()
+
+    def observe(
+        self, name: str, query: str, parameters: dict, elapsed: float, rows: int
+    ) -> bool:
+        # 느린 쿼리였으면 기록하고 True 를 돌려준다
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < SLOW_QUERY_THRESHOLD_MS:
+            return False
+
+        entry = {
+            "query": name,
+            "text": query,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "rows": rows,
+            # 비밀번호 같은 값이 남지 않게 파라미터는 이름만 남긴다
+            "parameters": sorted(parameters),
+            "captured_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+            "profile_status": "skipped",
+            "profile_error": None,
+            "plan": None,
+        }
+        self._entries.append(entry)
+        logger.warning(f"slow query {name}: {entry['elapsed_ms']}ms, {rows} rows")
+
+        if self._should_profile(name, query):
+            self._last_profiled[name] = time.monotonic()
+            entry["profile_status"] = "pending"
+            task = asyncio.get_running_loop().create_task(
+                self._profile(entry, query, parameters)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return True
+
+    def _should_profile(self, name: str, query: str) -> bool:
+        # 명시적 트랜잭션 안에서 돌릴 수 없거나 PROFILE 할 필요가 없는 쿼리
+        access_mode = query_access_mode(query)
+        if access_mode == AUTO_COMMIT:
+            return False
+        if access_mode == WRITE and not SLOW_QUERY_PROFILE_WRITES:
+            return False
+        last_profiled = self._last_profiled.get(name)
+        if last_profiled is not None and time.monotonic() - last_profiled < SLOW_QUERY_PROFILE_COOLDOWN:
+            return False
+        return random.random() < SLOW_QUERY_SAMPLE_RATE
+
+    async def _profile(self, entry: dict, query: str, parameters: dict):
+        # app.config.connection 이 metrics 를 통해 이 모듈을 import 하므로 여기서 가져온다.
+        # 계측하지 않는 드라이버 세션을 써서 PROFILE 실행이 다시 느린 쿼리로 잡히지 않게 한다.
+        from neo4j import READ_ACCESS, WRITE_ACCESS
+        from app.config.connection import get_driver, NEO4J_DATABASE
+
+        access_mode = WRITE_ACCESS if query_access_mode(query) == WRITE else READ_ACCESS
+        try:
+            async with get_driver().session(
+                database=NEO4J_DATABASE, default_access_mode=access_mode
+            ) as session:
+                tx = await session.begin_transaction()
+                try:
+                    result = await tx.run(f"PROFILE {query}", parameters)
+                    summary = await result.consume()
+                finally:
+                    await tx.rollback()
+            entry["plan"] = summarize_profile(summary)
+            entry["profile_status"] = "done"
+        except Exception as e:
+            entry["profile_status"] = "failed"
+            entry["profile_error"] = str(e)
+            logger.error(f"PROFILE {entry['query']} failed: {e}")
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        # 최근 것부터
+        entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def clear(self):
+        self._entries.clear()
+        self._last_profiled.clear()
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_LOG_SIZE)
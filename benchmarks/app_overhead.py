@@ -0,0 +1,172 @@
+"""in-memory 그래프 백엔드로 FastAPI 앱 전체를 돌려서 DB 를 뺀 요청 처리 비용을 잰다.
+
+엔드포인트마다 TestClient 로 보낸 요청 하나의 시간(http)과 같은 조회를 repository 에 직접 한 시간(repo)을 재고,
+그 차이(overhead)를 라우팅, 의존성, 인증, 요청 검증, 직렬화에 드는 비용으로 본다.
+lifespan(마이그레이션, 스케줄러)은 실행하지 않으므로 Neo4j 가 없어도 된다.
+
+    PYTHONPATH=app python -m benchmarks.app_overhead --users 2000 --roommates 20 --number 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+# 앱을 import 하기 전에 설정해야 한다. 드라이버는 주소만 받고 실제로 연결하지 않는다
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+os.environ.setdefault("GRAPH_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.repository import get_repository, memory_repository
+from app.utils import create_access_token
+from app.utils.roommate_index import roommate_index
+
+
+def seed(users: int, roommates: int, stickers: int, posts: int, seed_value: int) -> list:
+    rng = random.Random(seed_value)
+    memory_repository.clear()
+    node_ids = [
+        memory_repository.add_user(nickname=f"nickname{index}", username=f"username{index}")
+        for index in range(users)
+    ]
+    started_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for node_id in node_ids:
+        for other_node_id in rng.sample(node_ids, min(roommates, users)):
+            if other_node_id != node_id:
+                memory_repository.add_roommate(node_id, other_node_id)
+        for index in range(stickers):
+            created_at = started_at + timedelta(minutes=rng.randrange(60 * 24 * 30))
+            memory_repository.add_sticker(
+                node_id, created_at.isoformat(), content=f"sticker {index} " * 5
+            )
+        for index in range(posts):
+            created_at = started_at + timedelta(minutes=rng.randrange(60 * 24 * 30))
+            memory_repository.add_post(
+                node_id, created_at.isoformat(), title=f"post {index}", content="post " * 20
+            )
+    roommate_index.load(
+        memory_repository.roommate_edges(),
+        memory_repository.block_edges(),
+        memory_repository.mute_edges(),
+    )
+    return node_ids
+
+
+def build_cases(me: str, friend: str, page_size: int) -> dict:
+    # 이름: (method, path, TestClient 인자, 같은 조회를 repository 에 직접 하는 코루틴 함수)
+    repository = memory_repository
+    return {
+        "my_info": (
+            "GET",
+            "/domain/user/my/info",
+            {},
+            lambda: repository.get_user(me),
+        ),
+        "knocks": (
+            "POST",
+            "/domain/friend/knock/get-members",
+            {"params": {"limit": page_size}},
+            lambda: repository.list_knocks(me, limit=page_size + 1),
+        ),
+        "stickers": (
+            "POST",
+            "/domain/content/sticker/get-members",
+            {"json": {"user_node_id": friend}},
+            lambda: repository.list_stickers(me, friend),
+        ),
+        "stickers_page": (
+            "POST",
+            "/domain/content/sticker/get-members",
+            {"json": {"user_node_id": friend, "limit": page_size}},
+            lambda: repository.list_stickers(me, friend, limit=page_size + 1),
+        ),
+        "my_stickers": (
+            "GET",
+            "/domain/content/sticker/get-my-contents",
+            {},
+            lambda: repository.list_my_stickers(me),
+        ),
+        "posts": (
+            "POST",
+            "/domain/content/post/get-contents",
+            {"json": {"user_node_id": friend}},
+            lambda: repository.list_posts(me, friend),
+        ),
+        "my_posts_page": (
+            "GET",
+            "/domain/content/post/get-my-contents",
+            {"params": {"limit": page_size}},
+            lambda: repository.list_my_posts(me, limit=page_size + 1),
+        ),
+        "blocked": (
+            "POST",
+            "/domain/block/get-members",
+            {},
+            lambda: repository.list_blocked(me),
+        ),
+        "muted": (
+            "POST",
+            "/domain/mute/get-members",
+            {},
+            lambda: repository.list_muted(me),
+        ),
+    }
+
+
+def measure_http(client: TestClient, method: str, path: str, kwargs: dict, number: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(number):
+        client.request(method, path, **kwargs)
+    return (time.perf_counter() - started_at) / number
+
+
+def measure_repository(call, number: int) -> float:
+    async def run():
+        started_at = time.perf_counter()
+        for _ in range(number):
+            await call()
+        return (time.perf_counter() - started_at) / number
+
+    return asyncio.run(run())
+
+
+def main(args):
+    node_ids = seed(args.users, args.roommates, args.stickers, args.posts, args.seed)
+    me = node_ids[0]
+    friend = next(iter(memory_repository.roommates_of(me)), node_ids[1])
+    print(
+        f"users={args.users} roommates={args.roommates} stickers={args.stickers} "
+        f"posts={args.posts} number={args.number}"
+    )
+
+    app.dependency_overrides[get_repository] = lambda: memory_repository
+    # with 블록 없이 만들어서 lifespan 을 실행하지 않는다
+    client = TestClient(app)
+    client.cookies.set("access_token", create_access_token(me))
+
+    print(f"{'endpoint':<16}{'http (us)':>12}{'repo (us)':>12}{'overhead (us)':>16}")
+    for name, (method, path, kwargs, call) in build_cases(me, friend, args.page_size).items():
+        response = client.request(method, path, **kwargs)
+        assert response.status_code == 200, (name, response.status_code, response.text)
+
+        http = measure_http(client, method, path, kwargs, args.number)
+        repo = measure_repository(call, args.number)
+        print(
+            f"{name:<16}{http * 1e6:>12.1f}{repo * 1e6:>12.1f}{(http - repo) * 1e6:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--roommates", type=int, default=20, help="roommates sampled per user")
+    parser.add_argument("--stickers", type=int, default=10, help="stickers per user")
+    parser.add_argument("--posts", type=int, default=10, help="posts per user")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--number", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
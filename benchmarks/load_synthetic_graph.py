@@ -0,0 +1,73 @@
+"""용량 테스트용 합성 소셜 그래프를 만들어 Neo4j 에 넣는다.
+
+Barabási–Albert(차수가 멱법칙을 따르는 그래프) 나 small-world(Watts–Strogatz) 모델로 roommate 관계를 만들고,
+사용자 -> roommate -> 스티커/게시글/cast 순서로 batch-size 행씩 UNWIND 트랜잭션으로 적재한다.
+만든 사용자의 비밀번호는 다른 더미 사용자와 같고, username 은 test_synthetic 으로 시작한다.
+
+    PYTHONPATH=app python -m benchmarks.load_synthetic_graph --model barabasi_albert --users 100000 --m 5 \\
+        --stickers-per-user 0.5 --posts-per-user 1 --casts-per-user 0.1
+
+--dry-run 은 DB 에 넣지 않고 그래프 통계만 보여주고, --edge-list 는 node_id 쌍을 CSV 로 쓴다.
+"""
+import argparse
+import asyncio
+import time
+from app.domain.test.synthetic_graph import MODELS, generate_graph, load_graph
+
+
+def _progress_printer():
+    # 단계마다 10% 단위로만 출력한다
+    printed = {}
+
+    def progress(stage: str, done: int, total: int):
+        step = done * 10 // total if total else 10
+        if printed.get(stage) == step:
+            return
+        printed[stage] = step
+        print(f"  {stage:<10}{done:>12}/{total}", flush=True)
+
+    return progress
+
+
+async def main(args):
+    started_at = time.perf_counter()
+    graph = generate_graph(
+        args.model,
+        args.users,
+        seed=args.seed,
+        m=args.m,
+        k=args.k,
+        p=args.p,
+        stickers_per_user=args.stickers_per_user,
+        posts_per_user=args.posts_per_user,
+        casts_per_user=args.casts_per_user,
+        cast_receivers=args.cast_receivers,
+    )
+    print(f"generated in {time.perf_counter() - started_at:.1f}s: {graph.stats()}")
+
+    if args.edge_list:
+        graph.write_edge_list(args.edge_list)
+        print(f"edge list written to {args.edge_list}")
+    if args.dry_run:
+        return
+
+    result = await load_graph(graph, args.batch_size, _progress_printer())
+    print(f"loaded run {result['run_id']}: {result['seconds']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=MODELS, default="barabasi_albert")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--m", type=int, default=5, help="barabasi_albert: edges per new user")
+    parser.add_argument("--k", type=int, default=10, help="small_world: ring neighbors")
+    parser.add_argument("--p", type=float, default=0.1, help="small_world: rewiring probability")
+    parser.add_argument("--stickers-per-user", type=float, default=0.0)
+    parser.add_argument("--posts-per-user", type=float, default=0.0)
+    parser.add_argument("--casts-per-user", type=float, default=0.0)
+    parser.add_argument("--cast-receivers", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--edge-list", help="write node_id pairs to this CSV path")
+    parser.add_argument("--dry-run", action="store_true", help="generate only, do not load")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,154 @@
+"""응답 하나를 만드는 데 드는 직렬화 비용을 이전 방식과 비교한다.
+
+before: from_data 가 모델을 검증하며 만들고, FastAPI 가 response_model 로 한 번 더 검증한 뒤
+        jsonable 한 값으로 바꿔 JSONResponse 로 쓰던 경로
+after : from_data 가 모델을 검증하며 만들고 model_response 가 pydantic-core 로 바로 bytes 를 쓰는 경로
+
+DB 는 쓰지 않고 크기를 조절할 수 있는 가짜 레코드로 측정한다.
+응답 모듈과 json_response 만 파일 경로로 불러오므로 app 패키지(라우터, Neo4j 드라이버, 환경 변수)를 import 하지 않는다.
+
+    python -m benchmarks.response_serialization --items 50 --number 2000
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+
+
+def _load(name: str, path: Path):
+    # 상위 패키지의 __init__ 을 거치지 않고 모듈(또는 패키지) 하나만 불러온다
+    if path.is_dir():
+        spec = importlib.util.spec_from_file_location(
+            name, path / "__init__.py", submodule_search_locations=[str(path)]
+        )
+    else:
+        spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+model_response = _load("json_response", APP_DIR / "utils" / "json_response.py").model_response
+content_response = _load(
+    "content_response", APP_DIR / "domain" / "service" / "content" / "response"
+)
+friend_response = _load("friend_response", APP_DIR / "domain" / "service" / "friend" / "response")
+GetContentsResponse = content_response.GetContentsResponse
+GetNewContentsResponse = content_response.GetNewContentsResponse
+GetFriendResponse = friend_response.GetFriendResponse
+
+
+def _user(index: int) -> dict:
+    return {
+        "node_id": str(uuid.uuid4()),
+        "nickname": f"nickname{index}",
+        "username": f"username{index}",
+        "my_memo": "memo " * 10,
+        "tags": ["tag1", "tag2", "tag3"],
+    }
+
+
+def _cast(index: int) -> dict:
+    return {
+        "cast": {
+            "message": "message " * 10,
+            "duration": 60,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "node_id": str(uuid.uuid4()),
+        },
+        "creator": str(uuid.uuid4()),
+        "cast_creator": str(uuid.uuid4()),
+    }
+
+
+def _content(index: int) -> dict:
+    return {
+        "node_id": str(uuid.uuid4()),
+        "content": "content " * 20,
+        "image_url": [f"https://example.com/{index}/{n}.png" for n in range(3)],
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "tags": ["tag1", "tag2"],
+        "title": f"title{index}",
+    }
+
+
+def build_cases(items: int) -> dict:
+    casts = [_cast(i) for i in range(items)]
+    roommate_ids = [str(uuid.uuid4()) for _ in range(items)]
+    new_roommates = [
+        {"new_roommate": _user(i), "neighbors": [_user(n) for n in range(5)]}
+        for i in range(max(items // 10, 1))
+    ]
+    friend = _user(0)
+    roommate_edge = {"memo": "memo", "edge_id": str(uuid.uuid4()), "group": "friends"}
+    stickers = [_content(i) for i in range(items)]
+    posts = [_content(i) for i in range(items)]
+
+    return {
+        "GetContentsResponse": (
+            GetContentsResponse,
+            lambda: GetContentsResponse.from_datas(casts, roommate_ids, roommate_ids),
+        ),
+        "GetNewContentsResponse": (
+            GetNewContentsResponse,
+            lambda: GetNewContentsResponse.from_datas(new_roommates, casts, roommate_ids),
+        ),
+        "GetFriendResponse": (
+            GetFriendResponse,
+            lambda: GetFriendResponse.from_data(friend, roommate_edge, stickers, posts),
+        ),
+    }
+
+
+async def run_before(model_class, build, payload, field) -> bytes:
+    # 이전 from_data 는 같은 값을 생성자에서 검증하며 만들었다
+    model = model_class.model_validate(payload)
+    content = await serialize_response(field=field, response_content=model)
+    return JSONResponse(content).body
+
+
+async def run_after(model_class, build, payload, field) -> bytes:
+    return model_response(build()).body
+
+
+async def measure(runner, model_class, build, payload, field, number: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(number):
+        await runner(model_class, build, payload, field)
+    return (time.perf_counter() - started_at) / number
+
+
+async def main(items: int, number: int):
+    print(f"items={items} number={number}")
+    print(f"{'response':<24}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, (model_class, build) in build_cases(items).items():
+        field = create_response_field(name=f"Response_{name}", type_=model_class)
+        payload = build().model_dump()
+        # 두 경로가 같은 JSON 을 만드는지 먼저 확인한다
+        before_body = await run_before(model_class, build, payload, field)
+        after_body = await run_after(model_class, build, payload, field)
+        assert json.loads(before_body) == json.loads(after_body), name
+
+        before = await measure(run_before, model_class, build, payload, field, number)
+        after = await measure(run_after, model_class, build, payload, field, number)
+        print(
+            f"{name:<24}{before * 1e6:>14.1f}{after * 1e6:>14.1f}{before / after:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=50, help="casts/stickers/posts per response")
+    parser.add_argument("--number", type=int, default=2000, help="iterations per case")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.number))